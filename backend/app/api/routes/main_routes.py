@@ -3,38 +3,74 @@ Simplified Resume-Job Matching API Routes
 Only essential endpoints for the core flow
 """
 
-from fastapi import APIRouter, HTTPException, File, UploadFile, Form
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, File, UploadFile, Form, Header
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, Dict, Any, Union
+from typing import Optional, Dict, Any, Union, Callable, Awaitable, List, Tuple
 from datetime import datetime
-import tempfile
+import asyncio
+import functools
+import io
+import json
 import os
 import sys
+import uuid
+import zipfile
 from pathlib import Path
 
 # Add the services path to import modules
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 try:
-    from app.services.pdf_extraction_service import PDFExtractionService
+    from app.services.pdf_extraction_service import aextract_pdf_content
     from app.services.clean_data.data_cleaner import (
         clean_resume_text,
         clean_job_description_text,
+        JOB_DESCRIPTION_PROMPT_VERSION,
     )
-    from app.services.matching import match_resume_to_job
+    from app.services.matching import (
+        afeaturize_job_description,
+        amatch_resume_to_job,
+        jd_features_are_current,
+    )
+    from app.services.matching.extract import analyze_resume_job_match
+    from app.services.executor import get_executor
+    from app.services.llm import get_groq_client, get_response_cache
+    from app.services.pipeline import StagePipeline, StreamingPipeline
+    from app.services.singleflight import get_singleflight, get_singleflight_stats
+    from app.services.analysis_jobs import (
+        AnalysisQueueFullError,
+        get_analysis_queue,
+    )
+    from app.services.matching.tfidf_model import get_tfidf_model_manager
+    from app.services.matching.embedding_store import get_embedding_store
+    from app.services.matching.job_index import get_job_index
 except ImportError as e:
     print(f"Import error: {e}")
     # Fallback imports
     import sys
 
     sys.path.append(str(Path(__file__).parent.parent.parent / "app"))
-    from services.pdf_extraction_service import PDFExtractionService
+    from services.pdf_extraction_service import aextract_pdf_content
     from services.clean_data.data_cleaner import (
         clean_resume_text,
         clean_job_description_text,
+        JOB_DESCRIPTION_PROMPT_VERSION,
     )
-    from services.matching import match_resume_to_job
+    from services.matching import (
+        afeaturize_job_description,
+        amatch_resume_to_job,
+        jd_features_are_current,
+    )
+    from services.matching.extract import analyze_resume_job_match
+    from services.executor import get_executor
+    from services.llm import get_groq_client, get_response_cache
+    from services.pipeline import StagePipeline, StreamingPipeline
+    from services.singleflight import get_singleflight, get_singleflight_stats
+    from services.analysis_jobs import AnalysisQueueFullError, get_analysis_queue
+    from services.matching.tfidf_model import get_tfidf_model_manager
+    from services.matching.embedding_store import get_embedding_store
+    from services.matching.job_index import get_job_index
 
 router = APIRouter()
 
@@ -42,6 +78,56 @@ router = APIRouter()
 job_storage = []  # Changed to list to store multiple job descriptions
 resume_storage: Dict[str, Any] = {"current_resume": None}
 
+# Analyses that missed the latency budget, completed in the background
+pending_analyses: Dict[str, Dict[str, Any]] = {}
+
+# /match and /get-score answer within this many seconds, falling back to the
+# local matching engine while the Groq analysis finishes in the background
+LATENCY_BUDGET_SECONDS = float(os.getenv("LATENCY_BUDGET_SECONDS", "8"))
+ANALYSIS_RESULT_TTL_SECONDS = float(os.getenv("ANALYSIS_RESULT_TTL_SECONDS", "3600"))
+
+# Bulk screening limits and per-stage worker counts
+BULK_MAX_RESUMES = int(os.getenv("BULK_MAX_RESUMES", "500"))
+BULK_MAX_RESUME_BYTES = 1 * 1024 * 1024  # Same 1MB limit as single uploads
+BULK_EXTRACTION_WORKERS = int(
+    os.getenv("BULK_EXTRACTION_WORKERS", str(os.cpu_count() or 1))
+)
+BULK_CLEANING_WORKERS = int(os.getenv("BULK_CLEANING_WORKERS", "4"))
+BULK_SCORING_WORKERS = int(os.getenv("BULK_SCORING_WORKERS", "4"))
+BULK_QUEUE_SIZE = int(os.getenv("BULK_QUEUE_SIZE", "8"))
+# Cascade mode forwards this many candidates to Groq when no cut is given
+BULK_CASCADE_TOP_K = int(os.getenv("BULK_CASCADE_TOP_K", "20"))
+
+# Responses for client-supplied Idempotency-Key headers are kept this long
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "600"))
+
+
+def _idempotent(scope: str):
+    """
+    Collapse requests that repeat an Idempotency-Key header.
+
+    A repeat that arrives while the first request is running awaits it; one
+    that arrives later (within IDEMPOTENCY_TTL_SECONDS) gets the stored
+    response. Failed requests are not stored. The endpoint must declare an
+    ``idempotency_key`` header parameter.
+    """
+
+    def decorator(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            idempotency_key = kwargs.get("idempotency_key")
+            if not idempotency_key:
+                return await endpoint(*args, **kwargs)
+
+            requests = get_singleflight("idempotency", IDEMPOTENCY_TTL_SECONDS)
+            return await requests.do(
+                f"{scope}:{idempotency_key}", lambda: endpoint(*args, **kwargs)
+            )
+
+        return wrapper
+
+    return decorator
+
 
 class JobDescriptionRequest(BaseModel):
     job_description_text: str
@@ -54,11 +140,16 @@ class JobDescriptionRequest(BaseModel):
     summary="Upload Job Description",
     description="Upload job description as PDF file",
 )
+@_idempotent("job-description")
 async def upload_job_description(
-    jd_file: UploadFile = File(..., description="PDF file containing job description")
+    jd_file: UploadFile = File(..., description="PDF file containing job description"),
+    idempotency_key: Optional[str] = Header(
+        None, alias="Idempotency-Key", description="Collapses repeated submissions"
+    ),
 ):
     """
-    Upload job description PDF
+    Upload job description PDF. Its jobs are added to the stored jobs, which
+    only /reset clears; matching uses the most recent upload.
 
     Args:
         jd_file: PDF file containing job description
@@ -73,10 +164,6 @@ async def upload_job_description(
             print(f"📄 jd_file filename: {jd_file.filename}")
             print(f"📄 jd_file content_type: {jd_file.content_type}")
 
-        # Clear previous job descriptions for fresh analysis
-        job_storage.clear()
-        print("🗑️ Cleared previous job descriptions")
-
         final_jd_text = ""
 
         # Handle PDF input
@@ -105,42 +192,23 @@ async def upload_job_description(
 
             print(f"✅ File size: {file_size_mb:.2f}MB")
 
-            # Save file temporarily and extract text
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-                temp_file.write(content)
-                temp_file_path = temp_file.name
-                print(
-                    f"📄 Saved temp file: {temp_file_path}, size: {len(content)} bytes"
-                )
+            # Extract text from PDF directly from memory
+            print("🔍 Starting PDF text extraction...")
+            extraction_result = await aextract_pdf_content(content, jd_file.filename)
 
-            try:
-                # Extract text from PDF
-                print("🔍 Starting PDF text extraction...")
-                extraction_service = PDFExtractionService()
-                extraction_result = extraction_service.extract_pdf_text(temp_file_path)
+            print(f"📊 Extraction result: {extraction_result.get('success', False)}")
 
-                print(
-                    f"📊 Extraction result: {extraction_result.get('success', False)}"
+            if not extraction_result.get("success", False):
+                error_msg = extraction_result.get("error", "Unknown extraction error")
+                print(f"❌ PDF extraction failed: {error_msg}")
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Failed to extract text from PDF: {error_msg}",
                 )
 
-                if not extraction_result.get("success", False):
-                    error_msg = extraction_result.get(
-                        "error", "Unknown extraction error"
-                    )
-                    print(f"❌ PDF extraction failed: {error_msg}")
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Failed to extract text from PDF: {error_msg}",
-                    )
-
-                final_jd_text = extraction_result.get("raw_text", "")
-                print(f"✅ Extracted text length: {len(final_jd_text)} characters")
-                source_type = "pdf"
-
-            finally:
-                # Clean up temp file
-                if os.path.exists(temp_file_path):
-                    os.unlink(temp_file_path)
+            final_jd_text = extraction_result.get("raw_text", "")
+            print(f"✅ Extracted text length: {len(final_jd_text)} characters")
+            source_type = "pdf"
         else:
             raise HTTPException(
                 status_code=400,
@@ -153,17 +221,15 @@ async def upload_job_description(
             )
 
         # Stage 2: Clean data with Groq API to extract structured information
+        # This is the only place a JD is structured; reads and matching reuse it
         print("🧹 Stage 2: Cleaning job description data with Groq...")
-        from app.services.clean_data.data_cleaner import clean_job_description_text
-
-        cleaning_result = clean_job_description_text(final_jd_text)
+        cleaning_result = await clean_job_description_text(final_jd_text)
 
         if not cleaning_result.get("success", False):
             print("⚠️ Data cleaning failed, proceeding with raw text only")
             # Create a single job entry with raw text
-            job_id = len(job_storage) + 1
             job_data = {
-                "id": job_id,
+                "id": None,
                 "text": final_jd_text,
                 "source_type": source_type,
                 "uploaded_at": datetime.now().isoformat(),
@@ -171,10 +237,10 @@ async def upload_job_description(
                 "document_type": extraction_result.get("document_type"),
                 "structured_data": {},
                 "cleaning_status": "failed",
+                **_build_job_structuring_fields(final_jd_text, cleaning_result),
+                **await _build_job_matching_fields(final_jd_text),
             }
-            job_storage.append(job_data)
-            jobs_created = 1
-            uploaded_job_ids = [job_id]
+            new_jobs = [job_data]
         else:
             # Data cleaning successful - handle multiple jobs if found
             structured_jobs = cleaning_result.get("structured_data", [])
@@ -183,12 +249,9 @@ async def upload_job_description(
 
             print(f"✅ Data cleaning completed. Found {job_count} job(s)")
 
-            jobs_created = 0
-            uploaded_job_ids = []
+            new_jobs = []
 
             for i, job_structured_data in enumerate(structured_jobs):
-                job_id = len(job_storage) + 1
-
                 # For multiple jobs, split the raw text proportionally
                 if multiple_jobs and job_count > 1:
                     # Simple text splitting - in production, you'd want more sophisticated splitting
@@ -203,7 +266,7 @@ async def upload_job_description(
                     job_text = final_jd_text
 
                 job_data = {
-                    "id": job_id,
+                    "id": None,
                     "text": job_text,
                     "source_type": source_type,
                     "uploaded_at": datetime.now().isoformat(),
@@ -221,15 +284,28 @@ async def upload_job_description(
                     "cleaning_status": "success",
                     "job_index": i + 1 if multiple_jobs else 1,
                     "total_jobs_in_document": job_count,
+                    **_build_job_structuring_fields(
+                        job_text, cleaning_result, job_structured_data
+                    ),
+                    **await _build_job_matching_fields(job_text),
                 }
 
-                job_storage.append(job_data)
-                uploaded_job_ids.append(job_id)
-                jobs_created += 1
+                new_jobs.append(job_data)
 
-                print(f"✅ Job {i+1}/{job_count} uploaded. ID: {job_id}")
+                print(f"✅ Job {i+1}/{job_count} prepared")
+
+        # Store the jobs only once all of them are built, so a failed upload
+        # leaves the stored jobs untouched; ids are assigned here because
+        # nothing awaits between numbering and storing them
+        for offset, job_data in enumerate(new_jobs):
+            job_data["id"] = len(job_storage) + offset + 1
+        job_storage.extend(new_jobs)
+        jobs_created = len(new_jobs)
+        uploaded_job_ids = [job["id"] for job in new_jobs]
 
         print(f"🎉 Job description processing completed. Created {jobs_created} job(s)")
+        await _add_to_tfidf_corpus([job["text"] for job in new_jobs], "job_description")
+        await _add_to_job_index(new_jobs)
 
         # Check if resume is already uploaded
         if resume_storage["current_resume"] is not None:
@@ -268,10 +344,14 @@ async def upload_job_description(
 @router.post(
     "/resume", summary="Upload Resume", description="Upload resume as PDF file"
 )
+@_idempotent("resume")
 async def upload_resume(
     resume_file: UploadFile = File(
         ..., description="PDF file containing resume", media_type="application/pdf"
-    )
+    ),
+    idempotency_key: Optional[str] = Header(
+        None, alias="Idempotency-Key", description="Collapses repeated submissions"
+    ),
 ):
     """
     Upload resume PDF
@@ -316,59 +396,48 @@ async def upload_resume(
 
         print(f"✅ File size: {file_size_mb:.2f}MB")
 
-        # Save file temporarily and extract text
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-            temp_file.write(content)
-            temp_file_path = temp_file.name
-
-        try:
-            # Extract text from PDF
-            extraction_service = PDFExtractionService()
-            extraction_result = extraction_service.extract_pdf_text(temp_file_path)
-
-            if not extraction_result.get("success", False):
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Failed to extract text from PDF: {extraction_result.get('error')}",
-                )
+        # Extract text from PDF
+        extraction_result = await aextract_pdf_content(content, resume_file.filename)
 
-            resume_text = extraction_result.get("raw_text", "")
+        if not extraction_result.get("success", False):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Failed to extract text from PDF: {extraction_result.get('error')}",
+            )
 
-            if not resume_text.strip():
-                raise HTTPException(
-                    status_code=400, detail="No text content found in resume PDF"
-                )
+        resume_text = extraction_result.get("raw_text", "")
 
-            # Store resume
-            resume_storage["current_resume"] = {
-                "text": resume_text,
-                "filename": resume_file.filename,
-                "uploaded_at": datetime.now().isoformat(),
-                "document_type": extraction_result.get("document_type"),
-                "structured_data": extraction_result.get("structured_data", {}),
-            }
+        if not resume_text.strip():
+            raise HTTPException(
+                status_code=400, detail="No text content found in resume PDF"
+            )
 
-            print(f"✅ Resume uploaded. Length: {len(resume_text)} characters")
+        # Store resume
+        resume_storage["current_resume"] = {
+            "text": resume_text,
+            "filename": resume_file.filename,
+            "uploaded_at": datetime.now().isoformat(),
+            "document_type": extraction_result.get("document_type"),
+            "structured_data": extraction_result.get("structured_data", {}),
+        }
 
-            # Check if job description is already uploaded
-            if len(job_storage) > 0:
-                print("🚀 Both JD and Resume available. Triggering matching process...")
-                return await _trigger_matching_process()
+        print(f"✅ Resume uploaded. Length: {len(resume_text)} characters")
+        await _add_to_tfidf_corpus([resume_text], "resume")
 
-            return {
-                "success": True,
-                "message": "Resume uploaded successfully",
-                "filename": resume_file.filename,
-                "text": resume_text,  # Include the extracted text
-                "text_length": len(resume_text),
-                "next_step": "Upload job description to start matching process",
-                "timestamp": datetime.now().isoformat(),
-            }
+        # Check if job description is already uploaded
+        if len(job_storage) > 0:
+            print("🚀 Both JD and Resume available. Triggering matching process...")
+            return await _trigger_matching_process()
 
-        finally:
-            # Clean up temp file
-            if os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
+        return {
+            "success": True,
+            "message": "Resume uploaded successfully",
+            "filename": resume_file.filename,
+            "text": resume_text,  # Include the extracted text
+            "text_length": len(resume_text),
+            "next_step": "Upload job description to start matching process",
+            "timestamp": datetime.now().isoformat(),
+        }
 
     except HTTPException:
         raise
@@ -379,7 +448,12 @@ async def upload_resume(
 
 
 @router.post("/match")
-async def trigger_manual_matching():
+@_idempotent("match")
+async def trigger_manual_matching(
+    idempotency_key: Optional[str] = Header(
+        None, alias="Idempotency-Key", description="Collapses repeated submissions"
+    ),
+):
     """
     Manually trigger matching process (if both JD and resume are uploaded)
 
@@ -430,133 +504,496 @@ async def _trigger_matching_process():
             f"📄 Processing JD ({len(jd_text)} chars) and Resume ({len(resume_text)} chars)"
         )
 
-        # Stage 1: Data Cleaning with Groq
-        print("🧹 Stage 1: Cleaning data with Groq...")
+        # Stages 1-2: Data cleaning and Groq AI analysis, raced against the
+        # local matching engine within the latency budget
+        build_response = functools.partial(_build_match_response, jd_data, resume_data)
+        final_results = await _match_within_latency_budget(
+            jd_data, build_response, resume=resume_data
+        )
 
-        # Clean job description
-        jd_cleaning_result = clean_job_description_text(jd_text)
-        if not jd_cleaning_result.get("success", False):
-            print("⚠️ JD cleaning failed, using raw text")
-            cleaned_jd_text = jd_text
-        else:
-            # Use cleaned structured data if available
-            structured_jd = jd_cleaning_result.get("structured_data", {})
-            cleaned_jd_text = _create_text_from_structured_data(structured_jd, jd_text)
-
-        # Clean resume
-        resume_cleaning_result = clean_resume_text(resume_text)
-        if not resume_cleaning_result.get("success", False):
-            print("⚠️ Resume cleaning failed, using raw text")
-            cleaned_resume_text = resume_text
-        else:
-            # Use cleaned structured data if available
-            structured_resume = resume_cleaning_result.get("structured_data", {})
-            cleaned_resume_text = _create_text_from_structured_data(
-                structured_resume, resume_text
-            )
+        print("🎉 Complete AI analysis process finished successfully!")
+        print(f"📈 Match Score: {final_results['score']}%")
+        print(f"🏆 Suitability: {final_results['verdict']}")
+
+        return final_results
+
+    except Exception as e:
+        print(f"❌ Error in matching process: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail=f"Matching process failed: {str(e)}"
+        )
 
-        print("✅ Stage 1 completed: Data cleaning")
 
-        # Stage 2: Direct Groq AI Analysis
-        print("🤖 Stage 2: Performing direct Groq AI matching analysis...")
+def _build_match_response(
+    jd_data: Dict[str, Any],
+    resume_data: Dict[str, Any],
+    matching_result: Dict[str, Any],
+    stage_results: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Format an analysis result as the /match response"""
+    jd_text = jd_data["text"]
+    resume_text = resume_data["text"]
 
-        # Import the AI extractor
-        try:
-            from app.services.matching.extract import analyze_resume_job_match
-        except ImportError as e:
-            print(f"❌ Failed to import AI extractor: {e}")
-            raise HTTPException(
-                status_code=500, detail="AI analysis module not available"
-            )
+    # Stage 3: Format final results
+    print("📊 Stage 3: Formatting AI analysis results...")
+
+    # Extract key information from AI analysis
+    overall_assessment = matching_result.get("overall_assessment", {})
+    skill_analysis = matching_result.get("skill_analysis", {})
+    improvement_recommendations = matching_result.get("improvement_recommendations", {})
+
+    final_results = {
+        "success": True,
+        "timestamp": datetime.now().isoformat(),
+        "process_stages": {
+            "extraction": "completed",
+            "cleaning": "completed",
+            "ai_analysis": _ai_stage_status(matching_result),
+        },
+        "input_info": {
+            "job_description": {
+                "company": jd_data.get("structured_data", {}).get("company")
+                or "Unknown Company",
+                "position": jd_data.get("structured_data", {}).get("job_title")
+                or jd_data.get("filename", "Unknown Position"),
+                "source_type": jd_data.get("source_type"),
+                "text_length": len(jd_text),
+            },
+            "resume": {
+                "filename": resume_data.get("filename"),
+                "text_length": len(resume_text),
+            },
+        },
+        "ai_analysis_results": {
+            "overall_assessment": overall_assessment,
+            "skill_analysis": skill_analysis,
+            "experience_analysis": matching_result.get("experience_analysis", {}),
+            "improvement_recommendations": improvement_recommendations,
+            "strengths": matching_result.get("strengths", []),
+            "concerns": matching_result.get("concerns", []),
+            "recommendation": matching_result.get("recommendation", {}),
+        },
+        # Legacy compatibility fields
+        "score": overall_assessment.get("match_score", 0),
+        "verdict": overall_assessment.get("suitability_level", "Unknown"),
+        "matched_skills": skill_analysis.get("matched_skills", []),
+        "missing_skills": skill_analysis.get("missing_critical_skills", []),
+        "suggestions": improvement_recommendations.get("immediate_actions", []),
+        "areas_for_improvement": skill_analysis.get("skill_gaps", [])[:5],  # Top 5
+    }
+
+    return final_results
+
+
+def _ai_stage_status(matching_result: Dict[str, Any]) -> str:
+    """Status of the Groq analysis stage behind a reported result"""
+    if matching_result["analysis_source"] == "groq_ai":
+        return "completed"
+    return "pending" if matching_result.get("provisional") else "failed"
+
+
+def _build_score_response(
+    job_id: str,
+    job_data: Dict[str, Any],
+    resume_filename: str,
+    matching_result: Dict[str, Any],
+    stage_results: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Format an analysis result as the /get-score response"""
+    resume_text = stage_results["resume_extraction"]["raw_text"]
+    ai_analysis_used = matching_result["analysis_source"] == "groq_ai"
+
+    # Return the full analysis result with additional metadata
+    return {
+        **matching_result,  # Include all extract.py (or local engine) results
+        "job_id": job_id,
+        "job_info": {
+            "company": job_data.get("structured_data", {}).get("company")
+            or "Unknown Company",
+            "position": job_data.get("structured_data", {}).get("job_title")
+            or job_data.get("filename", "Unknown Position"),
+        },
+        "resume_info": {
+            "filename": resume_filename,
+            "text_length": len(resume_text),
+        },
+        "processing_metadata": {
+            "data_cleaning_performed": True,
+            "ai_analysis_used": ai_analysis_used,
+            "model_version": (
+                "groq-llama-3.1-8b-instant"
+                if ai_analysis_used
+                else matching_result.get("model_used")
+            ),
+            "matching_approach": (
+                "direct_groq_ai"
+                if ai_analysis_used
+                else matching_result["analysis_source"]
+            ),
+        },
+    }
+
+
+def _local_analysis_result(
+    local_result: Dict[str, Any], provisional: bool = True
+) -> Dict[str, Any]:
+    """
+    Present a MatchingEngine result in the shape of a Groq analysis so the
+    response builders and the frontend can render it unchanged
+
+    Args:
+        local_result: MatchingEngine result
+        provisional: Whether a Groq analysis may still replace this result;
+            False when it is final (Groq failed or the prefilter rejected it)
+    """
+    score = local_result.get("relevance_score", 0)
+    verdict = local_result.get("verdict", "Unknown")
+    detailed_analysis = local_result.get("detailed_analysis", {})
+    follow_up = (
+        "A detailed AI analysis may follow."
+        if provisional
+        else "AI analysis unavailable."
+    )
+
+    return {
+        "success": True,
+        "analysis_source": "local_matching_engine",
+        "provisional": provisional,
+        "timestamp": local_result.get("timestamp", datetime.now().isoformat()),
+        "model_used": "local_matching_engine",
+        "analysis_type": "hard_and_semantic_matching",
+        "overall_assessment": {
+            "match_score": score,
+            "suitability_level": verdict,
+            "confidence_level": detailed_analysis.get("semantic_confidence", "Medium"),
+            "summary": (
+                f"Local keyword and semantic matching scored this resume {score}% "
+                f"({verdict}). {follow_up}"
+            ),
+        },
+        "skill_analysis": {
+            "matched_skills": local_result.get("matched_skills", []),
+            "missing_critical_skills": local_result.get("missing_skills", []),
+            "skill_gaps": detailed_analysis.get("areas_for_improvement", []),
+            "technical_competency": "Assessed by local skill matching",
+        },
+        "improvement_recommendations": {
+            "immediate_actions": local_result.get("suggestions", []),
+        },
+        "strengths": detailed_analysis.get("strengths", []),
+        "local_match": {
+            "score_breakdown": local_result.get("score_breakdown", {}),
+            "match_statistics": local_result.get("match_statistics", {}),
+        },
+        # Legacy compatibility
+        "score": score,
+        "verdict": verdict,
+        "matched_skills": local_result.get("matched_skills", []),
+        "missing_skills": local_result.get("missing_skills", []),
+        "suggestions": local_result.get("suggestions", []),
+    }
+
+
+def _select_analysis(stage_results: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Pick the analysis to report: Groq when it succeeded, otherwise the local
+    engine result, and the keyword fallback only when both failed
+    """
+    ai_result = stage_results.get("ai_analysis") or {}
+    local_result = stage_results.get("local_matching") or {}
+
+    if ai_result.get("success", False):
+        return {**ai_result, "analysis_source": "groq_ai"}
+
+    if local_result.get("success", False):
+        print("⚠️ AI analysis failed, using local matching engine result")
+        return _local_analysis_result(local_result, provisional=False)
+
+    print(f"⚠️ AI analysis failed, but continuing with available results")
+    return {**ai_result, "analysis_source": "keyword_fallback"}
+
+
+def _prune_pending_analyses():
+    """Drop pending analysis entries older than ANALYSIS_RESULT_TTL_SECONDS"""
+    cutoff = datetime.now().timestamp() - ANALYSIS_RESULT_TTL_SECONDS
+    for analysis_id in [
+        analysis_id
+        for analysis_id, entry in pending_analyses.items()
+        if entry["created_ts"] < cutoff
+    ]:
+        del pending_analyses[analysis_id]
+
+
+def _complete_pending_analysis(
+    analysis_id: str,
+    build_response: Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]],
+    pipeline_task: asyncio.Task,
+):
+    """Attach the late pipeline result to its pending analysis entry"""
+    entry = pending_analyses.get(analysis_id)
+    if entry is None:
+        return
+
+    entry["completed_at"] = datetime.now().isoformat()
+    if pipeline_task.cancelled():
+        entry.update(status="failed", error="Analysis was cancelled")
+        return
+
+    error = pipeline_task.exception()
+    if error is not None:
+        detail = error.detail if isinstance(error, HTTPException) else str(error)
+        entry.update(status="failed", error=detail)
+        return
+
+    stage_results = pipeline_task.result()
+    entry.update(
+        status="completed",
+        result=build_response(_select_analysis(stage_results), stage_results),
+    )
+    print(f"✅ Pending analysis {analysis_id} completed")
+
+
+async def _match_within_latency_budget(
+    job: Dict[str, Any],
+    build_response: Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]],
+    **resume_source,
+) -> Dict[str, Any]:
+    """
+    Run the matching pipeline, answering within LATENCY_BUDGET_SECONDS.
 
-        # Get candidate name and job title for better analysis
-        candidate_name = None
-        job_title = (
-            jd_data.get("structured_data", {}).get("job_title") or "Unknown Position"
+    The local MatchingEngine score is computed alongside the Groq analysis.
+    If the analysis misses the budget, the local result is returned (labelled
+    "provisional") with a pending_analysis_id; the Groq result is attached
+    to that id when it arrives and can be polled at /api/analysis/{id}.
+
+    Args:
+        job: Stored job record to match against
+        build_response: Formats (analysis, stage_results) as the endpoint response
+        **resume_source: Resume arguments for _run_matching_pipeline
+
+    Returns:
+        Endpoint response built from the chosen analysis
+    """
+    partial_results: Dict[str, Any] = {}
+    local_ready = asyncio.Event()
+
+    def on_stage_complete(stage_name: str, result: Any, elapsed: float):
+        _log_stage_completion(stage_name, result, elapsed)
+        partial_results[stage_name] = result
+        if stage_name == "local_matching":
+            local_ready.set()
+
+    pipeline_task = asyncio.ensure_future(
+        _run_matching_pipeline(
+            job, on_stage_complete=on_stage_complete, **resume_source
         )
+    )
 
-        # Try to extract candidate name from resume data
-        if resume_cleaning_result.get("success", False):
-            structured_resume = resume_cleaning_result.get("structured_data", {})
-            candidate_name = structured_resume.get("name") or structured_resume.get(
-                "full_name"
-            )
+    done, _ = await asyncio.wait({pipeline_task}, timeout=LATENCY_BUDGET_SECONDS)
 
-        # Perform direct Groq AI analysis
-        matching_result = analyze_resume_job_match(
-            resume_text=cleaned_resume_text,
-            job_description_text=cleaned_jd_text,
-            candidate_name=candidate_name,
-            job_title=job_title,
+    if pipeline_task not in done:
+        # The local score normally lands well inside the budget; wait for it
+        # unless the whole pipeline finishes (or fails) first
+        local_wait = asyncio.ensure_future(local_ready.wait())
+        await asyncio.wait(
+            {pipeline_task, local_wait}, return_when=asyncio.FIRST_COMPLETED
         )
+        local_wait.cancel()
+
+    if pipeline_task.done():
+        stage_results = pipeline_task.result()
+        return build_response(_select_analysis(stage_results), stage_results)
+
+    local_result = partial_results["local_matching"]
+    if not local_result.get("success", False):
+        # Nothing useful to return early; wait for the full analysis
+        stage_results = await pipeline_task
+        return build_response(_select_analysis(stage_results), stage_results)
+
+    analysis_id = uuid.uuid4().hex
+    _prune_pending_analyses()
+    pending_analyses[analysis_id] = {
+        "status": "pending",
+        "created_at": datetime.now().isoformat(),
+        "created_ts": datetime.now().timestamp(),
+        "result": None,
+        "error": None,
+    }
+    pipeline_task.add_done_callback(
+        functools.partial(_complete_pending_analysis, analysis_id, build_response)
+    )
+
+    print(
+        f"⏱️ AI analysis missed the {LATENCY_BUDGET_SECONDS}s budget, "
+        f"returning local result (pending analysis {analysis_id})"
+    )
+    return {
+        **build_response(_local_analysis_result(local_result), partial_results),
+        "pending_analysis_id": analysis_id,
+        "pending_analysis_url": f"/api/analysis/{analysis_id}",
+    }
 
-        if not matching_result.get("success", False):
-            print(f"⚠️ AI analysis failed, but continuing with available results")
 
-        print("✅ Stage 2 completed: Direct Groq AI Analysis")
+async def _job_match_inputs(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Raw text, cleaned text, structure and matching features of a job"""
+    # Job description was structured and featurised at upload
+    structured_job = await _ensure_job_structured(job)
+    await _ensure_job_features(structured_job)
+    return {
+        "text": structured_job["text"],
+        "cleaned_text": structured_job.get("cleaned_text") or structured_job["text"],
+        "structured_data": structured_job.get("structured_data", {}),
+        "matching_features": structured_job.get("matching_features"),
+    }
 
-        # Stage 3: Format final results
-        print("📊 Stage 3: Formatting AI analysis results...")
 
-        # Extract key information from AI analysis
-        overall_assessment = matching_result.get("overall_assessment", {})
-        skill_analysis = matching_result.get("skill_analysis", {})
-        improvement_recommendations = matching_result.get(
-            "improvement_recommendations", {}
-        )
+async def _clean_resume_for_matching(resume_text: str) -> Dict[str, Any]:
+    """Structure a resume through Groq, falling back to the raw text"""
+    cleaning_result = await clean_resume_text(resume_text)
 
-        final_results = {
-            "success": True,
-            "timestamp": datetime.now().isoformat(),
-            "process_stages": {
-                "extraction": "completed",
-                "cleaning": "completed",
-                "ai_analysis": "completed",
-            },
-            "input_info": {
-                "job_description": {
-                    "company": jd_data.get("structured_data", {}).get("company")
-                    or "Unknown Company",
-                    "position": jd_data.get("structured_data", {}).get("job_title")
-                    or jd_data.get("filename", "Unknown Position"),
-                    "source_type": jd_data.get("source_type"),
-                    "text_length": len(jd_text),
-                },
-                "resume": {
-                    "filename": resume_data.get("filename"),
-                    "text_length": len(resume_text),
-                },
-            },
-            "ai_analysis_results": {
-                "overall_assessment": overall_assessment,
-                "skill_analysis": skill_analysis,
-                "experience_analysis": matching_result.get("experience_analysis", {}),
-                "improvement_recommendations": improvement_recommendations,
-                "strengths": matching_result.get("strengths", []),
-                "concerns": matching_result.get("concerns", []),
-                "recommendation": matching_result.get("recommendation", {}),
-            },
-            # Legacy compatibility fields
-            "score": overall_assessment.get("match_score", 0),
-            "verdict": overall_assessment.get("suitability_level", "Unknown"),
-            "matched_skills": skill_analysis.get("matched_skills", []),
-            "missing_skills": skill_analysis.get("missing_critical_skills", []),
-            "suggestions": improvement_recommendations.get("immediate_actions", []),
-            "areas_for_improvement": skill_analysis.get("skill_gaps", [])[:5],  # Top 5
+    if not cleaning_result.get("success", False):
+        print("⚠️ Resume cleaning failed, using raw text")
+        return {
+            "success": False,
+            "cleaned_text": resume_text,
+            "structured_data": {},
         }
 
-        print("🎉 Complete AI analysis process finished successfully!")
-        print(f"📈 Match Score: {final_results['score']}%")
-        print(f"🏆 Suitability: {final_results['verdict']}")
+    # Use cleaned structured data if available
+    structured_resume = cleaning_result.get("structured_data", {})
+    return {
+        "success": True,
+        "cleaned_text": _create_text_from_structured_data(
+            structured_resume, resume_text
+        ),
+        "structured_data": structured_resume,
+    }
 
-        return final_results
 
+async def _analyze_cleaned_resume(
+    jd_result: Dict[str, Any], resume_result: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Groq analysis of a cleaned resume against a job"""
+    # Get candidate name and job title for better analysis
+    job_title = jd_result["structured_data"].get("job_title") or "Unknown Position"
+    structured_resume = resume_result["structured_data"]
+    candidate_name = structured_resume.get("name") or structured_resume.get("full_name")
+
+    print("🤖 Performing direct Groq AI matching analysis...")
+    return await analyze_resume_job_match(
+        resume_text=resume_result["cleaned_text"],
+        job_description_text=jd_result["cleaned_text"],
+        candidate_name=candidate_name,
+        job_title=job_title,
+    )
+
+
+async def _local_match(resume_text: str, jd_inputs: Dict[str, Any]) -> Dict[str, Any]:
+    """Hard + semantic score from the local engine, no LLM involved"""
+    try:
+        return await amatch_resume_to_job(
+            resume_text,
+            jd_inputs["text"],
+            jd_features=jd_inputs.get("matching_features"),
+        )
     except Exception as e:
-        print(f"❌ Error in matching process: {str(e)}")
-        raise HTTPException(
-            status_code=500, detail=f"Matching process failed: {str(e)}"
+        print(f"⚠️ Local matching failed: {str(e)}")
+        return {"success": False, "error": str(e)}
+
+
+async def _run_matching_pipeline(
+    job: Dict[str, Any],
+    resume: Optional[Dict[str, Any]] = None,
+    resume_pdf: Optional[bytes] = None,
+    resume_filename: Optional[str] = None,
+    on_stage_complete: Optional[Callable[[str, Any, float], Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Run the matching flow as a DAG of stages so independent work overlaps:
+
+        resume_extraction ─┬─ resume_cleaning ──┬── ai_analysis
+        jd_structuring ────┼────────────────────┘
+                           └─ local_matching
+
+    Resume extraction (which includes local PDF structuring) runs alongside
+    the JD stage, and each stage waits only on the inputs it needs. The local
+    MatchingEngine score is ready long before the Groq analysis.
+
+    Args:
+        job: Stored job record to match against
+        resume: Stored resume record (already extracted)
+        resume_pdf: Raw resume PDF content, extracted as the first stage
+        resume_filename: Filename of resume_pdf
+        on_stage_complete: Stage callback (default: log stage timings)
+
+    Returns:
+        Dict mapping stage name to its result
+    """
+
+    async def resume_extraction(_: Dict[str, Any]) -> Dict[str, Any]:
+        if resume is not None:
+            return {
+                "raw_text": resume["text"],
+                "structured_data": resume.get("structured_data", {}),
+            }
+
+        extraction_result = await aextract_pdf_content(resume_pdf, resume_filename)
+
+        if not extraction_result.get("success", False):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Failed to extract text from PDF: {extraction_result.get('error')}",
+            )
+
+        resume_text = extraction_result.get("raw_text", "")
+
+        if not resume_text.strip():
+            raise HTTPException(
+                status_code=400, detail="No text content found in resume PDF"
+            )
+
+        print(f"✅ Resume extracted. Length: {len(resume_text)} characters")
+        return {
+            "raw_text": resume_text,
+            "structured_data": extraction_result.get("structured_data", {}),
+        }
+
+    async def jd_structuring(_: Dict[str, Any]) -> Dict[str, Any]:
+        return await _job_match_inputs(job)
+
+    async def resume_cleaning(inputs: Dict[str, Any]) -> Dict[str, Any]:
+        return await _clean_resume_for_matching(inputs["resume_extraction"]["raw_text"])
+
+    async def ai_analysis(inputs: Dict[str, Any]) -> Dict[str, Any]:
+        return await _analyze_cleaned_resume(
+            inputs["jd_structuring"], inputs["resume_cleaning"]
+        )
+
+    async def local_matching(inputs: Dict[str, Any]) -> Dict[str, Any]:
+        return await _local_match(
+            inputs["resume_extraction"]["raw_text"], inputs["jd_structuring"]
         )
 
+    pipeline = (
+        StagePipeline("matching")
+        .add_stage("resume_extraction", resume_extraction)
+        .add_stage("jd_structuring", jd_structuring)
+        .add_stage("resume_cleaning", resume_cleaning, ["resume_extraction"])
+        .add_stage(
+            "local_matching", local_matching, ["resume_extraction", "jd_structuring"]
+        )
+        .add_stage("ai_analysis", ai_analysis, ["jd_structuring", "resume_cleaning"])
+    )
+
+    return await pipeline.run(
+        on_stage_complete=on_stage_complete or _log_stage_completion
+    )
+
+
+def _log_stage_completion(stage_name: str, result: Any, elapsed: float):
+    """Log a finished pipeline stage"""
+    print(f"✅ Stage '{stage_name}' completed in {elapsed:.2f}s")
+
 
 def _create_text_from_structured_data(
     structured_data: Dict[str, Any], fallback_text: str
@@ -602,91 +1039,248 @@ def _create_text_from_structured_data(
         return fallback_text
 
 
-@router.get("/status")
-async def get_status():
+def _build_job_structuring_fields(
+    job_text: str,
+    cleaning_result: Dict[str, Any],
+    job_structured_data: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
     """
-    Get current upload status
+    Build the ingest-time structuring fields stored on a job record
+
+    Args:
+        job_text: Raw text of this job
+        cleaning_result: Result of clean_job_description_text for the upload
+        job_structured_data: Structured data for this job (None if cleaning failed)
 
     Returns:
-        Status of job description and resume uploads
+        Fields to merge into the job record
     """
+    success = cleaning_result.get("success", False) and job_structured_data is not None
+
     return {
-        "success": True,
-        "job_descriptions_count": len(job_storage),
-        "job_descriptions_uploaded": len(job_storage) > 0,
-        "resume_uploaded": resume_storage["current_resume"] is not None,
-        "ready_for_matching": (
-            len(job_storage) > 0 and resume_storage["current_resume"] is not None
+        "groq_structured_data": [job_structured_data] if success else {},
+        "groq_parsing_success": success,
+        "groq_error": None if success else cleaning_result.get("error"),
+        "cleaned_text": (
+            _create_text_from_structured_data(job_structured_data, job_text)
+            if success
+            else job_text
         ),
-        "timestamp": datetime.now().isoformat(),
+        "structuring_version": JOB_DESCRIPTION_PROMPT_VERSION,
+        "structured_at": datetime.now().isoformat(),
     }
 
 
-@router.get("/get-jobs")
-async def get_jobs():
+async def _ensure_job_structured(job: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Get all uploaded job descriptions with detailed information
+    Make sure a stored job carries structured data for the current prompt version
 
-    Returns:
-        List of all job descriptions with their details
+    Jobs are structured once at upload; this only re-runs cleaning for records
+    stamped with an older version, and stores the result back on the record.
     """
-    try:
-        if not job_storage:
-            return {
-                "success": True,
-                "message": "No job descriptions uploaded yet",
-                "jobs": [],
-                "total_count": 0,
-                "timestamp": datetime.now().isoformat(),
-            }
-
-        # Format job descriptions for response with Groq-structured data
-        jobs_list = []
-        for job in job_storage:
-            # Use Groq API to parse job description into structured JSON
-            groq_result = clean_job_description_text(job["text"])
-
-            job_info = {
-                "id": job["id"],
-                "filename": job.get("filename"),
-                "source_type": job["source_type"],
-                "uploaded_at": job["uploaded_at"],
-                "text_length": len(job["text"]),
-                "full_text": job["text"],
-                "document_type": job.get("document_type"),
-                "groq_structured_data": (
-                    groq_result.get("structured_data", {})
-                    if groq_result.get("success")
-                    else {}
-                ),
-                "groq_parsing_success": groq_result.get("success", False),
-                "groq_error": (
-                    groq_result.get("error") if not groq_result.get("success") else None
-                ),
-                "structured_data": job.get(
-                    "structured_data", {}
-                ),  # Keep existing PDF parser data
-            }
-            jobs_list.append(job_info)
-
-        return {
-            "success": True,
-            "message": f"Found {len(job_storage)} job description(s)",
-            "jobs": jobs_list,
-            "total_count": len(job_storage),
-            "timestamp": datetime.now().isoformat(),
-        }
+    if job.get("structuring_version") == JOB_DESCRIPTION_PROMPT_VERSION:
+        return job
 
-    except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=f"Error retrieving job descriptions: {str(e)}"
-        )
+    print(
+        f"🔄 Re-structuring job {job.get('id')} for prompt version {JOB_DESCRIPTION_PROMPT_VERSION}"
+    )
+    cleaning_result = await clean_job_description_text(job["text"])
+    structured_jobs = cleaning_result.get("structured_data") or [None]
+    job.update(
+        _build_job_structuring_fields(job["text"], cleaning_result, structured_jobs[0])
+    )
+    return job
 
 
-@router.get("/get-job/{job_id}")
-async def get_job_by_id(job_id: int):
+async def _build_job_matching_fields(job_text: str) -> Dict[str, Any]:
     """
-    Get a specific job description by ID
+    Precompute the local matching features stored on a job record, so
+    matching only has to process the resume
+
+    Args:
+        job_text: Raw text of this job
+
+    Returns:
+        Fields to merge into the job record
+    """
+    try:
+        features = await afeaturize_job_description(job_text)
+    except Exception as e:
+        print(f"⚠️ Job featurisation failed, matching will preprocess the JD: {e}")
+        features = None
+
+    return {
+        "matching_features": features,
+        "featurized_at": datetime.now().isoformat(),
+    }
+
+
+async def _add_to_tfidf_corpus(texts: List[str], kind: str):
+    """
+    Add uploaded documents to the TF-IDF corpus; the model refits in the
+    background once the corpus has grown enough
+
+    Args:
+        texts: Raw document texts
+        kind: "job_description" or "resume"
+    """
+    try:
+        added = await get_tfidf_model_manager().aadd_documents(texts, kind)
+        if added:
+            print(f"📚 Added {added} document(s) to the TF-IDF corpus")
+    except Exception as e:
+        print(f"⚠️ Could not add documents to the TF-IDF corpus: {e}")
+
+
+async def _add_to_job_index(jobs: List[Dict[str, Any]]):
+    """
+    Add stored jobs to the job index used by /recommendations
+
+    Args:
+        jobs: Job records
+    """
+    index = get_job_index()
+    for job in jobs:
+        try:
+            await get_executor().run_io(index.add, job["id"], job["text"])
+        except Exception as e:
+            print(f"⚠️ Could not index job {job.get('id')}: {e}")
+
+
+async def _ensure_job_features(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Make sure a stored job carries matching features for the current
+    preprocessor, re-featurising records stamped with an older version
+    """
+    if jd_features_are_current(job.get("matching_features")):
+        return job
+
+    print(f"🔄 Re-featurising job {job.get('id')} for matching")
+    job.update(await _build_job_matching_fields(job["text"]))
+    return job
+
+
+def _validate_resume_upload(resume_file: UploadFile):
+    """Reject resume uploads that are not PDFs"""
+    if not resume_file.filename or not resume_file.filename.endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="Only PDF files are allowed")
+
+    if resume_file.content_type not in [
+        "application/pdf",
+        "application/octet-stream",
+    ]:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid file type. Expected PDF, got {resume_file.content_type}",
+        )
+
+
+def _find_job(job_id: Union[int, str]) -> Optional[Dict[str, Any]]:
+    """Find a stored job by ID (accepts the ID as int or form string)"""
+    for job in job_storage:
+        if str(job.get("id")) == str(job_id):
+            return job
+    return None
+
+
+def _job_to_response(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Format a stored job for the read endpoints (no LLM calls)"""
+    return {
+        "id": job["id"],
+        "filename": job.get("filename"),
+        "source_type": job["source_type"],
+        "uploaded_at": job["uploaded_at"],
+        "text_length": len(job["text"]),
+        "full_text": job["text"],
+        "document_type": job.get("document_type"),
+        "groq_structured_data": job.get("groq_structured_data", {}),
+        "groq_parsing_success": job.get("groq_parsing_success", False),
+        "groq_error": job.get("groq_error"),
+        "structuring_version": job.get("structuring_version"),
+        "structured_data": job.get("structured_data", {}),
+    }
+
+
+def _storage_stats() -> Dict[str, Any]:
+    """Counters of the SQLite-backed services; blocking, so run on the I/O pool"""
+    return {
+        "llm_cache": get_response_cache().get_stats(),
+        "analysis_jobs": get_analysis_queue().get_stats(),
+        "tfidf_model": get_tfidf_model_manager().get_stats(),
+        "embedding_store": get_embedding_store().get_stats(),
+    }
+
+
+@router.get("/status")
+async def get_status():
+    """
+    Get current upload status
+
+    Returns:
+        Status of job description and resume uploads
+    """
+    try:
+        storage_stats = await get_executor().run_io(_storage_stats)
+    except Exception as e:
+        print(f"⚠️ Could not collect storage stats: {e}")
+        storage_stats = {"storage_stats_error": str(e)}
+
+    return {
+        "success": True,
+        "job_descriptions_count": len(job_storage),
+        "job_descriptions_uploaded": len(job_storage) > 0,
+        "resume_uploaded": resume_storage["current_resume"] is not None,
+        "ready_for_matching": (
+            len(job_storage) > 0 and resume_storage["current_resume"] is not None
+        ),
+        "executor": get_executor().get_stats(),
+        "groq_scheduler": get_groq_client().scheduler.get_stats(),
+        "singleflight": get_singleflight_stats(),
+        **storage_stats,
+        "job_index": get_job_index().get_stats(),
+        "timestamp": datetime.now().isoformat(),
+    }
+
+
+@router.get("/get-jobs")
+async def get_jobs():
+    """
+    Get all uploaded job descriptions with detailed information
+
+    Returns:
+        List of all job descriptions with their details
+    """
+    try:
+        if not job_storage:
+            return {
+                "success": True,
+                "message": "No job descriptions uploaded yet",
+                "jobs": [],
+                "total_count": 0,
+                "timestamp": datetime.now().isoformat(),
+            }
+
+        # Format job descriptions from the structured data stored at upload
+        jobs_list = [_job_to_response(job) for job in job_storage]
+
+        return {
+            "success": True,
+            "message": f"Found {len(job_storage)} job description(s)",
+            "jobs": jobs_list,
+            "total_count": len(job_storage),
+            "timestamp": datetime.now().isoformat(),
+        }
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error retrieving job descriptions: {str(e)}"
+        )
+
+
+@router.get("/get-job/{job_id}")
+async def get_job_by_id(job_id: int):
+    """
+    Get a specific job description by ID
 
     Args:
         job_id: The ID of the job description to retrieve
@@ -696,41 +1290,16 @@ async def get_job_by_id(job_id: int):
     """
     try:
         # Find job by ID
-        job = None
-        for j in job_storage:
-            if j["id"] == job_id:
-                job = j
-                break
+        job = _find_job(job_id)
 
         if not job:
             raise HTTPException(
                 status_code=404, detail=f"Job description with ID {job_id} not found"
             )
 
-        # Use Groq API to parse job description into structured JSON
-        groq_result = clean_job_description_text(job["text"])
-
         return {
             "success": True,
-            "job": {
-                "id": job["id"],
-                "filename": job.get("filename"),
-                "source_type": job["source_type"],
-                "uploaded_at": job["uploaded_at"],
-                "text_length": len(job["text"]),
-                "full_text": job["text"],
-                "document_type": job.get("document_type"),
-                "groq_structured_data": (
-                    groq_result.get("structured_data", {})
-                    if groq_result.get("success")
-                    else {}
-                ),
-                "groq_parsing_success": groq_result.get("success", False),
-                "groq_error": (
-                    groq_result.get("error") if not groq_result.get("success") else None
-                ),
-                "structured_data": job.get("structured_data", {}),
-            },
+            "job": _job_to_response(job),
             "timestamp": datetime.now().isoformat(),
         }
 
@@ -742,12 +1311,103 @@ async def get_job_by_id(job_id: int):
         )
 
 
+@router.post("/recommendations")
+async def recommend_jobs(
+    resume_file: Optional[UploadFile] = File(
+        None, description="Resume PDF (default: the uploaded resume)"
+    ),
+    top_k: int = Form(5, description="Number of jobs to recommend"),
+):
+    """
+    Recommend the stored jobs that best fit a resume
+
+    Jobs are ranked by TF-IDF similarity from the job index, without running
+    the matching pipeline or any Groq analysis, so results come back in
+    milliseconds. Use /get-score on a recommended job for the full analysis.
+
+    Args:
+        resume_file: PDF file containing resume (optional)
+        top_k: Number of jobs to return
+
+    Returns:
+        Ranked jobs with their similarity (0-100)
+    """
+    if top_k < 1:
+        raise HTTPException(status_code=400, detail="top_k must be at least 1")
+
+    if not job_storage:
+        raise HTTPException(status_code=400, detail="No job descriptions uploaded yet")
+
+    if resume_file is not None:
+        _validate_resume_upload(resume_file)
+        content = await resume_file.read()
+        extraction_result = await aextract_pdf_content(content, resume_file.filename)
+
+        if not extraction_result.get("success", False):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Failed to extract text from PDF: {extraction_result.get('error')}",
+            )
+
+        resume_text = extraction_result.get("raw_text", "")
+        resume_filename = resume_file.filename
+    elif resume_storage["current_resume"] is not None:
+        resume_text = resume_storage["current_resume"]["text"]
+        resume_filename = resume_storage["current_resume"]["filename"]
+    else:
+        raise HTTPException(status_code=400, detail="Resume not uploaded yet")
+
+    if not resume_text.strip():
+        raise HTTPException(
+            status_code=400, detail="No text content found in resume PDF"
+        )
+
+    try:
+        search = await get_executor().run_io(get_job_index().search, resume_text, top_k)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error recommending jobs: {str(e)}"
+        )
+
+    recommendations = []
+    for job_id, similarity in search.pop("results"):
+        job = _find_job(job_id)
+        if job is None:
+            continue
+        recommendations.append(
+            {
+                "rank": len(recommendations) + 1,
+                "job_id": job_id,
+                "position": job.get("structured_data", {}).get("job_title"),
+                "filename": job.get("filename"),
+                "similarity": round(similarity * 100, 2),
+            }
+        )
+
+    print(
+        f"🎯 Recommended {len(recommendations)} job(s) for {resume_filename} "
+        f"in {search['search_ms']}ms ({search['method']})"
+    )
+
+    return {
+        "success": True,
+        "resume_filename": resume_filename,
+        "recommendations": recommendations,
+        "search": search,
+        "timestamp": datetime.now().isoformat(),
+    }
+
+
 @router.post("/get-score")
+@_idempotent("get-score")
 async def get_matching_score(
     resume_file: UploadFile = File(
         ..., description="PDF file containing resume", media_type="application/pdf"
     ),
     job_id: str = Form(..., description="Job ID to match against"),
+    idempotency_key: Optional[str] = Header(
+        None, alias="Idempotency-Key", description="Collapses repeated submissions"
+    ),
 ):
     """
     Upload resume and get AI-powered matching analysis for a specific job
@@ -770,178 +1430,694 @@ async def get_matching_score(
         print(f"📄 Get-score request received for job_id: {job_id}")
         print(f"📄 Resume filename: {resume_file.filename}")
 
-        # Validate file type
-        if not resume_file.filename or not resume_file.filename.endswith(".pdf"):
-            raise HTTPException(status_code=400, detail="Only PDF files are allowed")
-
-        if resume_file.content_type not in [
-            "application/pdf",
-            "application/octet-stream",
-        ]:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid file type. Expected PDF, got {resume_file.content_type}",
-            )
+        _validate_resume_upload(resume_file)
 
         # Find job by job_id
-        job_data = None
-        for job in job_storage:
-            if job.get("id") == job_id:
-                job_data = job
-                break
+        job_data = _find_job(job_id)
 
         if not job_data:
             raise HTTPException(
                 status_code=404, detail=f"Job with ID {job_id} not found"
             )
 
-        # Save file temporarily and extract text
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-            content = await resume_file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
+        content = await resume_file.read()
 
-        try:
-            # Extract text from resume PDF
-            extraction_service = PDFExtractionService()
-            extraction_result = extraction_service.extract_pdf_text(temp_file_path)
+        # Extraction, cleaning and Groq AI analysis, raced against the local
+        # matching engine within the latency budget
+        analysis_response = await _match_within_latency_budget(
+            job_data,
+            functools.partial(
+                _build_score_response, job_id, job_data, resume_file.filename
+            ),
+            resume_pdf=content,
+            resume_filename=resume_file.filename,
+        )
 
-            if not extraction_result.get("success", False):
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Failed to extract text from PDF: {extraction_result.get('error')}",
-                )
+        print(
+            f"🎉 Analysis completed! Match Score: {analysis_response.get('score', 'N/A')}% "
+            f"({analysis_response['analysis_source']})"
+        )
 
-            resume_text = extraction_result.get("raw_text", "")
+        return analysis_response
 
-            if not resume_text.strip():
-                raise HTTPException(
-                    status_code=400, detail="No text content found in resume PDF"
-                )
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Error in get-score endpoint: {str(e)}")
+        import traceback
+
+        traceback.print_exc()
+        raise HTTPException(
+            status_code=500, detail=f"Error calculating score: {str(e)}"
+        )
 
-            print(f"✅ Resume extracted. Length: {len(resume_text)} characters")
 
-            # Get job description text
-            jd_text = job_data["text"]
-            print(f"✅ Job description found. Length: {len(jd_text)} characters")
+def _sse_event(event: str, data: Any) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
 
-            # Stage 1: Data Cleaning with Groq
-            print("🧹 Cleaning data with Groq...")
 
-            # Clean job description
-            jd_cleaning_result = clean_job_description_text(jd_text)
-            if not jd_cleaning_result.get("success", False):
-                print("⚠️ JD cleaning failed, using raw text")
-                cleaned_jd_text = jd_text
-            else:
-                structured_jd = jd_cleaning_result.get("structured_data", {})
-                cleaned_jd_text = _create_text_from_structured_data(
-                    structured_jd, jd_text
-                )
+def _stage_event_data(stage_name: str, result: Any) -> Dict[str, Any]:
+    """Summarise a finished pipeline stage for the event stream"""
+    if stage_name == "resume_extraction":
+        return {
+            "text_length": len(result["raw_text"]),
+            "structured_data": result["structured_data"],
+        }
+    if stage_name == "jd_structuring":
+        return {"structured_data": result["structured_data"]}
+    if stage_name == "resume_cleaning":
+        return {
+            "success": result["success"],
+            "structured_data": result["structured_data"],
+        }
+    if stage_name == "local_matching":
+        if not result.get("success", False):
+            return {"success": False, "error": result.get("error")}
+        return _local_analysis_result(result)
+    return {"success": result.get("success", False)}
+
+
+def _stream_matching_pipeline(
+    job: Dict[str, Any],
+    build_response: Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]],
+    **resume_source,
+) -> StreamingResponse:
+    """
+    Run the matching pipeline and stream its progress as Server-Sent Events:
+    one "stage" event per finished stage (extracted text, structured JD and
+    resume, local match score), then a "result" event carrying the usual
+    endpoint response, or an "error" event
+    """
+
+    async def events():
+        stage_events: asyncio.Queue = asyncio.Queue()
 
-            # Clean resume
-            resume_cleaning_result = clean_resume_text(resume_text)
-            if not resume_cleaning_result.get("success", False):
-                print("⚠️ Resume cleaning failed, using raw text")
-                cleaned_resume_text = resume_text
-            else:
-                structured_resume = resume_cleaning_result.get("structured_data", {})
-                cleaned_resume_text = _create_text_from_structured_data(
-                    structured_resume, resume_text
+        def on_stage_complete(stage_name: str, result: Any, elapsed: float):
+            _log_stage_completion(stage_name, result, elapsed)
+            stage_events.put_nowait(
+                {
+                    "stage": stage_name,
+                    "elapsed": round(elapsed, 3),
+                    "data": _stage_event_data(stage_name, result),
+                }
+            )
+
+        pipeline_task = asyncio.ensure_future(
+            _run_matching_pipeline(
+                job, on_stage_complete=on_stage_complete, **resume_source
+            )
+        )
+
+        try:
+            while not (pipeline_task.done() and stage_events.empty()):
+                next_event = asyncio.ensure_future(stage_events.get())
+                await asyncio.wait(
+                    {pipeline_task, next_event}, return_when=asyncio.FIRST_COMPLETED
                 )
+                if next_event.done():
+                    yield _sse_event("stage", next_event.result())
+                else:
+                    next_event.cancel()
+
+            stage_results = pipeline_task.result()
+            yield _sse_event(
+                "result", build_response(_select_analysis(stage_results), stage_results)
+            )
+
+        except HTTPException as e:
+            yield _sse_event(
+                "error", {"status_code": e.status_code, "detail": e.detail}
+            )
+        except Exception as e:
+            print(f"❌ Error in matching stream: {str(e)}")
+            yield _sse_event("error", {"status_code": 500, "detail": str(e)})
+        finally:
+            # Client went away or the stream ended: nothing left to wait for
+            pipeline_task.cancel()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/match/stream")
+async def stream_matching():
+    """
+    Streaming variant of /match: stage-by-stage progress as Server-Sent Events
+
+    Returns:
+        text/event-stream of "stage" events followed by a "result" event
+    """
+    if not job_storage:
+        raise HTTPException(status_code=400, detail="No job descriptions uploaded yet")
+
+    if resume_storage["current_resume"] is None:
+        raise HTTPException(status_code=400, detail="Resume not uploaded yet")
 
-            print("✅ Data cleaning completed")
+    jd_data = job_storage[-1]
+    resume_data = resume_storage["current_resume"]
 
-            # Stage 2: Direct Groq AI Analysis
-            print("🤖 Performing direct Groq AI matching analysis...")
+    return _stream_matching_pipeline(
+        jd_data,
+        functools.partial(_build_match_response, jd_data, resume_data),
+        resume=resume_data,
+    )
+
+
+@router.post("/get-score/stream")
+async def stream_matching_score(
+    resume_file: UploadFile = File(
+        ..., description="PDF file containing resume", media_type="application/pdf"
+    ),
+    job_id: str = Form(..., description="Job ID to match against"),
+):
+    """
+    Streaming variant of /get-score: stage-by-stage progress as Server-Sent Events
+
+    Returns:
+        text/event-stream of "stage" events followed by a "result" event
+    """
+    _validate_resume_upload(resume_file)
+
+    job_data = _find_job(job_id)
+
+    if not job_data:
+        raise HTTPException(status_code=404, detail=f"Job with ID {job_id} not found")
+
+    content = await resume_file.read()
+
+    return _stream_matching_pipeline(
+        job_data,
+        functools.partial(
+            _build_score_response, job_id, job_data, resume_file.filename
+        ),
+        resume_pdf=content,
+        resume_filename=resume_file.filename,
+    )
+
+
+def _is_resume_pdf_name(filename: str) -> bool:
+    """Whether an archive entry looks like a resume PDF (skips folders and macOS metadata)"""
+    name = filename.replace("\\", "/")
+    basename = name.rsplit("/", 1)[-1]
+    return (
+        name.lower().endswith(".pdf")
+        and not name.startswith("__MACOSX/")
+        and not basename.startswith(".")
+    )
 
-            # Import the AI extractor
+
+def _read_archive_member(archive: zipfile.ZipFile, member: zipfile.ZipInfo) -> bytes:
+    """Decompress one archive member, refusing oversized ones before inflating them"""
+    if member.file_size > BULK_MAX_RESUME_BYTES:
+        raise ValueError(
+            f"File size too large ({member.file_size / (1024 * 1024):.2f}MB). "
+            "Maximum allowed size is 1MB."
+        )
+    return archive.read(member)
+
+
+def _collect_bulk_resumes(
+    uploads: List[Tuple[str, bytes]],
+) -> List[Tuple[str, Callable[[], bytes]]]:
+    """
+    Expand uploaded PDFs and ZIP archives into (filename, loader) pairs.
+    Archive members are only decompressed when the pipeline asks for them.
+    """
+    resumes: List[Tuple[str, Callable[[], bytes]]] = []
+
+    for filename, content in uploads:
+        if filename.lower().endswith(".zip"):
             try:
-                from app.services.matching.extract import analyze_resume_job_match
-            except ImportError as e:
-                print(f"❌ Failed to import AI extractor: {e}")
+                archive = zipfile.ZipFile(io.BytesIO(content))
+            except zipfile.BadZipFile:
                 raise HTTPException(
-                    status_code=500, detail="AI analysis module not available"
+                    status_code=400, detail=f"{filename} is not a valid ZIP archive"
                 )
-
-            # Get candidate name and job title for better analysis
-            candidate_name = None
-            job_title = (
-                job_data.get("structured_data", {}).get("job_title")
-                or "Unknown Position"
+            for member in archive.infolist():
+                if not member.is_dir() and _is_resume_pdf_name(member.filename):
+                    resumes.append(
+                        (
+                            member.filename.rsplit("/", 1)[-1],
+                            functools.partial(_read_archive_member, archive, member),
+                        )
+                    )
+        elif filename.lower().endswith(".pdf"):
+            resumes.append((filename, functools.partial(bytes, content)))
+        else:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Only PDF files and ZIP archives are allowed, got {filename}",
             )
 
-            # Try to extract candidate name from resume data
-            if resume_cleaning_result.get("success", False):
-                structured_resume = resume_cleaning_result.get("structured_data", {})
-                candidate_name = structured_resume.get("name") or structured_resume.get(
-                    "full_name"
-                )
+    return resumes
 
-            # Perform direct Groq AI analysis
-            matching_result = analyze_resume_job_match(
-                resume_text=cleaned_resume_text,
-                job_description_text=cleaned_jd_text,
-                candidate_name=candidate_name,
-                job_title=job_title,
-            )
 
-            if not matching_result.get("success", False):
-                print(f"⚠️ AI analysis failed, but continuing with available results")
+def _candidate_name(candidate: Dict[str, Any]) -> Optional[str]:
+    """Candidate name from the cleaned resume, else the local PDF structuring"""
+    structured_resume = candidate.get("cleaning", {}).get("structured_data", {})
+    personal_info = candidate.get("structured_data", {}).get("personal_info") or {}
+    return (
+        structured_resume.get("name")
+        or structured_resume.get("full_name")
+        or personal_info.get("name")
+    )
 
-            print("✅ Direct Groq AI matching completed")
 
-            # Return the full AI analysis result with additional metadata
-            analysis_response = {
-                **matching_result,  # Include all extract.py results
-                "job_id": job_id,
-                "job_info": {
-                    "company": job_data.get("structured_data", {}).get("company")
-                    or "Unknown Company",
-                    "position": job_data.get("structured_data", {}).get("job_title")
-                    or job_data.get("filename", "Unknown Position"),
-                },
-                "resume_info": {
-                    "filename": resume_file.filename,
-                    "text_length": len(resume_text),
-                },
-                "processing_metadata": {
-                    "data_cleaning_performed": True,
-                    "ai_analysis_used": True,
-                    "model_version": "groq-llama-3.1-8b-instant",
-                    "matching_approach": "direct_groq_ai",
-                },
+def _bulk_candidate_line(
+    index: int, filename: str, entry: Any, timings: Dict[str, float]
+) -> Dict[str, Any]:
+    """NDJSON record for one screened candidate"""
+    timings = {stage: round(elapsed, 3) for stage, elapsed in timings.items()}
+
+    if entry.error is not None:
+        detail = (
+            entry.error.detail
+            if isinstance(entry.error, HTTPException)
+            else str(entry.error)
+        )
+        return {
+            "type": "candidate",
+            "index": index,
+            "filename": filename,
+            "success": False,
+            "failed_stage": entry.failed_stage,
+            "error": detail,
+            "timings": timings,
+        }
+
+    candidate = entry.value
+    analysis = candidate["analysis"]
+    overall_assessment = analysis.get("overall_assessment", {})
+    skill_analysis = analysis.get("skill_analysis", {})
+    local_result = candidate.get("local_match") or {}
+
+    return {
+        "type": "candidate",
+        "index": index,
+        "filename": filename,
+        "success": True,
+        "candidate_name": _candidate_name(candidate),
+        "score": overall_assessment.get("match_score", 0),
+        "verdict": overall_assessment.get("suitability_level", "Unknown"),
+        "analysis_source": analysis["analysis_source"],
+        "decided_by": candidate["decided_by"],
+        "local_score": local_result.get("relevance_score"),
+        "matched_skills": skill_analysis.get("matched_skills", []),
+        "missing_skills": skill_analysis.get("missing_critical_skills", []),
+        "summary": overall_assessment.get("summary"),
+        "recommendation": analysis.get("recommendation", {}),
+        "text_length": len(candidate["raw_text"]),
+        "timings": timings,
+    }
+
+
+def _bulk_summary(
+    job_id: str,
+    lines: List[Dict[str, Any]],
+    elapsed: float,
+    cascade: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Final NDJSON record: candidates ranked by score, failures listed last.
+    In cascade mode, candidates rejected by the local prefilter rank below
+    every candidate that reached the Groq stage.
+    """
+    screened = sorted(
+        (line for line in lines if line["success"]),
+        key=lambda line: (
+            line["decided_by"] != "local_prefilter",
+            line["score"] or 0,
+        ),
+        reverse=True,
+    )
+    failed = [line for line in lines if not line["success"]]
+
+    summary = {
+        "type": "summary",
+        "job_id": job_id,
+        "mode": "cascade" if cascade is not None else "full",
+        "total": len(lines),
+        "succeeded": len(screened),
+        "failed": len(failed),
+        "elapsed_seconds": round(elapsed, 3),
+        "ranking": [
+            {
+                "rank": rank,
+                "filename": line["filename"],
+                "candidate_name": line["candidate_name"],
+                "score": line["score"],
+                "verdict": line["verdict"],
+                "analysis_source": line["analysis_source"],
+                "decided_by": line["decided_by"],
             }
+            for rank, line in enumerate(screened, start=1)
+        ],
+        "failures": [
+            {"filename": line["filename"], "error": line["error"]} for line in failed
+        ],
+        "timestamp": datetime.now().isoformat(),
+    }
+
+    if cascade is not None:
+        summary["cascade"] = cascade
+
+    return summary
+
+
+async def _screen_extract(resume: Tuple[str, Callable[[], bytes]]) -> Dict[str, Any]:
+    """Bulk screening stage: PDF → text and local structure"""
+    filename, load = resume
+    content = load()
+
+    if len(content) > BULK_MAX_RESUME_BYTES:
+        raise ValueError(
+            f"File size too large ({len(content) / (1024 * 1024):.2f}MB). "
+            "Maximum allowed size is 1MB."
+        )
+
+    extraction_result = await aextract_pdf_content(content, filename)
+
+    if not extraction_result.get("success", False):
+        raise ValueError(
+            f"Failed to extract text from PDF: {extraction_result.get('error')}"
+        )
+
+    resume_text = extraction_result.get("raw_text", "")
+    if not resume_text.strip():
+        raise ValueError("No text content found in resume PDF")
+
+    return {
+        "raw_text": resume_text,
+        "structured_data": extraction_result.get("structured_data", {}),
+    }
+
+
+async def _screen_clean(candidate: Dict[str, Any]) -> Dict[str, Any]:
+    """Bulk screening stage: Groq resume cleaning"""
+    candidate["cleaning"] = await _clean_resume_for_matching(candidate["raw_text"])
+    return candidate
+
+
+async def _screen_local_score(
+    jd_inputs: Dict[str, Any], candidate: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Bulk screening stage: local hard + semantic score only"""
+    candidate["local_match"] = await _local_match(candidate["raw_text"], jd_inputs)
+    return candidate
+
+
+async def _screen_llm_score(
+    jd_inputs: Dict[str, Any], candidate: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Bulk screening stage: Groq analysis, plus the local score when no earlier
+    stage computed it
+    """
+    if "local_match" in candidate:
+        ai_result = await _analyze_cleaned_resume(jd_inputs, candidate["cleaning"])
+    else:
+        candidate["local_match"], ai_result = await asyncio.gather(
+            _local_match(candidate["raw_text"], jd_inputs),
+            _analyze_cleaned_resume(jd_inputs, candidate["cleaning"]),
+        )
+
+    candidate["analysis"] = _select_analysis(
+        {"local_matching": candidate["local_match"], "ai_analysis": ai_result}
+    )
+    candidate["decided_by"] = (
+        "llm_analysis"
+        if candidate["analysis"]["analysis_source"] == "groq_ai"
+        else "local_fallback"
+    )
+    return candidate
+
+
+def _select_cascade_candidates(
+    entries: List[Any], top_k: Optional[int], min_local_score: Optional[float]
+) -> Tuple[List[Any], List[Any]]:
+    """
+    Split prefiltered candidates into (forwarded, rejected). A candidate is
+    forwarded when it is within top_k and at or above min_local_score (each
+    limit applies only when set). Candidates the local engine could not
+    score are always forwarded.
+    """
+    unscored = [e for e in entries if not e.value["local_match"].get("success")]
+    ranked = sorted(
+        (e for e in entries if e.value["local_match"].get("success")),
+        key=lambda e: e.value["local_match"]["relevance_score"],
+        reverse=True,
+    )
+
+    forwarded, rejected = list(unscored), []
+    for rank, entry in enumerate(ranked):
+        within_k = top_k is None or rank < top_k
+        above_threshold = (
+            min_local_score is None
+            or entry.value["local_match"]["relevance_score"] >= min_local_score
+        )
+        (forwarded if within_k and above_threshold else rejected).append(entry)
+
+    return forwarded, rejected
+
+
+async def _run_full_screening(jd_inputs: Dict[str, Any], resumes: List[Any]):
+    """Extraction → cleaning → scoring for every resume; yields candidate lines"""
+    pipeline = (
+        StreamingPipeline("bulk_screening", queue_size=BULK_QUEUE_SIZE)
+        .add_stage("extraction", _screen_extract, BULK_EXTRACTION_WORKERS)
+        .add_stage("cleaning", _screen_clean, BULK_CLEANING_WORKERS)
+        .add_stage(
+            "scoring",
+            functools.partial(_screen_llm_score, jd_inputs),
+            BULK_SCORING_WORKERS,
+        )
+    )
+
+    async for entry in pipeline.run(resumes):
+        yield _bulk_candidate_line(entry.index, entry.item[0], entry, entry.timings)
+
+
+async def _run_cascade_screening(
+    jd_inputs: Dict[str, Any],
+    resumes: List[Any],
+    top_k: Optional[int],
+    min_local_score: Optional[float],
+    cascade_stats: Dict[str, Any],
+):
+    """
+    Two-stage screening; yields candidate lines.
+
+    Stage 1 extracts and scores every resume locally. Candidates outside the
+    cut are reported straight away (decided_by "local_prefilter"); the rest
+    go through Groq cleaning and analysis (decided_by "llm_analysis", or
+    "local_fallback" if Groq fails).
+    """
+    start = datetime.now()
+    prefilter = (
+        StreamingPipeline("bulk_prefilter", queue_size=BULK_QUEUE_SIZE)
+        .add_stage("extraction", _screen_extract, BULK_EXTRACTION_WORKERS)
+        .add_stage(
+            "local_scoring",
+            functools.partial(_screen_local_score, jd_inputs),
+            BULK_EXTRACTION_WORKERS,
+        )
+    )
+
+    prefiltered = []
+    async for entry in prefilter.run(resumes):
+        if entry.error is not None:
+            yield _bulk_candidate_line(entry.index, entry.item[0], entry, entry.timings)
+        else:
+            prefiltered.append(entry)
+
+    forwarded, rejected = _select_cascade_candidates(
+        prefiltered, top_k, min_local_score
+    )
+    cascade_stats.update(
+        prefilter_seconds=round((datetime.now() - start).total_seconds(), 3),
+        forwarded=len(forwarded),
+        rejected_by_prefilter=len(rejected),
+    )
+    print(
+        f"🔎 Prefilter kept {len(forwarded)} of {len(prefiltered)} candidate(s) "
+        "for AI analysis"
+    )
+
+    for entry in rejected:
+        entry.value["analysis"] = _local_analysis_result(
+            entry.value["local_match"], provisional=False
+        )
+        entry.value["decided_by"] = "local_prefilter"
+        yield _bulk_candidate_line(entry.index, entry.item[0], entry, entry.timings)
+
+    start = datetime.now()
+    analysis = (
+        StreamingPipeline("bulk_analysis", queue_size=BULK_QUEUE_SIZE)
+        .add_stage("cleaning", _screen_clean, BULK_CLEANING_WORKERS)
+        .add_stage(
+            "scoring",
+            functools.partial(_screen_llm_score, jd_inputs),
+            BULK_SCORING_WORKERS,
+        )
+    )
+
+    async for entry in analysis.run([e.value for e in forwarded]):
+        original = forwarded[entry.index]
+        yield _bulk_candidate_line(
+            original.index,
+            original.item[0],
+            entry,
+            {**original.timings, **entry.timings},
+        )
+
+    cascade_stats["llm_seconds"] = round((datetime.now() - start).total_seconds(), 3)
+
+
+@router.post("/screening/bulk")
+async def bulk_screen_resumes(
+    resume_files: List[UploadFile] = File(
+        ..., description="Resume PDFs and/or ZIP archives of resume PDFs"
+    ),
+    job_id: str = Form(..., description="Job ID to screen against"),
+    mode: str = Form(
+        "full", description="'full' (Groq for everyone) or 'cascade' (local prefilter)"
+    ),
+    top_k: Optional[int] = Form(
+        None, description="Cascade: forward at most this many candidates to Groq"
+    ),
+    min_local_score: Optional[float] = Form(
+        None, description="Cascade: forward only candidates with this local score"
+    ),
+):
+    """
+    Screen many resumes against one job
+
+    Resumes flow through extraction, cleaning and scoring stages that run
+    concurrently with bounded queues between them. The response is NDJSON:
+    one "candidate" line per resume as soon as it is scored, then a
+    "summary" line ranking every candidate.
+
+    In cascade mode every resume is first scored by the local matching
+    engine, and only the top_k and/or min_local_score candidates reach the
+    Groq analysis. Each line reports which stage decided it ("decided_by").
+
+    Args:
+        resume_files: PDF files and/or ZIP archives containing PDFs
+        job_id: ID of the job description to screen against
+        mode: "full" or "cascade"
+        top_k: Cascade cut by rank (default: BULK_CASCADE_TOP_K if no threshold)
+        min_local_score: Cascade cut by local score (0-100)
+
+    Returns:
+        application/x-ndjson stream
+    """
+    if mode not in ("full", "cascade"):
+        raise HTTPException(status_code=400, detail="mode must be 'full' or 'cascade'")
+
+    if top_k is not None and top_k < 0:
+        raise HTTPException(status_code=400, detail="top_k must not be negative")
+
+    if mode == "cascade" and top_k is None and min_local_score is None:
+        top_k = BULK_CASCADE_TOP_K
+
+    job_data = _find_job(job_id)
+
+    if not job_data:
+        raise HTTPException(status_code=404, detail=f"Job with ID {job_id} not found")
+
+    uploads = [
+        (upload.filename or "resume.pdf", await upload.read())
+        for upload in resume_files
+    ]
+    resumes = _collect_bulk_resumes(uploads)
+
+    if not resumes:
+        raise HTTPException(status_code=400, detail="No resume PDFs found in upload")
+
+    if len(resumes) > BULK_MAX_RESUMES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many resumes ({len(resumes)}). Maximum is {BULK_MAX_RESUMES}.",
+        )
 
-            print(
-                f"🎉 Direct Groq AI analysis completed! Match Score: {matching_result.get('score', 'N/A')}%"
+    # The job description is structured once for the whole batch
+    jd_inputs = await _job_match_inputs(job_data)
+    print(f"📦 Bulk screening {len(resumes)} resume(s) against job {job_id} ({mode})")
+
+    async def lines():
+        start = datetime.now()
+        candidate_lines: List[Dict[str, Any]] = []
+        cascade_stats: Optional[Dict[str, Any]] = None
+
+        if mode == "cascade":
+            cascade_stats = {"top_k": top_k, "min_local_score": min_local_score}
+            candidates = _run_cascade_screening(
+                jd_inputs, resumes, top_k, min_local_score, cascade_stats
             )
+        else:
+            candidates = _run_full_screening(jd_inputs, resumes)
 
-            return analysis_response
+        async for line in candidates:
+            candidate_lines.append(line)
+            yield json.dumps(line, default=str) + "\n"
 
-        finally:
-            # Clean up temp file
-            if os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
+        elapsed = (datetime.now() - start).total_seconds()
+        print(f"✅ Bulk screening finished in {elapsed:.1f}s")
+        summary = _bulk_summary(job_id, candidate_lines, elapsed, cascade_stats)
+        yield json.dumps(summary, default=str) + "\n"
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"❌ Error in get-score endpoint: {str(e)}")
-        import traceback
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-        traceback.print_exc()
+
+@router.get("/analysis/{analysis_id}")
+async def get_pending_analysis(analysis_id: str):
+    """
+    Poll an analysis that missed the latency budget
+
+    Args:
+        analysis_id: pending_analysis_id returned by /match or /get-score
+
+    Returns:
+        Status ("pending", "completed" or "failed") and, once completed, the
+        full response the original request would have returned
+    """
+    entry = pending_analyses.get(analysis_id)
+
+    if entry is None:
         raise HTTPException(
-            status_code=500, detail=f"Error calculating score: {str(e)}"
+            status_code=404, detail=f"Analysis with ID {analysis_id} not found"
         )
 
+    return {
+        "success": entry["status"] != "failed",
+        "analysis_id": analysis_id,
+        "status": entry["status"],
+        "created_at": entry["created_at"],
+        "completed_at": entry.get("completed_at"),
+        "result": entry["result"],
+        "error": entry["error"],
+        "timestamp": datetime.now().isoformat(),
+    }
+
 
 @router.post("/ai-analyze")
+@_idempotent("ai-analyze")
 async def ai_powered_analysis(
     resume_text: str = Form(..., description="Raw resume text"),
     job_description_text: str = Form(..., description="Raw job description text"),
     candidate_name: Optional[str] = Form(None, description="Optional candidate name"),
     job_title: Optional[str] = Form(None, description="Optional job title"),
+    idempotency_key: Optional[str] = Header(
+        None, alias="Idempotency-Key", description="Collapses repeated submissions"
+    ),
 ):
     """
     AI-powered comprehensive resume-job matching analysis
@@ -960,28 +2136,10 @@ async def ai_powered_analysis(
         print(f"📄 Resume length: {len(resume_text)} characters")
         print(f"📄 Job description length: {len(job_description_text)} characters")
 
-        # Import the AI extractor
-        try:
-            from app.services.matching.extract import analyze_resume_job_match
-        except ImportError:
-            raise HTTPException(
-                status_code=500, detail="AI analysis module not available"
-            )
-
-        # Perform AI-powered analysis
-        analysis_result = analyze_resume_job_match(
-            resume_text=resume_text,
-            job_description_text=job_description_text,
-            candidate_name=candidate_name,
-            job_title=job_title,
+        analysis_result = await _run_ai_analysis(
+            resume_text, job_description_text, candidate_name, job_title
         )
 
-        if not analysis_result.get("success", False):
-            # Return fallback results but still indicate it's not full AI analysis
-            analysis_result["note"] = (
-                "AI analysis unavailable, showing basic keyword matching results"
-            )
-
         print("✅ AI analysis completed successfully")
         return analysis_result
 
@@ -995,16 +2153,252 @@ async def ai_powered_analysis(
         raise HTTPException(status_code=500, detail=f"Error in AI analysis: {str(e)}")
 
 
+async def _run_ai_analysis(
+    resume_text: str,
+    job_description_text: str,
+    candidate_name: Optional[str] = None,
+    job_title: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Run the Groq analysis behind /ai-analyze"""
+    # Perform AI-powered analysis
+    analysis_result = await analyze_resume_job_match(
+        resume_text=resume_text,
+        job_description_text=job_description_text,
+        candidate_name=candidate_name,
+        job_title=job_title,
+    )
+
+    if not analysis_result.get("success", False):
+        # Return fallback results but still indicate it's not full AI analysis
+        analysis_result["note"] = (
+            "AI analysis unavailable, showing basic keyword matching results"
+        )
+
+    return analysis_result
+
+
+# Stages reported by background jobs that run the matching pipeline
+MATCHING_STAGES = (
+    "resume_extraction",
+    "jd_structuring",
+    "resume_cleaning",
+    "local_matching",
+    "ai_analysis",
+)
+
+
+def _progress_reporter(progress: Callable[..., Awaitable[None]]):
+    """Adapt a job progress callback to the pipeline's on_stage_complete"""
+
+    async def on_stage_complete(stage_name: str, result: Any, elapsed: float):
+        _log_stage_completion(stage_name, result, elapsed)
+        await progress(stage_name, "completed", elapsed)
+
+    return on_stage_complete
+
+
+async def _score_job_handler(
+    payload: Dict[str, Any],
+    attachment: Optional[bytes],
+    progress: Callable[..., Awaitable[None]],
+) -> Dict[str, Any]:
+    """Run a background /get-score job"""
+    job_data = payload["job"]
+    stage_results = await _run_matching_pipeline(
+        job_data,
+        resume_pdf=attachment,
+        resume_filename=payload["resume_filename"],
+        on_stage_complete=_progress_reporter(progress),
+    )
+    return _build_score_response(
+        payload["job_id"],
+        job_data,
+        payload["resume_filename"],
+        _select_analysis(stage_results),
+        stage_results,
+    )
+
+
+async def _match_job_handler(
+    payload: Dict[str, Any],
+    attachment: Optional[bytes],
+    progress: Callable[..., Awaitable[None]],
+) -> Dict[str, Any]:
+    """Run a background /match job"""
+    jd_data, resume_data = payload["job"], payload["resume"]
+    stage_results = await _run_matching_pipeline(
+        jd_data, resume=resume_data, on_stage_complete=_progress_reporter(progress)
+    )
+    return _build_match_response(
+        jd_data, resume_data, _select_analysis(stage_results), stage_results
+    )
+
+
+async def _ai_analysis_job_handler(
+    payload: Dict[str, Any],
+    attachment: Optional[bytes],
+    progress: Callable[..., Awaitable[None]],
+) -> Dict[str, Any]:
+    """Run a background /ai-analyze job"""
+    start = datetime.now()
+    analysis_result = await _run_ai_analysis(**payload)
+    await progress("ai_analysis", "completed", (datetime.now() - start).total_seconds())
+    return analysis_result
+
+
+get_analysis_queue().register_handler("get-score", _score_job_handler, MATCHING_STAGES)
+get_analysis_queue().register_handler("match", _match_job_handler, MATCHING_STAGES)
+get_analysis_queue().register_handler(
+    "ai-analyze", _ai_analysis_job_handler, ("ai_analysis",)
+)
+
+
+async def _submit_analysis_job(
+    kind: str, payload: Dict[str, Any], attachment: Optional[bytes] = None
+) -> JSONResponse:
+    """Queue a background analysis job and answer 202 Accepted"""
+    try:
+        analysis_job_id = await get_analysis_queue().submit(kind, payload, attachment)
+    except AnalysisQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    print(f"📥 Queued {kind} analysis job {analysis_job_id}")
+    return JSONResponse(
+        status_code=202,
+        content={
+            "success": True,
+            "analysis_job_id": analysis_job_id,
+            "status": "queued",
+            "status_url": f"/api/analysis-jobs/{analysis_job_id}",
+            "timestamp": datetime.now().isoformat(),
+        },
+    )
+
+
+@router.post("/analysis-jobs/get-score", status_code=202)
+@_idempotent("analysis-jobs/get-score")
+async def submit_score_job(
+    resume_file: UploadFile = File(
+        ..., description="PDF file containing resume", media_type="application/pdf"
+    ),
+    job_id: str = Form(..., description="Job ID to match against"),
+    idempotency_key: Optional[str] = Header(
+        None, alias="Idempotency-Key", description="Collapses repeated submissions"
+    ),
+):
+    """
+    Queue a /get-score analysis in the background
+
+    Returns:
+        202 Accepted with the analysis job id to poll
+    """
+    _validate_resume_upload(resume_file)
+
+    job_data = _find_job(job_id)
+
+    if not job_data:
+        raise HTTPException(status_code=404, detail=f"Job with ID {job_id} not found")
+
+    content = await resume_file.read()
+
+    # The job record is copied into the payload so the analysis can resume
+    # after a restart even though job storage is in memory
+    return await _submit_analysis_job(
+        "get-score",
+        {"job_id": job_id, "job": job_data, "resume_filename": resume_file.filename},
+        content,
+    )
+
+
+@router.post("/analysis-jobs/match", status_code=202)
+@_idempotent("analysis-jobs/match")
+async def submit_match_job(
+    idempotency_key: Optional[str] = Header(
+        None, alias="Idempotency-Key", description="Collapses repeated submissions"
+    ),
+):
+    """
+    Queue a /match analysis of the uploaded job description and resume
+
+    Returns:
+        202 Accepted with the analysis job id to poll
+    """
+    if not job_storage:
+        raise HTTPException(status_code=400, detail="No job descriptions uploaded yet")
+
+    if resume_storage["current_resume"] is None:
+        raise HTTPException(status_code=400, detail="Resume not uploaded yet")
+
+    return await _submit_analysis_job(
+        "match", {"job": job_storage[-1], "resume": resume_storage["current_resume"]}
+    )
+
+
+@router.post("/analysis-jobs/ai-analyze", status_code=202)
+@_idempotent("analysis-jobs/ai-analyze")
+async def submit_ai_analysis_job(
+    resume_text: str = Form(..., description="Raw resume text"),
+    job_description_text: str = Form(..., description="Raw job description text"),
+    candidate_name: Optional[str] = Form(None, description="Optional candidate name"),
+    job_title: Optional[str] = Form(None, description="Optional job title"),
+    idempotency_key: Optional[str] = Header(
+        None, alias="Idempotency-Key", description="Collapses repeated submissions"
+    ),
+):
+    """
+    Queue an /ai-analyze analysis in the background
+
+    Returns:
+        202 Accepted with the analysis job id to poll
+    """
+    return await _submit_analysis_job(
+        "ai-analyze",
+        {
+            "resume_text": resume_text,
+            "job_description_text": job_description_text,
+            "candidate_name": candidate_name,
+            "job_title": job_title,
+        },
+    )
+
+
+@router.get("/analysis-jobs/{analysis_job_id}")
+async def get_analysis_job(analysis_job_id: str):
+    """
+    Get the status, per-stage progress and result of a background analysis
+
+    Args:
+        analysis_job_id: Id returned when the job was queued
+
+    Returns:
+        Status ("queued", "running", "completed" or "failed"), stage progress,
+        and the endpoint's usual response once completed
+    """
+    job = await get_analysis_queue().get(analysis_job_id)
+
+    if job is None:
+        raise HTTPException(
+            status_code=404, detail=f"Analysis job {analysis_job_id} not found"
+        )
+
+    return {"success": job["status"] != "failed", **job}
+
+
 @router.delete("/reset")
 async def reset_uploads():
     """
     Reset all uploads (clear stored data)
 
+    Clears the stored jobs, the resume and the uploaded documents kept for
+    fitting the TF-IDF model. Models already fitted stay in use.
+
     Returns:
         Success message
     """
     job_storage.clear()
+    get_job_index().clear()
     resume_storage["current_resume"] = None
+    await get_executor().run_io(get_tfidf_model_manager().clear)
 
     return {
         "success": True,
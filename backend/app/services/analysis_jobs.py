@@ -0,0 +1,455 @@
+"""
+Background Analysis Jobs
+SQLite-backed queue of long-running analyses, processed by a bounded pool of
+async workers so clients can poll for results instead of holding a request open
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from app.services.executor import get_executor
+
+# Reports progress of one stage: (stage_name, status, elapsed_seconds)
+ProgressCallback = Callable[[str, str, Optional[float]], Awaitable[None]]
+# Runs a job: (payload, attachment, progress) -> result
+JobHandler = Callable[
+    [Dict[str, Any], Optional[bytes], ProgressCallback], Awaitable[Any]
+]
+
+
+class AnalysisQueueFullError(RuntimeError):
+    """Raised when too many analysis jobs are already waiting"""
+
+
+class AnalysisJobStore:
+    """
+    SQLite persistence for analysis jobs. Every status and stage change is
+    written through, so queued and running jobs can be resumed after a restart.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize the store
+
+        Args:
+            path: SQLite file location
+        """
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Get or create the SQLite connection and schema"""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS analysis_jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    attachment BLOB,
+                    stages TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    completed_at REAL
+                )
+                """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_analysis_jobs_status "
+                "ON analysis_jobs (status, created_at)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def insert(
+        self,
+        job_id: str,
+        kind: str,
+        payload: Dict[str, Any],
+        attachment: Optional[bytes],
+        stages: Sequence[str],
+    ):
+        """Store a new queued job"""
+        stage_state = {name: {"status": "pending", "elapsed": None} for name in stages}
+        with self._lock:
+            conn = self._get_connection()
+            conn.execute(
+                "INSERT INTO analysis_jobs "
+                "(id, kind, status, payload, attachment, stages, created_at) "
+                "VALUES (?, ?, 'queued', ?, ?, ?, ?)",
+                (
+                    job_id,
+                    kind,
+                    json.dumps(payload, default=str),
+                    attachment,
+                    json.dumps(stage_state),
+                    time.time(),
+                ),
+            )
+            conn.commit()
+
+    def mark_running(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Move a queued job to running and return it with its inputs"""
+        with self._lock:
+            conn = self._get_connection()
+            conn.execute(
+                "UPDATE analysis_jobs SET status = 'running', started_at = ?, "
+                "attempts = attempts + 1 WHERE id = ? AND status = 'queued'",
+                (time.time(), job_id),
+            )
+            conn.commit()
+            row = conn.execute(
+                "SELECT kind, payload, attachment, attempts FROM analysis_jobs "
+                "WHERE id = ? AND status = 'running'",
+                (job_id,),
+            ).fetchone()
+
+        if row is None:
+            return None
+        return {
+            "kind": row[0],
+            "payload": json.loads(row[1]),
+            "attachment": row[2],
+            "attempts": row[3],
+        }
+
+    def update_stage(
+        self, job_id: str, stage_name: str, status: str, elapsed: Optional[float]
+    ):
+        """Record the progress of one stage"""
+        with self._lock:
+            conn = self._get_connection()
+            row = conn.execute(
+                "SELECT stages FROM analysis_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                return
+
+            stages = json.loads(row[0])
+            stages[stage_name] = {
+                "status": status,
+                "elapsed": round(elapsed, 3) if elapsed is not None else None,
+            }
+            conn.execute(
+                "UPDATE analysis_jobs SET stages = ? WHERE id = ?",
+                (json.dumps(stages), job_id),
+            )
+            conn.commit()
+
+    def finish(
+        self, job_id: str, status: str, result: Any = None, error: Optional[str] = None
+    ):
+        """Record the outcome of a job and drop its (possibly large) inputs"""
+        with self._lock:
+            conn = self._get_connection()
+            conn.execute(
+                "UPDATE analysis_jobs SET status = ?, result = ?, error = ?, "
+                "completed_at = ?, attachment = NULL WHERE id = ?",
+                (
+                    status,
+                    json.dumps(result, default=str) if result is not None else None,
+                    error,
+                    time.time(),
+                    job_id,
+                ),
+            )
+            conn.commit()
+
+    def requeue_interrupted(self) -> List[str]:
+        """Return running jobs to the queue and list every queued job, oldest first"""
+        with self._lock:
+            conn = self._get_connection()
+            conn.execute(
+                "UPDATE analysis_jobs SET status = 'queued' WHERE status = 'running'"
+            )
+            conn.commit()
+            rows = conn.execute(
+                "SELECT id FROM analysis_jobs WHERE status = 'queued' "
+                "ORDER BY created_at ASC"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def prune(self, older_than: float) -> int:
+        """Delete finished jobs completed before the given timestamp"""
+        with self._lock:
+            conn = self._get_connection()
+            deleted = conn.execute(
+                "DELETE FROM analysis_jobs WHERE status IN ('completed', 'failed') "
+                "AND completed_at < ?",
+                (older_than,),
+            ).rowcount
+            conn.commit()
+        return deleted
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job's status, stage progress and result"""
+        with self._lock:
+            row = (
+                self._get_connection()
+                .execute(
+                    "SELECT kind, status, stages, result, error, attempts, "
+                    "created_at, started_at, completed_at "
+                    "FROM analysis_jobs WHERE id = ?",
+                    (job_id,),
+                )
+                .fetchone()
+            )
+
+        if row is None:
+            return None
+        return {
+            "analysis_job_id": job_id,
+            "kind": row[0],
+            "status": row[1],
+            "stages": json.loads(row[2]),
+            "result": json.loads(row[3]) if row[3] is not None else None,
+            "error": row[4],
+            "attempts": row[5],
+            "created_at": row[6],
+            "started_at": row[7],
+            "completed_at": row[8],
+        }
+
+    def count_by_status(self) -> Dict[str, int]:
+        """Count jobs per status"""
+        with self._lock:
+            rows = (
+                self._get_connection()
+                .execute("SELECT status, COUNT(*) FROM analysis_jobs GROUP BY status")
+                .fetchall()
+            )
+        return {status: count for status, count in rows}
+
+    def close(self):
+        """Close the SQLite connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class AnalysisJobQueue:
+    """
+    Bounded pool of async workers draining persisted analysis jobs.
+
+    Handlers are registered per job kind. Jobs that were queued or running
+    when the process stopped are picked up again on start(); a job that keeps
+    failing that way is given up after ``max_attempts``.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        result_ttl: Optional[float] = None,
+    ):
+        """
+        Initialize the queue. Unset values are read from the environment.
+
+        Args:
+            path: SQLite file location (ANALYSIS_JOBS_PATH)
+            workers: Concurrent jobs (ANALYSIS_WORKERS)
+            max_pending: Jobs allowed to wait before submissions are refused (ANALYSIS_MAX_PENDING)
+            max_attempts: Starts allowed per job across restarts (ANALYSIS_MAX_ATTEMPTS)
+            result_ttl: Seconds finished jobs are kept (ANALYSIS_JOB_TTL_SECONDS)
+        """
+        self.store = AnalysisJobStore(
+            path or os.getenv("ANALYSIS_JOBS_PATH", "analysis_jobs.sqlite3")
+        )
+        self.workers = workers or int(os.getenv("ANALYSIS_WORKERS", "4"))
+        self.max_pending = max_pending or int(os.getenv("ANALYSIS_MAX_PENDING", "100"))
+        self.max_attempts = max_attempts or int(os.getenv("ANALYSIS_MAX_ATTEMPTS", "3"))
+        self.result_ttl = result_ttl or float(
+            os.getenv("ANALYSIS_JOB_TTL_SECONDS", str(24 * 3600))
+        )
+
+        self._handlers: Dict[str, JobHandler] = {}
+        self._stages: Dict[str, Sequence[str]] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+
+    def register_handler(
+        self, kind: str, handler: JobHandler, stages: Sequence[str] = ()
+    ):
+        """
+        Register the coroutine that runs jobs of a kind
+
+        Args:
+            kind: Job kind (e.g. "get-score")
+            handler: Called with (payload, attachment, progress)
+            stages: Stage names shown as pending until reported
+        """
+        self._handlers[kind] = handler
+        self._stages[kind] = tuple(stages)
+
+    @property
+    def running(self) -> bool:
+        """Whether the workers have been started"""
+        return bool(self._worker_tasks)
+
+    async def start(self):
+        """Start the workers and resume jobs left over from a previous run"""
+        if self.running:
+            return
+
+        self._queue = asyncio.Queue()
+        store = self.store
+        await get_executor().run_io(store.prune, time.time() - self.result_ttl)
+
+        for job_id in await get_executor().run_io(store.requeue_interrupted):
+            self._queue.put_nowait(job_id)
+        if self._queue.qsize():
+            print(f"🔁 Resuming {self._queue.qsize()} analysis job(s)")
+
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(index)) for index in range(self.workers)
+        ]
+
+    async def stop(self):
+        """Stop the workers; unfinished jobs stay queued in SQLite"""
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        self._queue = None
+        self.store.close()
+
+    async def submit(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        attachment: Optional[bytes] = None,
+    ) -> str:
+        """
+        Persist and enqueue a job
+
+        Args:
+            kind: Registered job kind
+            payload: JSON-serialisable inputs
+            attachment: Optional binary input (e.g. a PDF)
+
+        Returns:
+            The new job id
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for analysis job kind '{kind}'")
+        if not self.running:
+            await self.start()
+        if self._queue.qsize() >= self.max_pending:
+            raise AnalysisQueueFullError(
+                f"Analysis queue is full ({self.max_pending} jobs waiting)"
+            )
+
+        job_id = uuid.uuid4().hex
+        await get_executor().run_io(
+            self.store.insert, job_id, kind, payload, attachment, self._stages[kind]
+        )
+        self._queue.put_nowait(job_id)
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job's status, stage progress and result"""
+        return await get_executor().run_io(self.store.get, job_id)
+
+    async def _worker(self, index: int):
+        """Run queued jobs one at a time"""
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run_job(job_id)
+            except Exception as e:
+                print(f"❌ Analysis worker {index} failed on job {job_id}: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    async def _run_job(self, job_id: str):
+        """Run one job through its handler and store the outcome"""
+        store = self.store
+        job = await get_executor().run_io(store.mark_running, job_id)
+        if job is None:
+            return
+
+        if job["attempts"] > self.max_attempts:
+            await get_executor().run_io(
+                store.finish,
+                job_id,
+                "failed",
+                None,
+                f"Gave up after {self.max_attempts} interrupted attempts",
+            )
+            return
+
+        async def progress(stage_name: str, status: str, elapsed: Optional[float]):
+            await get_executor().run_io(
+                store.update_stage, job_id, stage_name, status, elapsed
+            )
+
+        handler = self._handlers.get(job["kind"])
+        try:
+            if handler is None:
+                raise ValueError(f"No handler registered for '{job['kind']}'")
+            result = await handler(job["payload"], job["attachment"], progress)
+        except asyncio.CancelledError:
+            # Shutting down: leave the job for the next start
+            raise
+        except Exception as e:
+            detail = getattr(e, "detail", None) or str(e)
+            print(f"❌ Analysis job {job_id} failed: {detail}")
+            await get_executor().run_io(store.finish, job_id, "failed", None, detail)
+            return
+
+        try:
+            await get_executor().run_io(store.finish, job_id, "completed", result, None)
+        except Exception as e:
+            # An unstorable result must not leave the job running forever
+            print(f"❌ Analysis job {job_id} result could not be stored: {e}")
+            await get_executor().run_io(store.finish, job_id, "failed", None, str(e))
+            return
+        print(f"✅ Analysis job {job_id} completed")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get worker configuration and job counts"""
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_pending": self.max_pending,
+            "jobs": self.store.count_by_status(),
+        }
+
+
+# Shared queue instance for the whole process
+_ANALYSIS_QUEUE: Optional[AnalysisJobQueue] = None
+
+
+def get_analysis_queue() -> AnalysisJobQueue:
+    """Get or create the shared AnalysisJobQueue instance"""
+    global _ANALYSIS_QUEUE
+
+    if _ANALYSIS_QUEUE is None:
+        _ANALYSIS_QUEUE = AnalysisJobQueue()
+
+    return _ANALYSIS_QUEUE
+
+
+async def shutdown_analysis_queue():
+    """Stop the shared queue's workers (call on application shutdown)"""
+    if _ANALYSIS_QUEUE is not None:
+        await _ANALYSIS_QUEUE.stop()
@@ -3,13 +3,20 @@ Clean Data Service using Groq API
 Converts raw text data into structured JSON format
 """
 
+import asyncio
 import json
 import os
 import re
-import requests
 from typing import Dict, Any, Optional
 from pathlib import Path
-from pathlib import Path
+
+from app.services.llm import get_groq_client, get_response_cache
+from app.services.singleflight import content_key, get_singleflight
+
+# Bump whenever a prompt or the model changes so stored structured data can be
+# recognised as stale and re-generated
+RESUME_PROMPT_VERSION = "1"
+JOB_DESCRIPTION_PROMPT_VERSION = "1"
 
 
 class GroqDataCleaner:
@@ -21,6 +28,7 @@ class GroqDataCleaner:
         self.api_key = os.getenv("GROQ_API_KEY")
         self.base_url = "https://api.groq.com/openai/v1/chat/completions"
         self.model = "llama-3.1-8b-instant"
+        self.client = get_groq_client()
 
         if not self.api_key:
             print(
@@ -34,12 +42,15 @@ class GroqDataCleaner:
             print("✅ Groq API key found. Data cleaning is available.")
             self.api_available = True
 
-    def clean_resume_data(self, raw_text: str) -> Dict[str, Any]:
+    async def clean_resume_data(
+        self, raw_text: str, use_cache: bool = True
+    ) -> Dict[str, Any]:
         """
         Convert raw resume text into structured JSON format
 
         Args:
             raw_text (str): Raw text extracted from PDF
+            use_cache (bool): Set False to bypass the response cache lookup
 
         Returns:
             Dict[str, Any]: Structured resume data in JSON format
@@ -53,7 +64,9 @@ class GroqDataCleaner:
 
         try:
             prompt = self._create_resume_prompt(raw_text)
-            response = self._call_groq_api(prompt)
+            response = await self._call_groq_api(
+                prompt, "resume", RESUME_PROMPT_VERSION, use_cache
+            )
 
             if response.get("success", False):
                 cleaned_data = response.get("data", {})
@@ -76,20 +89,25 @@ class GroqDataCleaner:
                 "raw_text": raw_text,
             }
 
-    def clean_job_description_data(self, raw_text: str) -> Dict[str, Any]:
+    async def clean_job_description_data(
+        self, raw_text: str, use_cache: bool = True
+    ) -> Dict[str, Any]:
         """
         Convert raw job description text into structured JSON format
         Handles both single jobs and multiple jobs in one document
 
         Args:
             raw_text (str): Raw text extracted from PDF
+            use_cache (bool): Set False to bypass the response cache lookup
 
         Returns:
             Dict[str, Any]: Structured job description data in JSON format
         """
         try:
             prompt = self._create_job_description_prompt(raw_text)
-            response = self._call_groq_api(prompt)
+            response = await self._call_groq_api(
+                prompt, "job_description", JOB_DESCRIPTION_PROMPT_VERSION, use_cache
+            )
 
             if response.get("success", False):
                 cleaned_data = response.get("data", {})
@@ -237,36 +255,58 @@ Extract EVERY field you can identify. Be thorough and comprehensive.
 
 JSON OUTPUT ONLY (no explanations, no markdown):"""
 
-    def _call_groq_api(self, prompt: str) -> Dict[str, Any]:
+    async def _call_groq_api(
+        self,
+        prompt: str,
+        namespace: str,
+        prompt_version: str,
+        use_cache: bool = True,
+    ) -> Dict[str, Any]:
         """
-        Make API call to Groq
+        Make API call to Groq, answering repeated prompts from the response cache
 
         Args:
             prompt (str): The prompt to send to Groq
+            namespace (str): Kind of request, part of the cache key
+            prompt_version (str): Prompt template version, part of the cache key
+            use_cache (bool): Set False to skip the lookup (the fresh result is still stored)
 
         Returns:
             Dict[str, Any]: API response
         """
-        try:
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-            }
-
-            payload = {
-                "model": self.model,
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": 0.0,  # Zero temperature for consistent JSON formatting
-                "max_tokens": 2048,
-            }
+        temperature = 0.0  # Zero temperature for consistent JSON formatting
+        cache = get_response_cache()
+        cache_key = cache.make_key(
+            namespace, self.model, prompt_version, temperature, prompt
+        )
 
-            response = requests.post(self.base_url, headers=headers, json=payload)
-            response.raise_for_status()
+        try:
+            if use_cache:
+                # The cache is optional: a failed read counts as a miss
+                try:
+                    cached = await cache.aget(cache_key)
+                except Exception as e:
+                    print(f"⚠️ Response cache read failed, calling Groq: {e}")
+                    cached = None
+                if cached is not None:
+                    print(f"⚡ Groq {namespace} response served from cache")
+                    return cached
+
+            response = await self.client.chat_completion(
+                prompt,
+                model=self.model,
+                temperature=temperature,
+                max_tokens=2048,
+            )
 
-            result = response.json()
+            if not response.get("success", False):
+                return {
+                    "success": False,
+                    "error": response.get("error", "Unknown error occurred"),
+                }
 
-            if "choices" in result and len(result["choices"]) > 0:
-                content = result["choices"][0]["message"]["content"]
+            content = response["content"]
+            if content:
                 print(
                     f"🔍 Groq API response received, length: {len(content)} characters"
                 )
@@ -328,7 +368,12 @@ JSON OUTPUT ONLY (no explanations, no markdown):"""
 
                     if structured_data is not None:
                         print(f"✅ Successfully parsed JSON response")
-                        return {"success": True, "data": structured_data}
+                        result = {"success": True, "data": structured_data}
+                        try:
+                            await cache.aset(cache_key, namespace, result)
+                        except Exception as e:
+                            print(f"⚠️ Response cache write failed: {e}")
+                        return result
                     else:
                         print(f"❌ No valid JSON found in Groq response")
                         print(f"Raw response preview: {content[:200]}...")
@@ -347,16 +392,6 @@ JSON OUTPUT ONLY (no explanations, no markdown):"""
             else:
                 return {"success": False, "error": "No valid response from Groq API"}
 
-        except requests.exceptions.RequestException as e:
-            # Get more detailed error information
-            error_details = f"API request failed: {str(e)}"
-            if hasattr(e, "response") and e.response is not None:
-                try:
-                    error_json = e.response.json()
-                    error_details += f" - Response: {json.dumps(error_json)}"
-                except:
-                    error_details += f" - Response text: {e.response.text}"
-            return {"success": False, "error": error_details}
         except Exception as e:
             print(f"❌ Unexpected error in _call_groq_api: {str(e)}")
             return {"success": False, "error": f"Unexpected error: {str(e)}"}
@@ -573,16 +608,26 @@ JSON OUTPUT ONLY (no explanations, no markdown):"""
 
 
 # Convenience functions
-def clean_resume_text(raw_text: str) -> Dict[str, Any]:
-    """Clean resume text using Groq API"""
+async def clean_resume_text(raw_text: str, use_cache: bool = True) -> Dict[str, Any]:
+    """Clean resume text using Groq API (identical concurrent calls share one request)"""
     cleaner = GroqDataCleaner()
-    return cleaner.clean_resume_data(raw_text)
+    key = content_key("resume", RESUME_PROMPT_VERSION, raw_text, use_cache)
+    return await get_singleflight("cleaning").do(
+        key, lambda: cleaner.clean_resume_data(raw_text, use_cache)
+    )
 
 
-def clean_job_description_text(raw_text: str) -> Dict[str, Any]:
-    """Clean job description text using Groq API"""
+async def clean_job_description_text(
+    raw_text: str, use_cache: bool = True
+) -> Dict[str, Any]:
+    """Clean job description text using Groq API (identical concurrent calls share one request)"""
     cleaner = GroqDataCleaner()
-    return cleaner.clean_job_description_data(raw_text)
+    key = content_key(
+        "job_description", JOB_DESCRIPTION_PROMPT_VERSION, raw_text, use_cache
+    )
+    return await get_singleflight("cleaning").do(
+        key, lambda: cleaner.clean_job_description_data(raw_text, use_cache)
+    )
 
 
 # Test execution
@@ -607,7 +652,7 @@ if __name__ == "__main__":
     """
 
     try:
-        result = clean_resume_text(sample_text)
+        result = asyncio.run(clean_resume_text(sample_text))
         print("Resume Cleaning Result:")
         print(json.dumps(result, indent=2))
 
@@ -0,0 +1,221 @@
+"""
+Task Executor Service
+Runs CPU-bound stages in a process pool and blocking I/O stages in a thread
+pool so the event loop stays free to serve other requests
+"""
+
+import asyncio
+import functools
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class ExecutorQueueFullError(RuntimeError):
+    """Raised when a pool's queue stays full for longer than the task timeout"""
+
+
+class TaskExecutor:
+    """
+    Central executor with a process pool for CPU stages (PDF parsing,
+    preprocessing, hard/semantic matching) and a thread pool for I/O stages.
+
+    Each pool has a bounded queue: at most ``max_queue_depth`` tasks may be
+    running or waiting at once, further submissions wait for a free slot.
+    """
+
+    def __init__(
+        self,
+        cpu_workers: Optional[int] = None,
+        io_workers: Optional[int] = None,
+        max_queue_depth: Optional[int] = None,
+        task_timeout: Optional[float] = None,
+        start_method: Optional[str] = None,
+    ):
+        """
+        Initialize the executor. Unset values are read from the environment.
+
+        Args:
+            cpu_workers: Process pool size (EXECUTOR_CPU_WORKERS, default: CPU count).
+                         0 runs CPU stages in the thread pool instead.
+            io_workers: Thread pool size (EXECUTOR_IO_WORKERS)
+            max_queue_depth: Tasks allowed running or waiting per pool (EXECUTOR_MAX_QUEUE_DEPTH)
+            task_timeout: Default per-task timeout in seconds (EXECUTOR_TASK_TIMEOUT)
+            start_method: Multiprocessing start method (EXECUTOR_START_METHOD)
+        """
+        cpu_count = os.cpu_count() or 1
+
+        self.cpu_workers = (
+            cpu_workers
+            if cpu_workers is not None
+            else int(os.getenv("EXECUTOR_CPU_WORKERS", str(cpu_count)))
+        )
+        self.io_workers = io_workers or int(
+            os.getenv("EXECUTOR_IO_WORKERS", str(min(32, cpu_count + 4)))
+        )
+        self.max_queue_depth = max_queue_depth or int(
+            os.getenv("EXECUTOR_MAX_QUEUE_DEPTH", "64")
+        )
+        self.task_timeout = task_timeout or float(
+            os.getenv("EXECUTOR_TASK_TIMEOUT", "60")
+        )
+        # spawn avoids forking a process that already runs threads and an event loop
+        self.start_method = start_method or os.getenv("EXECUTOR_START_METHOD", "spawn")
+
+        # Pools are created lazily on first use
+        self._cpu_pool: Optional[Executor] = None
+        self._io_pool: Optional[ThreadPoolExecutor] = None
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+        self._in_flight = {"cpu": 0, "io": 0}
+        self._completed = {"cpu": 0, "io": 0}
+        self._timed_out = {"cpu": 0, "io": 0}
+
+    def _get_io_pool(self) -> ThreadPoolExecutor:
+        """Get or create the thread pool"""
+        if self._io_pool is None:
+            self._io_pool = ThreadPoolExecutor(
+                max_workers=self.io_workers, thread_name_prefix="io-stage"
+            )
+        return self._io_pool
+
+    def _get_cpu_pool(self) -> Executor:
+        """Get or create the process pool (falls back to threads when disabled)"""
+        if self.cpu_workers <= 0:
+            return self._get_io_pool()
+
+        if self._cpu_pool is None:
+            self._cpu_pool = ProcessPoolExecutor(
+                max_workers=self.cpu_workers,
+                mp_context=multiprocessing.get_context(self.start_method),
+            )
+        return self._cpu_pool
+
+    def _get_slots(self, pool_name: str) -> asyncio.Semaphore:
+        """Get the queue-depth semaphore for a pool"""
+        if pool_name not in self._slots:
+            self._slots[pool_name] = asyncio.Semaphore(self.max_queue_depth)
+        return self._slots[pool_name]
+
+    async def _run(
+        self,
+        pool_name: str,
+        pool: Executor,
+        fn: Callable[..., Any],
+        args: tuple,
+        kwargs: Dict[str, Any],
+        timeout: Optional[float],
+    ) -> Any:
+        """Submit a call to a pool and await its result"""
+        timeout = timeout or self.task_timeout
+        slots = self._get_slots(pool_name)
+
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=timeout)
+        except asyncio.TimeoutError:
+            raise ExecutorQueueFullError(
+                f"{pool_name} executor queue is full ({self.max_queue_depth} tasks)"
+            )
+
+        self._in_flight[pool_name] += 1
+        try:
+            loop = asyncio.get_running_loop()
+            call = functools.partial(fn, *args, **kwargs)
+            # A timed-out task keeps running in its worker; only the wait is abandoned
+            result = await asyncio.wait_for(
+                loop.run_in_executor(pool, call), timeout=timeout
+            )
+            self._completed[pool_name] += 1
+            return result
+        except asyncio.TimeoutError:
+            self._timed_out[pool_name] += 1
+            raise
+        finally:
+            self._in_flight[pool_name] -= 1
+            slots.release()
+
+    async def run_cpu(
+        self,
+        fn: Callable[..., Any],
+        *args,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ) -> Any:
+        """
+        Run a CPU-bound function in the process pool
+
+        Args:
+            fn: Module-level (picklable) function to run
+            *args: Positional arguments for fn (must be picklable)
+            timeout: Per-task timeout override in seconds
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            Whatever fn returns
+        """
+        return await self._run("cpu", self._get_cpu_pool(), fn, args, kwargs, timeout)
+
+    async def run_io(
+        self,
+        fn: Callable[..., Any],
+        *args,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ) -> Any:
+        """
+        Run a blocking I/O function in the thread pool
+
+        Args:
+            fn: Function to run
+            *args: Positional arguments for fn
+            timeout: Per-task timeout override in seconds
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            Whatever fn returns
+        """
+        return await self._run("io", self._get_io_pool(), fn, args, kwargs, timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool configuration and usage counters"""
+        return {
+            "cpu_workers": self.cpu_workers,
+            "io_workers": self.io_workers,
+            "max_queue_depth": self.max_queue_depth,
+            "task_timeout": self.task_timeout,
+            "in_flight": dict(self._in_flight),
+            "completed": dict(self._completed),
+            "timed_out": dict(self._timed_out),
+        }
+
+    def shutdown(self, wait: bool = True):
+        """Shut down both pools"""
+        if self._cpu_pool is not None:
+            self._cpu_pool.shutdown(wait=wait, cancel_futures=True)
+            self._cpu_pool = None
+        if self._io_pool is not None:
+            self._io_pool.shutdown(wait=wait, cancel_futures=True)
+            self._io_pool = None
+
+
+# Shared executor instance for the whole process
+_EXECUTOR: Optional[TaskExecutor] = None
+
+
+def get_executor() -> TaskExecutor:
+    """Get or create the shared TaskExecutor instance"""
+    global _EXECUTOR
+
+    if _EXECUTOR is None:
+        _EXECUTOR = TaskExecutor()
+
+    return _EXECUTOR
+
+
+def shutdown_executor(wait: bool = True):
+    """Shut down the shared executor (call on application shutdown)"""
+    global _EXECUTOR
+
+    if _EXECUTOR is not None:
+        _EXECUTOR.shutdown(wait=wait)
+        _EXECUTOR = None
@@ -0,0 +1,19 @@
+"""
+LLM Client Module
+Shared async Groq client, rate-limit scheduler and persistent response cache used by data cleaning
+and AI analysis
+"""
+
+from .scheduler import GroqScheduler
+from .groq_client import GroqClient, get_groq_client, close_groq_client
+from .response_cache import ResponseCache, get_response_cache, close_response_cache
+
+__all__ = [
+    "GroqClient",
+    "GroqScheduler",
+    "get_groq_client",
+    "close_groq_client",
+    "ResponseCache",
+    "get_response_cache",
+    "close_response_cache",
+]
@@ -0,0 +1,215 @@
+"""
+Async Groq API Client
+Shared, connection-pooled HTTP client for Groq chat completions
+"""
+
+import asyncio
+import json
+import os
+from typing import Dict, Any, Optional
+
+import httpx
+
+from .scheduler import GroqScheduler
+
+GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
+
+
+class GroqClient:
+    """
+    Async Groq chat-completions client with a persistent connection pool.
+
+    One instance is shared by the whole process so every completion reuses
+    the same keep-alive connections instead of opening a new TLS session, and
+    every request passes through the same rate-limit scheduler.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: str = GROQ_API_URL,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        total_timeout: Optional[float] = None,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        scheduler: Optional[GroqScheduler] = None,
+    ):
+        """
+        Initialize the client. Unset values are read from the environment.
+
+        Args:
+            api_key: Groq API key (default: GROQ_API_KEY)
+            base_url: Chat completions endpoint
+            connect_timeout: Seconds allowed to establish a connection
+            read_timeout: Seconds allowed between bytes of the response
+            total_timeout: Hard ceiling in seconds for a whole request
+            max_connections: Maximum number of pooled connections
+            max_keepalive_connections: Maximum number of idle connections kept open
+            keepalive_expiry: Seconds an idle connection is kept alive
+            scheduler: Rate-limit scheduler (default: configured from the environment)
+        """
+        self.api_key = api_key or os.getenv("GROQ_API_KEY")
+        self.base_url = base_url
+        self.connect_timeout = connect_timeout or float(
+            os.getenv("GROQ_CONNECT_TIMEOUT", "5")
+        )
+        self.read_timeout = read_timeout or float(os.getenv("GROQ_READ_TIMEOUT", "30"))
+        self.total_timeout = total_timeout or float(
+            os.getenv("GROQ_TOTAL_TIMEOUT", "45")
+        )
+        self.max_connections = max_connections or int(
+            os.getenv("GROQ_MAX_CONNECTIONS", "20")
+        )
+        self.max_keepalive_connections = max_keepalive_connections or int(
+            os.getenv("GROQ_MAX_KEEPALIVE_CONNECTIONS", "10")
+        )
+        self.keepalive_expiry = keepalive_expiry or float(
+            os.getenv("GROQ_KEEPALIVE_EXPIRY", "60")
+        )
+
+        self.scheduler = scheduler or GroqScheduler()
+
+        # Lazily created so the client binds to the running event loop
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def api_available(self) -> bool:
+        """Whether an API key is configured"""
+        return bool(self.api_key)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get or create the pooled HTTP client"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(
+                    self.read_timeout,
+                    connect=self.connect_timeout,
+                    read=self.read_timeout,
+                ),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry,
+                ),
+                headers={"Content-Type": "application/json"},
+            )
+        return self._client
+
+    async def chat_completion(
+        self,
+        prompt: str,
+        model: str,
+        temperature: float = 0.0,
+        max_tokens: int = 2048,
+    ) -> Dict[str, Any]:
+        """
+        Request a single chat completion, queued behind the rate-limit scheduler
+        and retried on 429/5xx
+
+        Args:
+            prompt: User prompt to send
+            model: Groq model name
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens in the completion
+
+        Returns:
+            Dict with "content" on success, or "error" (and "status_code" for
+            HTTP errors) on failure
+        """
+        if not self.api_available:
+            return {"success": False, "error": "GROQ_API_KEY not set"}
+
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        payload = {
+            "model": model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+
+        return await self.scheduler.run(
+            lambda: self._post(headers, payload),
+            prompt_tokens=self.scheduler.estimate_tokens(prompt),
+            max_tokens=max_tokens,
+        )
+
+    async def _post(
+        self, headers: Dict[str, str], payload: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Send one completion request and normalise the outcome"""
+        try:
+            response = await asyncio.wait_for(
+                self._get_client().post(self.base_url, headers=headers, json=payload),
+                timeout=self.total_timeout,
+            )
+            self.scheduler.observe_rate_limit_headers(response.headers)
+            response.raise_for_status()
+            result = response.json()
+
+        except asyncio.TimeoutError:
+            return {
+                "success": False,
+                "error": f"API request timed out after {self.total_timeout}s",
+            }
+        except httpx.HTTPStatusError as e:
+            # Get more detailed error information
+            error_details = f"API request failed: {str(e)}"
+            try:
+                error_details += f" - Response: {json.dumps(e.response.json())}"
+            except ValueError:
+                error_details += f" - Response text: {e.response.text}"
+            return {
+                "success": False,
+                "error": error_details,
+                "status_code": e.response.status_code,
+                "retry_after": _parse_retry_after(e.response.headers),
+            }
+        except httpx.HTTPError as e:
+            return {"success": False, "error": f"API request failed: {str(e)}"}
+        except ValueError as e:
+            return {"success": False, "error": f"Invalid API response: {str(e)}"}
+
+        if "choices" in result and len(result["choices"]) > 0:
+            return {
+                "success": True,
+                "content": result["choices"][0]["message"]["content"],
+                "usage": result.get("usage", {}),
+            }
+
+        return {"success": False, "error": "No valid response from Groq API"}
+
+    async def aclose(self):
+        """Close pooled connections"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+
+def _parse_retry_after(headers: httpx.Headers) -> Optional[float]:
+    """Read a Retry-After header given in seconds"""
+    try:
+        return float(headers["retry-after"])
+    except (KeyError, ValueError):
+        return None
+
+
+# Shared client instance for the whole process
+_GROQ_CLIENT: Optional[GroqClient] = None
+
+
+def get_groq_client() -> GroqClient:
+    """Get or create the shared GroqClient instance"""
+    global _GROQ_CLIENT
+
+    if _GROQ_CLIENT is None:
+        _GROQ_CLIENT = GroqClient()
+
+    return _GROQ_CLIENT
+
+
+async def close_groq_client():
+    """Close the shared client (call on application shutdown)"""
+    if _GROQ_CLIENT is not None:
+        await _GROQ_CLIENT.aclose()
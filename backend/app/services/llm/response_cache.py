@@ -0,0 +1,265 @@
+"""
+LLM Response Cache
+Persistent, content-addressed SQLite cache for parsed Groq responses
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from app.services.executor import get_executor
+
+
+class ResponseCache:
+    """
+    SQLite-backed cache for LLM responses.
+
+    Entries are keyed by a SHA-256 of (namespace, model, prompt version,
+    temperature, prompt text), so byte-identical requests are answered from
+    disk and survive restarts. Entries expire after ``ttl_seconds`` and the
+    least recently used entries are evicted once ``max_entries`` is exceeded.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        enabled: Optional[bool] = None,
+    ):
+        """
+        Initialize the cache. Unset values are read from the environment.
+
+        Args:
+            path: SQLite file location (LLM_CACHE_PATH)
+            ttl_seconds: Entry lifetime in seconds (LLM_CACHE_TTL_SECONDS, default: 7 days)
+            max_entries: Maximum number of stored entries (LLM_CACHE_MAX_ENTRIES)
+            enabled: Whether the cache is used at all (LLM_CACHE_ENABLED)
+        """
+        self.path = path or os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite3")
+        self.ttl_seconds = ttl_seconds or float(
+            os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600))
+        )
+        self.max_entries = max_entries or int(
+            os.getenv("LLM_CACHE_MAX_ENTRIES", "5000")
+        )
+        self.enabled = (
+            enabled
+            if enabled is not None
+            else os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+        )
+
+        # One connection shared by the I/O threads, serialised by a lock
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @staticmethod
+    def make_key(
+        namespace: str,
+        model: str,
+        prompt_version: str,
+        temperature: float,
+        prompt: str,
+    ) -> str:
+        """
+        Build a stable cache key
+
+        Args:
+            namespace: Kind of request (e.g. "resume", "job_description", "analysis")
+            model: Model name
+            prompt_version: Prompt template version
+            temperature: Sampling temperature
+            prompt: Full prompt text sent to the model
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        material = json.dumps(
+            [namespace, model, prompt_version, float(temperature), prompt],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Get or create the SQLite connection and schema"""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_responses (
+                    key TEXT PRIMARY KEY,
+                    namespace TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_accessed REAL NOT NULL
+                )
+                """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_responses_last_accessed "
+                "ON llm_responses (last_accessed)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response
+
+        Args:
+            key: Key from make_key
+
+        Returns:
+            The cached response, or None on a miss or expired entry
+        """
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        with self._lock:
+            conn = self._get_connection()
+            row = conn.execute(
+                "SELECT value, created_at FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                    conn.commit()
+                    self._evictions += 1
+                self._misses += 1
+                return None
+
+            conn.execute(
+                "UPDATE llm_responses SET last_accessed = ? WHERE key = ?", (now, key)
+            )
+            conn.commit()
+            self._hits += 1
+
+        return json.loads(row[0])
+
+    def set(self, key: str, namespace: str, value: Dict[str, Any]):
+        """
+        Store a response and evict expired or excess entries
+
+        Args:
+            key: Key from make_key
+            namespace: Kind of request, kept for inspection
+            value: JSON-serialisable response
+        """
+        if not self.enabled:
+            return
+
+        now = time.time()
+        serialized = json.dumps(value, ensure_ascii=False)
+
+        with self._lock:
+            conn = self._get_connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_responses "
+                "(key, namespace, value, created_at, last_accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, namespace, serialized, now, now),
+            )
+            self._evict(conn, now)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        """Drop expired entries, then the least recently used beyond max_entries"""
+        expired = conn.execute(
+            "DELETE FROM llm_responses WHERE created_at < ?", (now - self.ttl_seconds,)
+        ).rowcount
+
+        count = conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM llm_responses WHERE key IN ("
+                "SELECT key FROM llm_responses ORDER BY last_accessed ASC LIMIT ?)",
+                (excess,),
+            )
+
+        self._evictions += max(expired, 0) + max(excess, 0)
+
+    async def aget(self, key: str) -> Optional[Dict[str, Any]]:
+        """Async get, run on the I/O pool"""
+        if not self.enabled:
+            return None
+        return await get_executor().run_io(self.get, key)
+
+    async def aset(self, key: str, namespace: str, value: Dict[str, Any]):
+        """Async set, run on the I/O pool"""
+        if not self.enabled:
+            return
+        await get_executor().run_io(self.set, key, namespace, value)
+
+    def clear(self):
+        """Remove every cached entry"""
+        with self._lock:
+            conn = self._get_connection()
+            conn.execute("DELETE FROM llm_responses")
+            conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache configuration and hit/miss counters"""
+        lookups = self._hits + self._misses
+        stats = {
+            "enabled": self.enabled,
+            "path": self.path,
+            "ttl_seconds": self.ttl_seconds,
+            "max_entries": self.max_entries,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+            "evictions": self._evictions,
+        }
+
+        if self.enabled:
+            with self._lock:
+                stats["entries"] = (
+                    self._get_connection()
+                    .execute("SELECT COUNT(*) FROM llm_responses")
+                    .fetchone()[0]
+                )
+
+        return stats
+
+    def close(self):
+        """Close the SQLite connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Shared cache instance for the whole process
+_RESPONSE_CACHE: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Get or create the shared ResponseCache instance"""
+    global _RESPONSE_CACHE
+
+    if _RESPONSE_CACHE is None:
+        _RESPONSE_CACHE = ResponseCache()
+
+    return _RESPONSE_CACHE
+
+
+def close_response_cache():
+    """Close the shared cache (call on application shutdown)"""
+    global _RESPONSE_CACHE
+
+    if _RESPONSE_CACHE is not None:
+        _RESPONSE_CACHE.close()
+        _RESPONSE_CACHE = None
@@ -0,0 +1,306 @@
+"""
+Groq Request Scheduler
+Token-bucket rate limiting, adaptive concurrency and 429 backoff for Groq calls
+"""
+
+import asyncio
+import os
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional
+
+# Transient statuses worth retrying
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class GroqScheduler:
+    """
+    Gatekeeper in front of every Groq request.
+
+    - Requests-per-minute and tokens-per-minute budgets are token buckets that
+      refill continuously; a request waits until both can cover it.
+    - Concurrency follows AIMD: it grows by roughly one slot per window of
+      fast successes and is cut multiplicatively on 429s, 5xx or slow responses.
+    - 429/5xx responses are retried with jittered exponential backoff, and a
+      Retry-After header pauses every queued request, not just the one that got it.
+    """
+
+    def __init__(
+        self,
+        rpm_limit: Optional[int] = None,
+        tpm_limit: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        target_latency: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        backoff_base: Optional[float] = None,
+        backoff_max: Optional[float] = None,
+        max_queue_wait: Optional[float] = None,
+        expected_completion_tokens: Optional[int] = None,
+    ):
+        """
+        Initialize the scheduler. Unset values are read from the environment.
+
+        Args:
+            rpm_limit: Requests per minute (GROQ_RPM_LIMIT)
+            tpm_limit: Tokens per minute (GROQ_TPM_LIMIT)
+            max_concurrency: Upper bound for concurrent requests (GROQ_MAX_CONCURRENCY)
+            target_latency: Seconds above which a response counts as slow (GROQ_TARGET_LATENCY)
+            max_retries: Retries for 429/5xx responses (GROQ_MAX_RETRIES)
+            backoff_base: First backoff delay in seconds (GROQ_BACKOFF_BASE)
+            backoff_max: Longest backoff delay in seconds (GROQ_BACKOFF_MAX)
+            max_queue_wait: Seconds a request may wait for a slot (GROQ_MAX_QUEUE_WAIT)
+            expected_completion_tokens: Completion tokens reserved per request
+                                        before actual usage is known (GROQ_EXPECTED_COMPLETION_TOKENS)
+        """
+        self.rpm_limit = rpm_limit or int(os.getenv("GROQ_RPM_LIMIT", "30"))
+        self.tpm_limit = tpm_limit or int(os.getenv("GROQ_TPM_LIMIT", "6000"))
+        self.max_concurrency = max_concurrency or int(
+            os.getenv("GROQ_MAX_CONCURRENCY", "8")
+        )
+        self.target_latency = target_latency or float(
+            os.getenv("GROQ_TARGET_LATENCY", "15")
+        )
+        self.max_retries = (
+            max_retries
+            if max_retries is not None
+            else int(os.getenv("GROQ_MAX_RETRIES", "3"))
+        )
+        self.backoff_base = backoff_base or float(os.getenv("GROQ_BACKOFF_BASE", "1"))
+        self.backoff_max = backoff_max or float(os.getenv("GROQ_BACKOFF_MAX", "30"))
+        self.max_queue_wait = max_queue_wait or float(
+            os.getenv("GROQ_MAX_QUEUE_WAIT", "120")
+        )
+        self.expected_completion_tokens = expected_completion_tokens or int(
+            os.getenv("GROQ_EXPECTED_COMPLETION_TOKENS", "1024")
+        )
+        self.min_concurrency = 1
+
+        # Buckets start full
+        self._request_budget = float(self.rpm_limit)
+        self._token_budget = float(self.tpm_limit)
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+
+        self._concurrency = float(self.max_concurrency)
+        self._in_flight = 0
+        self._waiting = 0
+        self._condition: Optional[asyncio.Condition] = None
+
+        self._requests = 0
+        self._retries = 0
+        self._throttled = 0
+        self._queue_timeouts = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    @staticmethod
+    def estimate_tokens(prompt: str) -> int:
+        """Rough prompt token count (about four characters per token)"""
+        return len(prompt) // 4 + 1
+
+    def _get_condition(self) -> asyncio.Condition:
+        """Get or create the condition guarding slots and budgets"""
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    def _refill(self):
+        """Top up both buckets for the time elapsed since the last refill"""
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+
+        self._request_budget = min(
+            float(self.rpm_limit), self._request_budget + elapsed * self.rpm_limit / 60
+        )
+        self._token_budget = min(
+            float(self.tpm_limit), self._token_budget + elapsed * self.tpm_limit / 60
+        )
+
+    def _budget_wait(self, tokens: int) -> float:
+        """Seconds until both buckets can cover a request (0 if they already can)"""
+        waits = [self._blocked_until - time.monotonic()]
+        if self._request_budget < 1:
+            waits.append((1 - self._request_budget) * 60 / self.rpm_limit)
+        if self._token_budget < tokens:
+            waits.append((tokens - self._token_budget) * 60 / self.tpm_limit)
+        return max(0.0, *waits)
+
+    async def _acquire(self, tokens: int):
+        """Wait for a concurrency slot and enough budget, then reserve them"""
+        condition = self._get_condition()
+        enqueued_at = time.monotonic()
+        deadline = enqueued_at + self.max_queue_wait
+        self._waiting += 1
+
+        try:
+            async with condition:
+                while True:
+                    self._refill()
+                    wait: Optional[float] = None
+                    if self._in_flight < int(self._concurrency):
+                        wait = self._budget_wait(tokens)
+                        if wait <= 0:
+                            break
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._queue_timeouts += 1
+                        raise asyncio.TimeoutError
+                    wait = remaining if wait is None else min(wait, remaining)
+
+                    try:
+                        await asyncio.wait_for(condition.wait(), timeout=wait)
+                    except asyncio.TimeoutError:
+                        pass
+
+                self._request_budget -= 1
+                self._token_budget -= tokens
+                self._in_flight += 1
+        finally:
+            self._waiting -= 1
+
+        waited = time.monotonic() - enqueued_at
+        self._total_wait += waited
+        self._max_wait = max(self._max_wait, waited)
+
+    async def _release(self):
+        """Free a concurrency slot and wake queued requests"""
+        condition = self._get_condition()
+        async with condition:
+            self._in_flight -= 1
+            condition.notify_all()
+
+    def _on_success(self, latency: float, reserved_tokens: int, usage: Mapping):
+        """Additive increase, and settle the token reservation against real usage"""
+        if latency <= self.target_latency:
+            self._concurrency = min(
+                float(self.max_concurrency), self._concurrency + 1 / self._concurrency
+            )
+        else:
+            self._concurrency = max(
+                float(self.min_concurrency), self._concurrency * 0.9
+            )
+
+        used_tokens = usage.get("total_tokens") if usage else None
+        if used_tokens:
+            self._token_budget = min(
+                float(self.tpm_limit),
+                self._token_budget + reserved_tokens - used_tokens,
+            )
+
+    def _on_throttled(self, retry_after: Optional[float]):
+        """Multiplicative decrease, and pause everyone for Retry-After"""
+        self._throttled += 1
+        self._concurrency = max(float(self.min_concurrency), self._concurrency * 0.5)
+        if retry_after:
+            self._blocked_until = max(
+                self._blocked_until, time.monotonic() + retry_after
+            )
+
+    def _backoff_delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Retry-After if given, else full-jitter exponential backoff"""
+        if retry_after:
+            return retry_after
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    def observe_rate_limit_headers(self, headers: Mapping[str, str]):
+        """Clamp the local buckets to the remaining quota the API reports"""
+        remaining_requests = headers.get("x-ratelimit-remaining-requests")
+        remaining_tokens = headers.get("x-ratelimit-remaining-tokens")
+
+        try:
+            if remaining_requests is not None:
+                self._request_budget = min(
+                    self._request_budget, float(remaining_requests)
+                )
+            if remaining_tokens is not None:
+                self._token_budget = min(self._token_budget, float(remaining_tokens))
+        except ValueError:
+            pass
+
+    async def run(
+        self,
+        send: Callable[[], Awaitable[Dict[str, Any]]],
+        prompt_tokens: int,
+        max_tokens: int,
+    ) -> Dict[str, Any]:
+        """
+        Run one Groq request under the rate limits, retrying transient failures
+
+        Args:
+            send: Performs a single attempt and returns the client's result dict
+                  ("status_code" and "retry_after" are read on failure)
+            prompt_tokens: Estimated prompt tokens
+            max_tokens: Completion token limit of the request
+
+        Returns:
+            The result of the last attempt
+        """
+        reserved_tokens = min(
+            self.tpm_limit,
+            prompt_tokens + min(max_tokens, self.expected_completion_tokens),
+        )
+        self._requests += 1
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self._acquire(reserved_tokens)
+            except asyncio.TimeoutError:
+                return {
+                    "success": False,
+                    "error": f"Groq request queue wait exceeded {self.max_queue_wait}s",
+                }
+
+            started_at = time.monotonic()
+            try:
+                result = await send()
+            finally:
+                await self._release()
+            latency = time.monotonic() - started_at
+
+            if result.get("success", False):
+                self._on_success(latency, reserved_tokens, result.get("usage", {}))
+                return result
+
+            status_code = result.get("status_code")
+            if status_code not in RETRYABLE_STATUS_CODES or attempt == self.max_retries:
+                return result
+
+            retry_after = result.get("retry_after")
+            self._on_throttled(retry_after if status_code == 429 else None)
+            self._retries += 1
+
+            delay = self._backoff_delay(attempt, retry_after)
+            print(
+                f"⏳ Groq returned {status_code}, retrying in {delay:.1f}s "
+                f"(attempt {attempt + 1}/{self.max_retries})"
+            )
+            await asyncio.sleep(delay)
+
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get limits, saturation and retry counters"""
+        self._refill()
+        admitted = self._requests + self._retries - self._queue_timeouts
+        return {
+            "rpm_limit": self.rpm_limit,
+            "tpm_limit": self.tpm_limit,
+            "concurrency_limit": round(self._concurrency, 2),
+            "in_flight": self._in_flight,
+            "queue_depth": self._waiting,
+            "requests_available": round(self._request_budget, 2),
+            "tokens_available": round(self._token_budget),
+            "blocked_for_seconds": round(
+                max(0.0, self._blocked_until - time.monotonic()), 2
+            ),
+            "requests": self._requests,
+            "retries": self._retries,
+            "throttled": self._throttled,
+            "queue_timeouts": self._queue_timeouts,
+            "avg_wait_seconds": (
+                round(self._total_wait / admitted, 3) if admitted > 0 else 0.0
+            ),
+            "max_wait_seconds": round(self._max_wait, 3),
+        }
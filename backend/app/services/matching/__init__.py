@@ -3,7 +3,17 @@ Resume-Job Matching Module
 Complete solution for resume and job description matching with semantic and hard matching
 """
 
-from .matching_engine import MatchingEngine, match_resume_to_job, batch_match_jobs
+from .matching_engine import (
+    MatchingEngine,
+    JD_FEATURES_VERSION,
+    jd_features_are_current,
+    match_resume_to_job,
+    batch_match_jobs,
+    featurize_job_description,
+    amatch_resume_to_job,
+    abatch_match_jobs,
+    afeaturize_job_description,
+)
 from .text_preprocessor import (
     TextPreprocessor,
     preprocess_resume,
@@ -11,12 +21,29 @@ from .text_preprocessor import (
 )
 from .hard_matcher import HardMatcher, perform_hard_match
 from .semantic_matcher import SemanticMatcher, calculate_semantic_similarity
+from .embedding_store import (
+    EmbeddingStore,
+    get_embedding_store,
+    close_embedding_store,
+)
+from .job_index import JobIndex, get_job_index
+from .tfidf_model import (
+    TfidfModelManager,
+    get_tfidf_model_manager,
+    shutdown_tfidf_model_manager,
+)
 from .extract import ResumeJobExtractor, analyze_resume_job_match
 
 __all__ = [
     "MatchingEngine",
+    "JD_FEATURES_VERSION",
+    "jd_features_are_current",
     "match_resume_to_job",
     "batch_match_jobs",
+    "featurize_job_description",
+    "amatch_resume_to_job",
+    "abatch_match_jobs",
+    "afeaturize_job_description",
     "TextPreprocessor",
     "preprocess_resume",
     "preprocess_job_description",
@@ -24,6 +51,14 @@ __all__ = [
     "perform_hard_match",
     "SemanticMatcher",
     "calculate_semantic_similarity",
+    "EmbeddingStore",
+    "get_embedding_store",
+    "close_embedding_store",
+    "JobIndex",
+    "get_job_index",
+    "TfidfModelManager",
+    "get_tfidf_model_manager",
+    "shutdown_tfidf_model_manager",
     "ResumeJobExtractor",
     "analyze_resume_job_match",
 ]
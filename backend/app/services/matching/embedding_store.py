@@ -0,0 +1,457 @@
+"""
+Embedding Store
+Content-addressed TF-IDF vectors in one append-only, memory-mapped file
+"""
+
+import hashlib
+import mmap
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from scipy import sparse
+except ImportError:
+    # Vectors are only stored for corpus TF-IDF models, which need scikit-learn
+    sparse = None
+
+# Records start on 8-byte boundaries so float64 values can be viewed in place
+_ALIGNMENT = 8
+
+# SQLite allows a limited number of bound parameters per statement
+_QUERY_CHUNK = 500
+
+
+def _aligned(size: int) -> int:
+    """Round size up to the record alignment"""
+    return -(-size // _ALIGNMENT) * _ALIGNMENT
+
+
+def _record_size(nnz: int) -> int:
+    """Bytes taken by a row with nnz stored values"""
+    return _aligned(nnz * 4) + nnz * 8
+
+
+class EmbeddingStore:
+    """
+    Disk store for encoded TF-IDF rows, shared by every process.
+
+    Each row is appended to ``vectors-<generation>.bin`` as its int32 column
+    indices followed by its float64 values. A SQLite index maps (model
+    version, SHA-256 of the text) to the row's offset, so a hit is one
+    indexed query plus a zero-copy view into a read-only memory map. Appends
+    are serialised across processes by SQLite's write lock. Once the data
+    file passes ``max_bytes`` it is compacted into a new generation holding
+    the most recently used rows, up to half the budget.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        enabled: Optional[bool] = None,
+    ):
+        """
+        Initialize the store. Unset values are read from the environment.
+
+        Args:
+            directory: Where the index and data files live (EMBEDDING_STORE_DIR)
+            max_bytes: Data file size that triggers compaction (EMBEDDING_STORE_MAX_BYTES)
+            enabled: Whether the store is used at all (EMBEDDING_STORE_ENABLED)
+        """
+        self.directory = directory or os.getenv(
+            "EMBEDDING_STORE_DIR", "embedding_store"
+        )
+        self.max_bytes = max_bytes or int(
+            os.getenv("EMBEDDING_STORE_MAX_BYTES", str(256 * 1024 * 1024))
+        )
+        self.enabled = sparse is not None and (
+            enabled
+            if enabled is not None
+            else os.getenv("EMBEDDING_STORE_ENABLED", "true").lower()
+            in ("1", "true", "yes")
+        )
+        # Hits refresh last_used at most this often, to keep reads read-only
+        self.touch_interval = float(os.getenv("EMBEDDING_STORE_TOUCH_INTERVAL", "300"))
+
+        # One connection shared by the I/O threads, serialised by a lock
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._maps: Dict[int, mmap.mmap] = {}
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._compactions = 0
+
+    @staticmethod
+    def make_key(text: str) -> str:
+        """Stable content digest of a text (identical in every process)"""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _data_path(self, generation: int) -> str:
+        """Data file for a generation"""
+        return os.path.join(self.directory, f"vectors-{generation}.bin")
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Get or create the SQLite connection and schema"""
+        if self._conn is None:
+            os.makedirs(self.directory, exist_ok=True)
+            # Autocommit; writes open explicit BEGIN IMMEDIATE transactions
+            self._conn = sqlite3.connect(
+                os.path.join(self.directory, "index.sqlite3"),
+                check_same_thread=False,
+                isolation_level=None,
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model_version TEXT NOT NULL,
+                    digest TEXT NOT NULL,
+                    generation INTEGER NOT NULL,
+                    offset INTEGER NOT NULL,
+                    nnz INTEGER NOT NULL,
+                    dim INTEGER NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (model_version, digest)
+                )
+                """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_embeddings_last_used "
+                "ON embeddings (last_used)"
+            )
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS store_meta (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                )
+                """)
+            self._conn.execute(
+                "INSERT OR IGNORE INTO store_meta (name, value) VALUES ('generation', 0)"
+            )
+        return self._conn
+
+    def _generation(self, conn: sqlite3.Connection) -> int:
+        """Current data file generation"""
+        return conn.execute(
+            "SELECT value FROM store_meta WHERE name = 'generation'"
+        ).fetchone()[0]
+
+    def _view(self, generation: int, end: int) -> Optional[mmap.mmap]:
+        """
+        Read-only map of a data file covering at least end bytes
+
+        The file is remapped when another process has appended past the
+        current mapping. Returns None if the generation was compacted away.
+        """
+        mapped = self._maps.get(generation)
+        if mapped is not None and len(mapped) >= end:
+            return mapped
+
+        try:
+            with open(self._data_path(generation), "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size < end:
+                    return None
+                mapped = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return None
+
+        # Older maps close once no vector views reference them
+        self._maps = {generation: mapped}
+        return mapped
+
+    def _read_row(
+        self, generation: int, offset: int, nnz: int, dim: int
+    ) -> Optional["sparse.csr_matrix"]:
+        """1 x dim CSR row backed directly by the memory map"""
+        if nnz == 0:
+            return sparse.csr_matrix((1, dim))
+
+        view = self._view(generation, offset + _record_size(nnz))
+        if view is None:
+            return None
+
+        indices = np.frombuffer(view, dtype=np.int32, count=nnz, offset=offset)
+        values = np.frombuffer(
+            view, dtype=np.float64, count=nnz, offset=offset + _aligned(nnz * 4)
+        )
+        return sparse.csr_matrix(
+            (values, indices, np.array([0, nnz], dtype=np.int32)), shape=(1, dim)
+        )
+
+    def get_many(
+        self, model_version: str, texts: List[str]
+    ) -> List[Optional["sparse.csr_matrix"]]:
+        """
+        Look up stored rows
+
+        Args:
+            model_version: Version of the model the rows were encoded with
+            texts: Encoded texts
+
+        Returns:
+            One CSR row per text, or None on a miss
+        """
+        if not self.enabled or not texts:
+            return [None] * len(texts)
+
+        digests = [self.make_key(text) for text in texts]
+        unique = list(dict.fromkeys(digests))
+        now = time.time()
+        found: Dict[str, "sparse.csr_matrix"] = {}
+
+        with self._lock:
+            conn = self._get_connection()
+            stale = []
+            for start in range(0, len(unique), _QUERY_CHUNK):
+                chunk = unique[start : start + _QUERY_CHUNK]
+                rows = conn.execute(
+                    "SELECT digest, generation, offset, nnz, dim, last_used "
+                    "FROM embeddings WHERE model_version = ? AND digest IN "
+                    f"({', '.join('?' * len(chunk))})",
+                    [model_version] + chunk,
+                ).fetchall()
+                for digest, generation, offset, nnz, dim, last_used in rows:
+                    row = self._read_row(generation, offset, nnz, dim)
+                    if row is not None:
+                        found[digest] = row
+                        if now - last_used > self.touch_interval:
+                            stale.append(digest)
+
+            if stale:
+                conn.executemany(
+                    "UPDATE embeddings SET last_used = ? "
+                    "WHERE model_version = ? AND digest = ?",
+                    [(now, model_version, digest) for digest in stale],
+                )
+
+            results = [found.get(digest) for digest in digests]
+            hits = sum(row is not None for row in results)
+            self._hits += hits
+            self._misses += len(results) - hits
+
+        return results
+
+    def put_many(self, model_version: str, texts: List[str], rows: "sparse.csr_matrix"):
+        """
+        Append encoded rows (texts already stored are skipped)
+
+        Args:
+            model_version: Version of the model the rows were encoded with
+            texts: Encoded texts
+            rows: CSR matrix with one row per text
+        """
+        if not self.enabled or not texts:
+            return
+
+        rows = rows.tocsr()
+        pending: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for i, text in enumerate(texts):
+            start, end = rows.indptr[i], rows.indptr[i + 1]
+            pending.setdefault(
+                self.make_key(text), (rows.indices[start:end], rows.data[start:end])
+            )
+        dim = int(rows.shape[1])
+        now = time.time()
+
+        with self._lock:
+            conn = self._get_connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                digests = list(pending)
+                for start in range(0, len(digests), _QUERY_CHUNK):
+                    chunk = digests[start : start + _QUERY_CHUNK]
+                    for (digest,) in conn.execute(
+                        "SELECT digest FROM embeddings WHERE model_version = ? "
+                        f"AND digest IN ({', '.join('?' * len(chunk))})",
+                        [model_version] + chunk,
+                    ):
+                        pending.pop(digest, None)
+
+                if pending:
+                    generation = self._generation(conn)
+                    with open(self._data_path(generation), "ab") as f:
+                        offset = f.seek(0, os.SEEK_END)
+                        entries = []
+                        chunks = []
+                        for digest, (indices, values) in pending.items():
+                            record = self._encode_record(indices, values)
+                            entries.append(
+                                (
+                                    model_version,
+                                    digest,
+                                    generation,
+                                    offset,
+                                    len(indices),
+                                    dim,
+                                    now,
+                                )
+                            )
+                            chunks.append(record)
+                            offset += len(record)
+                        f.write(b"".join(chunks))
+
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO embeddings "
+                        "(model_version, digest, generation, offset, nnz, dim, last_used) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        entries,
+                    )
+
+                    if offset > self.max_bytes:
+                        self._compact(conn, generation)
+
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _encode_record(indices: np.ndarray, values: np.ndarray) -> bytes:
+        """Aligned on-disk form of one row"""
+        index_bytes = indices.astype(np.int32).tobytes()
+        padding = b"\0" * (_aligned(len(index_bytes)) - len(index_bytes))
+        return index_bytes + padding + values.astype(np.float64).tobytes()
+
+    def _compact(self, conn: sqlite3.Connection, generation: int):
+        """
+        Rewrite the most recently used rows into a new generation and drop
+        the rest (runs inside the caller's write transaction)
+        """
+        budget = self.max_bytes // 2
+        kept = []
+        evicted = []
+        used = 0
+        for entry in conn.execute(
+            "SELECT model_version, digest, offset, nnz FROM embeddings "
+            "WHERE generation = ? ORDER BY last_used DESC",
+            (generation,),
+        ).fetchall():
+            size = _record_size(entry[3])
+            if used + size <= budget:
+                kept.append(entry)
+                used += size
+            else:
+                evicted.append(entry[:2])
+
+        new_generation = generation + 1
+        moved = []
+        with open(self._data_path(generation), "rb") as src, open(
+            self._data_path(new_generation), "wb"
+        ) as dst:
+            for model_version, digest, offset, nnz in kept:
+                src.seek(offset)
+                moved.append((new_generation, dst.tell(), model_version, digest))
+                dst.write(src.read(_record_size(nnz)))
+
+        conn.executemany(
+            "DELETE FROM embeddings WHERE model_version = ? AND digest = ?", evicted
+        )
+        conn.executemany(
+            "UPDATE embeddings SET generation = ?, offset = ? "
+            "WHERE model_version = ? AND digest = ?",
+            moved,
+        )
+        conn.execute(
+            "UPDATE store_meta SET value = ? WHERE name = 'generation'",
+            (new_generation,),
+        )
+
+        # Processes still mapping the old file keep reading it until they remap
+        try:
+            os.remove(self._data_path(generation))
+        except OSError:
+            pass
+
+        self._evictions += len(evicted)
+        self._compactions += 1
+        print(f"🧹 Embedding store compacted: kept {len(kept)}, evicted {len(evicted)}")
+
+    def clear(self):
+        """Remove every stored row"""
+        with self._lock:
+            conn = self._get_connection()
+            conn.execute("BEGIN IMMEDIATE")
+            generation = self._generation(conn)
+            conn.execute("DELETE FROM embeddings")
+            conn.execute(
+                "UPDATE store_meta SET value = ? WHERE name = 'generation'",
+                (generation + 1,),
+            )
+            conn.execute("COMMIT")
+            try:
+                os.remove(self._data_path(generation))
+            except OSError:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get store configuration, size and hit/miss counters (blocking I/O)"""
+        lookups = self._hits + self._misses
+        stats = {
+            "enabled": self.enabled,
+            "directory": self.directory,
+            "max_bytes": self.max_bytes,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+            "evictions": self._evictions,
+            "compactions": self._compactions,
+        }
+
+        if self.enabled:
+            # A separate read-only connection: WAL readers never wait on
+            # put_many, and the store lock may be held through a compaction
+            stats["entries"] = 0
+            stats["data_bytes"] = 0
+            index_path = os.path.join(self.directory, "index.sqlite3")
+            if os.path.exists(index_path):
+                conn = sqlite3.connect(f"file:{index_path}?mode=ro", uri=True)
+                try:
+                    stats["entries"] = conn.execute(
+                        "SELECT COUNT(*) FROM embeddings"
+                    ).fetchone()[0]
+                    stats["data_bytes"] = os.path.getsize(
+                        self._data_path(self._generation(conn))
+                    )
+                except (sqlite3.Error, OSError, TypeError):
+                    pass
+                finally:
+                    conn.close()
+
+        return stats
+
+    def close(self):
+        """Close the SQLite connection and drop the memory maps"""
+        with self._lock:
+            self._maps = {}
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Shared store instance for the whole process
+_EMBEDDING_STORE: Optional[EmbeddingStore] = None
+
+
+def get_embedding_store() -> EmbeddingStore:
+    """Get or create the shared EmbeddingStore instance"""
+    global _EMBEDDING_STORE
+
+    if _EMBEDDING_STORE is None:
+        _EMBEDDING_STORE = EmbeddingStore()
+
+    return _EMBEDDING_STORE
+
+
+def close_embedding_store():
+    """Close the shared store (call on application shutdown)"""
+    global _EMBEDDING_STORE
+
+    if _EMBEDDING_STORE is not None:
+        _EMBEDDING_STORE.close()
+        _EMBEDDING_STORE = None
@@ -3,14 +3,21 @@ Resume-Job Matching Extractor using Groq AI
 Provides intelligent scoring and improvement recommendations for resume-job matching
 """
 
+import asyncio
 import json
 import os
 import re
-import requests
 from typing import Dict, Any, Optional, List
 from pathlib import Path
 from datetime import datetime
 
+from app.services.llm import get_groq_client, get_response_cache
+from app.services.singleflight import content_key, get_singleflight
+
+# Bump whenever the analysis prompt or the model changes so cached analyses
+# are no longer served
+ANALYSIS_PROMPT_VERSION = "1"
+
 
 class ResumeJobExtractor:
     """
@@ -22,6 +29,7 @@ class ResumeJobExtractor:
         self.api_key = os.getenv("GROQ_API_KEY")
         self.base_url = "https://api.groq.com/openai/v1/chat/completions"
         self.model = "llama-3.1-8b-instant"
+        self.client = get_groq_client()
 
         if not self.api_key:
             print(
@@ -35,12 +43,13 @@ class ResumeJobExtractor:
             print("✅ Groq API key found. AI-powered extraction is available.")
             self.api_available = True
 
-    def extract_and_score(
+    async def extract_and_score(
         self,
         resume_text: str,
         job_description_text: str,
         candidate_name: Optional[str] = None,
         job_title: Optional[str] = None,
+        use_cache: bool = True,
     ) -> Dict[str, Any]:
         """
         Extract insights and provide scoring for resume-job matching
@@ -50,6 +59,7 @@ class ResumeJobExtractor:
             job_description_text: Raw job description text
             candidate_name: Optional candidate name for personalization
             job_title: Optional job title for context
+            use_cache: Set False to bypass the response cache lookup
 
         Returns:
             Dict with comprehensive matching analysis
@@ -64,7 +74,7 @@ class ResumeJobExtractor:
             )
 
             # Call Groq API
-            response = self._call_groq_api(prompt)
+            response = await self._call_groq_api(prompt, use_cache)
 
             if response.get("success", False):
                 analysis_data = response.get("data", {})
@@ -154,36 +164,53 @@ Guidelines:
 
 Return ONLY valid JSON. No explanations, no markdown, no additional text."""
 
-    def _call_groq_api(self, prompt: str) -> Dict[str, Any]:
+    async def _call_groq_api(
+        self, prompt: str, use_cache: bool = True
+    ) -> Dict[str, Any]:
         """
-        Make API call to Groq for analysis
+        Make API call to Groq for analysis, answering repeated prompts from the
+        response cache
 
         Args:
             prompt: The analysis prompt
+            use_cache: Set False to skip the lookup (the fresh result is still stored)
 
         Returns:
             Dict with API response
         """
-        try:
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-            }
-
-            payload = {
-                "model": self.model,
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": 0.1,  # Low temperature for consistent analysis
-                "max_tokens": 4096,  # Allow for detailed analysis
-            }
+        temperature = 0.1  # Low temperature for consistent analysis
+        cache = get_response_cache()
+        cache_key = cache.make_key(
+            "analysis", self.model, ANALYSIS_PROMPT_VERSION, temperature, prompt
+        )
 
-            response = requests.post(self.base_url, headers=headers, json=payload)
-            response.raise_for_status()
+        try:
+            if use_cache:
+                # The cache is optional: a failed read counts as a miss
+                try:
+                    cached = await cache.aget(cache_key)
+                except Exception as e:
+                    print(f"⚠️ Response cache read failed, calling Groq: {e}")
+                    cached = None
+                if cached is not None:
+                    print("⚡ Groq analysis response served from cache")
+                    return cached
+
+            response = await self.client.chat_completion(
+                prompt,
+                model=self.model,
+                temperature=temperature,
+                max_tokens=4096,  # Allow for detailed analysis
+            )
 
-            result = response.json()
+            if not response.get("success", False):
+                return {
+                    "success": False,
+                    "error": response.get("error", "Unknown error occurred"),
+                }
 
-            if "choices" in result and len(result["choices"]) > 0:
-                content = result["choices"][0]["message"]["content"]
+            content = response["content"]
+            if content:
                 print(
                     f"🔍 Groq analysis response received, length: {len(content)} characters"
                 )
@@ -202,7 +229,12 @@ Return ONLY valid JSON. No explanations, no markdown, no additional text."""
 
                 try:
                     analysis_data = json.loads(content)
-                    return {"success": True, "data": analysis_data}
+                    result = {"success": True, "data": analysis_data}
+                    try:
+                        await cache.aset(cache_key, "analysis", result)
+                    except Exception as e:
+                        print(f"⚠️ Response cache write failed: {e}")
+                    return result
                 except json.JSONDecodeError as e:
                     print(f"❌ JSON parsing error: {e}")
                     print(f"Raw content: {content[:500]}...")
@@ -213,8 +245,6 @@ Return ONLY valid JSON. No explanations, no markdown, no additional text."""
             else:
                 return {"success": False, "error": "No valid response from Groq API"}
 
-        except requests.exceptions.RequestException as e:
-            return {"success": False, "error": f"API request failed: {str(e)}"}
         except Exception as e:
             return {"success": False, "error": f"Unexpected error: {str(e)}"}
 
@@ -344,27 +374,41 @@ Return ONLY valid JSON. No explanations, no markdown, no additional text."""
 
 
 # Convenience functions
-def analyze_resume_job_match(
+async def analyze_resume_job_match(
     resume_text: str,
     job_description_text: str,
     candidate_name: Optional[str] = None,
     job_title: Optional[str] = None,
+    use_cache: bool = True,
 ) -> Dict[str, Any]:
     """
-    Convenience function to analyze resume-job match
+    Convenience function to analyze resume-job match. Identical concurrent
+    calls share one Groq request.
 
     Args:
         resume_text: Raw resume text
         job_description_text: Raw job description text
         candidate_name: Optional candidate name
         job_title: Optional job title
+        use_cache: Set False to bypass the response cache lookup
 
     Returns:
         Dict with comprehensive analysis
     """
     extractor = ResumeJobExtractor()
-    return extractor.extract_and_score(
-        resume_text, job_description_text, candidate_name, job_title
+    key = content_key(
+        ANALYSIS_PROMPT_VERSION,
+        resume_text,
+        job_description_text,
+        candidate_name,
+        job_title,
+        use_cache,
+    )
+    return await get_singleflight("analysis").do(
+        key,
+        lambda: extractor.extract_and_score(
+            resume_text, job_description_text, candidate_name, job_title, use_cache
+        ),
     )
 
 
@@ -406,11 +450,13 @@ if __name__ == "__main__":
     """
 
     extractor = ResumeJobExtractor()
-    result = extractor.extract_and_score(
-        sample_resume,
-        sample_jd,
-        candidate_name="John Doe",
-        job_title="Senior Python Developer",
+    result = asyncio.run(
+        extractor.extract_and_score(
+            sample_resume,
+            sample_jd,
+            candidate_name="John Doe",
+            job_title="Senior Python Developer",
+        )
     )
 
     print("=== Resume-Job Matching Analysis ===")
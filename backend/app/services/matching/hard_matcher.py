@@ -3,11 +3,20 @@ Hard Matching Module for Resume-Job Matching
 Implements exact and fuzzy string matching for skills and keywords
 """
 
+import hashlib
 import json
 import logging
-from typing import List, Dict, Set, Tuple, Any
+import os
+from typing import List, Dict, Hashable, Iterable, Optional, Set, Tuple, Union, Any
 from pathlib import Path
 
+import numpy as np
+
+try:
+    from scipy import sparse
+except ImportError:
+    sparse = None
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
@@ -22,6 +31,15 @@ except ImportError:
         fuzz = None
         process = None
 
+# rapidfuzz scores a whole query x choice matrix natively; fuzzywuzzy cannot
+_cdist = getattr(process, "cdist", None)
+
+# Unique JD tokens scored per cdist call, bounding the score matrix size
+_FUZZY_BLOCK_ROWS = 1024
+# cdist threads per call (-1 = all cores); lower it when many worker
+# processes score at once
+_FUZZY_WORKERS = int(os.getenv("FUZZY_MATCH_WORKERS", "-1"))
+
 # Module-level skills database for efficiency
 _SKILLS_DATABASE = {
     "programming_languages": [
@@ -414,6 +432,157 @@ _ALL_SKILLS_SET = set()
 for category_skills in _SKILLS_DATABASE.values():
     _ALL_SKILLS_SET.update(category_skills)
 
+# Alternative spellings -> the database spelling that names the skill. Cleaned
+# forms ("cplusplus", "aspdotnet") are listed too, since documents are matched
+# after clean_text
+_SKILL_ALIASES = {
+    "csharp": "c#",
+    "cplusplus": "c++",
+    "golang": "go",
+    "reactjs": "react",
+    "react.js": "react",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "d3.js": "d3",
+    "expressjs": "express",
+    "node": "node.js",
+    "nodejs": "node.js",
+    "dotnet": ".net",
+    "aspdotnet": "asp.net",
+    "rails": "ruby on rails",
+    "postgres": "postgresql",
+    "sqlserver": "sql server",
+    "mssql": "sql server",
+    "amazon web services": "aws",
+    "microsoft azure": "azure",
+    "google cloud": "gcp",
+    "google cloud platform": "gcp",
+    "k8s": "kubernetes",
+    "sklearn": "scikit-learn",
+    "test driven development": "tdd",
+    "behavior driven development": "bdd",
+}
+
+
+class SkillIndex:
+    """
+    Canonical skills with integer ids. Every database spelling and alias maps,
+    lowercased, to one id, so documents carry id sets and skill matching is
+    set arithmetic on ints.
+    """
+
+    def __init__(self, skills_database: Dict[str, List[str]], aliases: Dict[str, str]):
+        self.names: List[str] = []
+        self.categories: List[List[str]] = []
+        self._ids: Dict[str, int] = {}
+
+        for category, skills in skills_database.items():
+            for skill in skills:
+                term = skill.lower()
+                skill_id = self._id_for(aliases.get(term, term))
+                if category not in self.categories[skill_id]:
+                    self.categories[skill_id].append(category)
+                self._ids[term] = skill_id
+
+        for alias, canonical in aliases.items():
+            self._ids.setdefault(alias, self._id_for(canonical))
+
+        # Content-derived, so documents indexed under other ids are detectable
+        digest = hashlib.sha256(
+            json.dumps([self.names, self.categories, sorted(self._ids.items())]).encode(
+                "utf-8"
+            )
+        )
+        self.version = digest.hexdigest()[:16]
+
+    def _id_for(self, canonical: str) -> int:
+        """Id of a canonical name, allocating one on first sight"""
+        skill_id = self._ids.get(canonical)
+        if skill_id is None:
+            skill_id = len(self.names)
+            self.names.append(canonical)
+            self.categories.append([])
+            self._ids[canonical] = skill_id
+        return skill_id
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def lookup(self, skill: str) -> Optional[int]:
+        """Id of a skill or alias (case-insensitive), or None"""
+        return self._ids.get(skill.lower())
+
+    def ids_for(self, skills: Iterable[str]) -> Set[int]:
+        """Ids of the known skills among skills"""
+        ids = set()
+        for skill in skills:
+            skill_id = self._ids.get(skill.lower())
+            if skill_id is not None:
+                ids.add(skill_id)
+        return ids
+
+    def names_for(self, skill_ids: Iterable[int]) -> List[str]:
+        """Canonical names of skill ids, sorted"""
+        return sorted(self.names[skill_id] for skill_id in skill_ids)
+
+    def terms(self) -> Iterable[Tuple[str, int]]:
+        """Every (spelling or alias, id) pair"""
+        return self._ids.items()
+
+
+_SKILL_INDEX = SkillIndex(_SKILLS_DATABASE, _SKILL_ALIASES)
+
+
+class KeywordIncidence:
+    """
+    Binary document x term matrix over a shared vocabulary. The overlap of one
+    term set with every document is then a single sparse matrix-vector
+    product; build it once per catalogue to score many queries against it.
+    Without scipy the rows are kept as sets and intersected one by one.
+    """
+
+    def __init__(self, term_sets: Iterable[Iterable[Hashable]]):
+        """
+        Args:
+            term_sets: One collection of terms per document (row)
+        """
+        self.vocabulary: Dict[Hashable, int] = {}
+        rows = [
+            {self.vocabulary.setdefault(term, len(self.vocabulary)) for term in terms}
+            for terms in term_sets
+        ]
+        self.totals = np.array([len(row) for row in rows], dtype=np.int64)
+
+        if sparse is None:
+            self._rows = rows
+            self.matrix = None
+            return
+
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(self.totals, out=indptr[1:])
+        indices = np.fromiter(
+            (column for row in rows for column in row),
+            dtype=np.int64,
+            count=int(indptr[-1]),
+        )
+        self.matrix = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.int32), indices, indptr),
+            shape=(len(rows), len(self.vocabulary)),
+        )
+
+    def __len__(self) -> int:
+        return len(self.totals)
+
+    def overlap(self, terms: Iterable[Hashable]) -> np.ndarray:
+        """Number of distinct terms each document shares with terms"""
+        columns = {self.vocabulary[term] for term in terms if term in self.vocabulary}
+        if self.matrix is None:
+            return np.array([len(row & columns) for row in self._rows], dtype=np.int64)
+
+        vector = np.zeros(len(self.vocabulary), dtype=np.int32)
+        vector[list(columns)] = 1
+        return self.matrix @ vector
+
 
 class SkillsDatabase:
     """
@@ -435,12 +604,10 @@ class SkillsDatabase:
 
     def categorize_skill(self, skill: str) -> List[str]:
         """Find which categories a skill belongs to"""
-        categories = []
-        skill_lower = skill.lower()
-        for category, skills in self.skills_db.items():
-            if skill_lower in [s.lower() for s in skills]:
-                categories.append(category)
-        return categories
+        skill_id = _SKILL_INDEX.lookup(skill)
+        if skill_id is None:
+            return []
+        return list(_SKILL_INDEX.categories[skill_id])
 
 
 class HardMatcher:
@@ -496,6 +663,49 @@ class HardMatcher:
             "exact_match_score": float(round(exact_score, 2)),
         }
 
+    def batch_exact_match(
+        self,
+        resume_tokens: Set[str],
+        jd_keywords: Union[KeywordIncidence, List[Set[str]]],
+    ) -> Dict[str, np.ndarray]:
+        """
+        exact_match counts for one resume against many job descriptions
+
+        Args:
+            resume_tokens: Set of tokens from resume
+            jd_keywords: Keyword set per job description, or a KeywordIncidence
+                built from lowercased keyword sets (see keyword_incidence)
+
+        Returns:
+            Dict of per-job arrays: matched_count, missing_count, extra_count,
+            total_jd_keywords and exact_match_score, each equal to what
+            exact_match reports for that job
+        """
+        resume_lower = {token.lower() for token in resume_tokens}
+        incidence = (
+            jd_keywords
+            if isinstance(jd_keywords, KeywordIncidence)
+            else self.keyword_incidence(jd_keywords)
+        )
+
+        matched = incidence.overlap(resume_lower)
+        totals = incidence.totals
+        scores = np.divide(matched, totals, out=np.zeros(len(totals)), where=totals > 0)
+        return {
+            "matched_count": matched,
+            "missing_count": totals - matched,
+            "extra_count": len(resume_lower) - matched,
+            "total_jd_keywords": totals,
+            "exact_match_score": np.round(scores * 100, 2),
+        }
+
+    @staticmethod
+    def keyword_incidence(jd_keywords: List[Set[str]]) -> KeywordIncidence:
+        """KeywordIncidence over lowercased job keyword sets, for batch_exact_match"""
+        return KeywordIncidence(
+            [{token.lower() for token in keywords} for keywords in jd_keywords]
+        )
+
     def fuzzy_match(
         self, resume_tokens: List[str], jd_tokens: List[str]
     ) -> Dict[str, Any]:
@@ -515,24 +725,13 @@ class HardMatcher:
         fuzzy_matches = []
         fuzzy_matched_jd = set()
 
-        for jd_token in jd_tokens:
-            # Find best match in resume
-            if process:
-                best_match = process.extractOne(
-                    jd_token,
-                    resume_tokens,
-                    scorer=fuzz.ratio,
-                    score_cutoff=self.fuzzy_threshold,
-                )
-            else:
-                best_match = None
-                best_score = 0
-                for resume_token in resume_tokens:
-                    score = fuzz.ratio(jd_token, resume_token)
-                    if score > best_score and score >= self.fuzzy_threshold:
-                        best_score = score
-                        best_match = (resume_token, score)
+        # Repeated tokens are scored once, then expanded back per position
+        best_matches = self._best_fuzzy_matches(
+            list(dict.fromkeys(jd_tokens)), list(dict.fromkeys(resume_tokens))
+        )
 
+        for jd_token in jd_tokens:
+            best_match = best_matches[jd_token]
             if best_match:
                 fuzzy_matches.append(
                     {
@@ -557,6 +756,65 @@ class HardMatcher:
             "fuzzy_match_score": float(round(fuzzy_score, 2)),
         }
 
+    def _best_fuzzy_matches(
+        self, queries: List[str], choices: List[str]
+    ) -> Dict[str, Optional[Tuple[str, float]]]:
+        """
+        Best choice scoring at least fuzzy_threshold for every query
+
+        Same result as process.extractOne per query (ties go to the earliest
+        choice), but with rapidfuzz the whole score matrix comes from one
+        native, multi-threaded cdist call per block of queries.
+
+        Args:
+            queries: Distinct strings to match
+            choices: Distinct candidates, in priority order
+
+        Returns:
+            Dict mapping each query to (choice, score), or None below threshold
+        """
+        if _cdist is None or not choices:
+            best = {}
+            for query in queries:
+                if process:
+                    match = process.extractOne(
+                        query,
+                        choices,
+                        scorer=fuzz.ratio,
+                        score_cutoff=self.fuzzy_threshold,
+                    )
+                else:
+                    match = None
+                    best_score = 0
+                    for choice in choices:
+                        score = fuzz.ratio(query, choice)
+                        if score > best_score and score >= self.fuzzy_threshold:
+                            best_score = score
+                            match = (choice, score)
+                best[query] = match[:2] if match else None
+            return best
+
+        best = {}
+        for start in range(0, len(queries), _FUZZY_BLOCK_ROWS):
+            block = queries[start : start + _FUZZY_BLOCK_ROWS]
+            # float64 keeps scores identical to fuzz.ratio; entries below the
+            # cutoff come back as 0
+            scores = _cdist(
+                block,
+                choices,
+                scorer=fuzz.ratio,
+                score_cutoff=self.fuzzy_threshold,
+                dtype=np.float64,
+                workers=_FUZZY_WORKERS,
+            )
+            columns = scores.argmax(axis=1)
+            for query, row, column in zip(block, scores, columns):
+                score = float(row[column])
+                best[query] = (
+                    (choices[column], score) if score >= self.fuzzy_threshold else None
+                )
+        return best
+
     def _basic_fuzzy_match(
         self, resume_tokens: List[str], jd_tokens: List[str]
     ) -> Dict[str, Any]:
@@ -613,14 +871,16 @@ class HardMatcher:
         Returns:
             Dict with skills matching results
         """
-        # Extract skills from both texts
-        resume_skills = self._extract_database_skills(resume_data["skills_data"])
-        jd_skills = self._extract_database_skills(jd_data["skills_data"])
+        # Skill ids of both texts; aliases already share an id
+        resume_ids = self._skill_ids(resume_data)
+        jd_ids = self._skill_ids(jd_data)
 
         # Find matches
-        exact_skill_matches = set(resume_skills).intersection(set(jd_skills))
-        missing_skills = set(jd_skills) - set(resume_skills)
-        extra_skills = set(resume_skills) - set(jd_skills)
+        resume_skills = _SKILL_INDEX.names_for(resume_ids)
+        jd_skills = _SKILL_INDEX.names_for(jd_ids)
+        exact_skill_matches = _SKILL_INDEX.names_for(resume_ids & jd_ids)
+        missing_skills = _SKILL_INDEX.names_for(jd_ids - resume_ids)
+        extra_skills = _SKILL_INDEX.names_for(resume_ids - jd_ids)
 
         # Fuzzy match missing skills
         fuzzy_skill_matches = []
@@ -651,6 +911,8 @@ class HardMatcher:
                         }
                     )
 
+        fuzzy_required = {match["required_skill"] for match in fuzzy_skill_matches}
+
         # Calculate skill match score
         total_required_skills = len(jd_skills)
         matched_skills = len(exact_skill_matches) + len(fuzzy_skill_matches)
@@ -661,34 +923,26 @@ class HardMatcher:
         )
 
         return {
-            "required_skills": list(jd_skills),
-            "resume_skills": list(resume_skills),
-            "exact_skill_matches": list(exact_skill_matches),
+            "required_skills": jd_skills,
+            "resume_skills": resume_skills,
+            "exact_skill_matches": exact_skill_matches,
             "fuzzy_skill_matches": fuzzy_skill_matches,
-            "missing_skills": list(
-                missing_skills
-                - {match["required_skill"] for match in fuzzy_skill_matches}
-            ),
-            "extra_skills": list(extra_skills),
+            "missing_skills": [
+                skill for skill in missing_skills if skill not in fuzzy_required
+            ],
+            "extra_skills": extra_skills,
             "skill_match_score": float(round(skill_score, 2)),
             "total_required_skills": total_required_skills,
             "total_matched_skills": matched_skills,
         }
 
-    def _extract_database_skills(self, skills_data: Dict[str, List[str]]) -> List[str]:
-        """Extract skills that are in our database"""
-        all_db_skills = self.skills_db.get_all_skills()
-        found_skills = []
-
-        for category_skills in skills_data.values():
-            for skill in category_skills:
-                # Check if skill is in database (case-insensitive)
-                for db_skill in all_db_skills:
-                    if skill.lower() == db_skill.lower():
-                        found_skills.append(db_skill)
-                        break
-
-        return list(set(found_skills))
+    def _skill_ids(self, data: Dict[str, Any]) -> Set[int]:
+        """Skill ids of a preprocessed document, derived from skills_data if absent"""
+        if "skill_ids" in data:
+            return data["skill_ids"]
+        return _SKILL_INDEX.ids_for(
+            skill for skills in data["skills_data"].values() for skill in skills
+        )
 
     def comprehensive_hard_match(
         self, resume_data: Dict[str, Any], jd_data: Dict[str, Any]
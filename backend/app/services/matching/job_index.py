@@ -0,0 +1,359 @@
+"""
+Job Vector Index
+Top-k retrieval of stored jobs for a resume over TF-IDF job vectors
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from scipy import sparse
+except ImportError:
+    # Only needed for TF-IDF vectors, which require scikit-learn (and so scipy)
+    sparse = None
+
+try:
+    from .semantic_matcher import SemanticMatcher
+    from .text_preprocessor import _get_preprocessor
+    from .tfidf_model import TfidfModel
+except ImportError:
+    from semantic_matcher import SemanticMatcher
+    from text_preprocessor import _get_preprocessor
+    from tfidf_model import TfidfModel
+
+
+class JobIndex:
+    """
+    In-memory index of job vectors for "which jobs fit this resume".
+
+    Jobs are kept as L2-normalised CSR rows under the current corpus TF-IDF
+    model, so a resume's cosine similarity to every job is one sparse product.
+    Small catalogues are searched exactly in blocks of ``block_rows``. From
+    ``ivf_min_jobs`` jobs on, an IVF partition (spherical k-means lists) is
+    used: only the jobs in the ``ivf_probes`` lists nearest the resume are
+    scored. Adds and removes are incremental (new jobs join their nearest
+    list); the lists are retrained once the catalogue doubles, and the whole
+    index is re-encoded only when the corpus model is refitted.
+    """
+
+    def __init__(
+        self,
+        block_rows: Optional[int] = None,
+        ivf_min_jobs: Optional[int] = None,
+        ivf_lists: Optional[int] = None,
+        ivf_probes: Optional[int] = None,
+    ):
+        """
+        Initialize the index. Unset values are read from the environment.
+
+        Args:
+            block_rows: Jobs scored per block in exact search (JOB_INDEX_BLOCK_ROWS)
+            ivf_min_jobs: Catalogue size that switches to IVF (JOB_INDEX_IVF_MIN_JOBS)
+            ivf_lists: Number of IVF lists (JOB_INDEX_IVF_LISTS, 0 = sqrt of jobs)
+            ivf_probes: Lists scored per search (JOB_INDEX_IVF_PROBES)
+        """
+        self.block_rows = block_rows or int(os.getenv("JOB_INDEX_BLOCK_ROWS", "4096"))
+        self.ivf_min_jobs = ivf_min_jobs or int(
+            os.getenv("JOB_INDEX_IVF_MIN_JOBS", "5000")
+        )
+        self.ivf_lists = ivf_lists or int(os.getenv("JOB_INDEX_IVF_LISTS", "0"))
+        self.ivf_probes = ivf_probes or int(os.getenv("JOB_INDEX_IVF_PROBES", "8"))
+
+        self._matcher = SemanticMatcher()
+        self._lock = threading.Lock()
+
+        # Job texts are kept so the index can re-encode after a refit
+        self._texts: Dict[Any, str] = {}
+        self._version: Optional[str] = None
+        self._ids: List[Any] = []
+        self._positions: Dict[Any, int] = {}
+        self._matrix: Optional["sparse.csr_matrix"] = None
+        self._pending: List[Tuple[Any, "sparse.csr_matrix"]] = []
+        self._removed: set = set()
+
+        # IVF state: centroids, list per row and rows per list
+        self._centroids: Optional[np.ndarray] = None
+        self._assignments = np.empty(0, dtype=np.int64)
+        self._lists: List[np.ndarray] = []
+        self._trained_rows = 0
+
+        self._searches = 0
+        self._rebuilds = 0
+
+    def add(self, job_id: Any, text: str):
+        """
+        Add or replace a job
+
+        Args:
+            job_id: Job ID
+            text: Raw job description text
+        """
+        cleaned = _get_preprocessor().clean_text(text)
+        with self._lock:
+            self._discard(job_id)
+            self._texts[job_id] = cleaned
+
+            model = self._matcher.current_model()
+            if model is not None and model.version == self._version:
+                row = self._matcher.encode_texts([cleaned], model=model)
+                self._pending.append((job_id, row))
+
+    def remove(self, job_id: Any):
+        """Remove a job (a no-op for unknown IDs)"""
+        with self._lock:
+            self._texts.pop(job_id, None)
+            self._discard(job_id)
+
+    def clear(self):
+        """Remove every job"""
+        with self._lock:
+            self._texts = {}
+            self._reset(None)
+
+    def _discard(self, job_id: Any):
+        """Drop a job's row (lock held)"""
+        self._pending = [entry for entry in self._pending if entry[0] != job_id]
+        if job_id in self._positions:
+            self._removed.add(self._positions.pop(job_id))
+
+    def _reset(self, version: Optional[str]):
+        """Empty the vector state (lock held)"""
+        self._version = version
+        self._ids = []
+        self._positions = {}
+        self._matrix = None
+        self._pending = []
+        self._removed = set()
+        self._centroids = None
+        self._assignments = np.empty(0, dtype=np.int64)
+        self._lists = []
+        self._trained_rows = 0
+
+    def _rebuild(self, model: TfidfModel):
+        """Re-encode every job under model (lock held)"""
+        self._reset(model.version)
+        if self._texts:
+            job_ids = list(self._texts)
+            rows = self._matcher.encode_texts(
+                [self._texts[job_id] for job_id in job_ids], model=model
+            )
+            self._pending = [
+                (job_id, rows[i : i + 1]) for i, job_id in enumerate(job_ids)
+            ]
+        self._rebuilds += 1
+
+    def _flush(self):
+        """Fold pending rows into the matrix, compacting removed rows (lock held)"""
+        if not self._pending and len(self._removed) <= len(self._ids) // 4:
+            return
+
+        kept = [i for i in range(len(self._ids)) if i not in self._removed]
+        blocks = []
+        if self._matrix is not None and kept:
+            blocks.append(
+                self._matrix if len(kept) == len(self._ids) else self._matrix[kept]
+            )
+        blocks.extend(row for _, row in self._pending)
+
+        added = len(self._pending)
+        self._ids = [self._ids[i] for i in kept] + [
+            job_id for job_id, _ in self._pending
+        ]
+        self._positions = {job_id: i for i, job_id in enumerate(self._ids)}
+        self._matrix = sparse.vstack(blocks, format="csr") if blocks else None
+        self._pending = []
+        self._removed = set()
+
+        if self._centroids is not None:
+            # Keep the trained lists: drop removed rows, place new ones
+            self._assignments = self._assignments[kept]
+            if added:
+                self._assignments = np.concatenate(
+                    [self._assignments, self._nearest_lists(self._matrix[-added:])]
+                )
+            self._group_lists()
+
+    def search(self, resume_text: str, top_k: int = 10) -> Dict[str, Any]:
+        """
+        Find the jobs most similar to a resume
+
+        Args:
+            resume_text: Raw resume text
+            top_k: Number of jobs to return
+
+        Returns:
+            Dict with "results" (job_id, similarity between 0 and 1, best
+            first) and search details
+        """
+        started = time.perf_counter()
+        cleaned = _get_preprocessor().clean_text(resume_text)
+
+        with self._lock:
+            self._searches += 1
+            model = self._matcher.current_model()
+
+            if model is None:
+                # No corpus model yet: throwaway fit over this resume and the jobs
+                results, method, candidates = self._search_transient(cleaned, top_k)
+            else:
+                if model.version != self._version:
+                    self._rebuild(model)
+                self._flush()
+                results, method, candidates = self._search_indexed(
+                    cleaned, top_k, model
+                )
+
+            return {
+                "results": results,
+                "method": method,
+                "candidates_scored": candidates,
+                "jobs_indexed": len(self._texts),
+                "model_version": model.version if model else None,
+                "search_ms": round((time.perf_counter() - started) * 1000, 3),
+            }
+
+    def _search_transient(
+        self, cleaned: str, top_k: int
+    ) -> Tuple[List[Tuple[Any, float]], str, int]:
+        """Exact search with a model fitted on the resume and every job"""
+        job_ids = list(self._texts)
+        if not job_ids or not cleaned.strip():
+            return [], "transient", 0
+
+        scores = self._matcher.batch_overall_similarity(
+            cleaned, [self._texts[job_id] for job_id in job_ids]
+        )
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        return (
+            [(job_ids[i], float(scores[i])) for i in order],
+            "transient",
+            len(job_ids),
+        )
+
+    def _search_indexed(
+        self, cleaned: str, top_k: int, model: TfidfModel
+    ) -> Tuple[List[Tuple[Any, float]], str, int]:
+        """Exact blocked search, or IVF candidates for large catalogues"""
+        if self._matrix is None or top_k <= 0 or not cleaned.strip():
+            return [], "exact", 0
+
+        query = self._matcher.encode_texts([cleaned], model=model)
+        # Rows of removed jobs stay in the matrix until the next compaction
+        removed = np.fromiter(self._removed, dtype=np.int64, count=len(self._removed))
+
+        if len(self._ids) >= self.ivf_min_jobs:
+            candidates = self._ivf_candidates(query)
+            candidates = candidates[~np.isin(candidates, removed)]
+            if len(candidates) >= top_k:
+                scores = (self._matrix[candidates] @ query.T).toarray()[:, 0]
+                return self._top(candidates, scores, top_k), "ivf", len(candidates)
+
+        # Exact search, one block of rows at a time
+        best_rows = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0)
+        for start in range(0, len(self._ids), self.block_rows):
+            block = self._matrix[start : start + self.block_rows]
+            scores = (block @ query.T).toarray()[:, 0]
+            in_block = removed[(removed >= start) & (removed < start + len(scores))]
+            scores[in_block - start] = -np.inf
+            keep = self._top_positions(scores, top_k)
+            best_rows = np.concatenate([best_rows, keep + start])
+            best_scores = np.concatenate([best_scores, scores[keep]])
+
+        return self._top(best_rows, best_scores, top_k), "exact", len(self._ids)
+
+    @staticmethod
+    def _top_positions(scores: np.ndarray, top_k: int) -> np.ndarray:
+        """Positions of the top_k scores, unordered"""
+        if len(scores) <= top_k:
+            return np.arange(len(scores))
+        return np.argpartition(-scores, top_k - 1)[:top_k]
+
+    def _top(
+        self, rows: np.ndarray, scores: np.ndarray, top_k: int
+    ) -> List[Tuple[Any, float]]:
+        """Best top_k (row, score) pairs as (job_id, similarity), earliest row first on ties"""
+        order = np.lexsort((rows, -scores))[:top_k]
+        order = order[np.isfinite(scores[order])]
+        return [
+            (self._ids[rows[i]], float(np.clip(scores[i], 0.0, 1.0))) for i in order
+        ]
+
+    def _nearest_lists(self, rows: "sparse.csr_matrix") -> np.ndarray:
+        """Index of the most similar centroid for each row"""
+        return np.asarray((rows @ self._centroids.T).argmax(axis=1)).ravel()
+
+    def _group_lists(self):
+        """Rebuild the rows-per-list arrays from the assignments"""
+        order = np.argsort(self._assignments, kind="stable")
+        bounds = np.searchsorted(
+            self._assignments[order], np.arange(len(self._centroids) + 1)
+        )
+        self._lists = [
+            order[bounds[i] : bounds[i + 1]] for i in range(len(self._centroids))
+        ]
+
+    def _train_ivf(self, iterations: int = 5):
+        """Spherical k-means over the job rows (lock held)"""
+        n_rows = self._matrix.shape[0]
+        n_lists = min(n_rows, self.ivf_lists or int(np.sqrt(n_rows)))
+        rng = np.random.default_rng(0)
+        self._centroids = self._matrix[
+            rng.choice(n_rows, n_lists, replace=False)
+        ].toarray()
+
+        for _ in range(iterations):
+            self._assignments = self._nearest_lists(self._matrix)
+            members = sparse.csr_matrix(
+                (np.ones(n_rows), (self._assignments, np.arange(n_rows))),
+                shape=(n_lists, n_rows),
+            )
+            sums = np.asarray((members @ self._matrix).todense())
+            norms = np.linalg.norm(sums, axis=1)
+            # Empty lists keep their previous centroid
+            filled = norms > 0
+            self._centroids[filled] = sums[filled] / norms[filled, None]
+
+        self._assignments = self._nearest_lists(self._matrix)
+        self._group_lists()
+        self._trained_rows = n_rows
+
+    def _ivf_candidates(self, query: "sparse.csr_matrix") -> np.ndarray:
+        """Rows in the lists whose centroids are nearest the query"""
+        if self._centroids is None or len(self._ids) >= 2 * self._trained_rows:
+            self._train_ivf()
+
+        centroid_scores = (query @ self._centroids.T).ravel()
+        probes = self._top_positions(
+            centroid_scores, min(self.ivf_probes, len(self._centroids))
+        )
+        return np.sort(np.concatenate([self._lists[i] for i in probes]))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index size and counters"""
+        return {
+            "jobs": len(self._texts),
+            "model_version": self._version,
+            "ivf_active": len(self._ids) >= self.ivf_min_jobs,
+            "ivf_lists": 0 if self._centroids is None else len(self._centroids),
+            "searches": self._searches,
+            "rebuilds": self._rebuilds,
+        }
+
+
+# Shared index instance for the API process
+_JOB_INDEX: Optional[JobIndex] = None
+
+
+def get_job_index() -> JobIndex:
+    """Get or create the shared JobIndex instance"""
+    global _JOB_INDEX
+
+    if _JOB_INDEX is None:
+        _JOB_INDEX = JobIndex()
+
+    return _JOB_INDEX
@@ -6,35 +6,73 @@ Combines text preprocessing, hard matching, and semantic matching with configura
 import json
 import os
 import logging
+import numpy as np
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from pathlib import Path
 
+try:
+    from scipy import sparse
+except ImportError:
+    # Only needed for TF-IDF vectors, which require scikit-learn (and so scipy)
+    sparse = None
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
 # Import our matching modules
 try:
     from .text_preprocessor import (
+        PREPROCESSOR_VERSION,
         TextPreprocessor,
         preprocess_resume,
         preprocess_job_description,
     )
-    from .hard_matcher import HardMatcher, perform_hard_match
+    from .hard_matcher import (
+        _SKILL_INDEX,
+        HardMatcher,
+        KeywordIncidence,
+        perform_hard_match,
+    )
     from .semantic_matcher import SemanticMatcher, calculate_semantic_similarity
+    from .tfidf_model import TfidfModel
 except ImportError:
     # Fallback for direct execution
     try:
         from text_preprocessor import (
+            PREPROCESSOR_VERSION,
             TextPreprocessor,
             preprocess_resume,
             preprocess_job_description,
         )
-        from hard_matcher import HardMatcher, perform_hard_match
+        from hard_matcher import (
+            _SKILL_INDEX,
+            HardMatcher,
+            KeywordIncidence,
+            perform_hard_match,
+        )
         from semantic_matcher import SemanticMatcher, calculate_semantic_similarity
+        from tfidf_model import TfidfModel
     except ImportError as e:
         print(f"Warning: Could not import matching modules: {e}")
 
+from app.services.executor import get_executor
+
+# batch_match fully scores this many shortlisted jobs per requested result
+BATCH_RERANK_FACTOR = 2
+
+# Bump when the layout of featurize_job_description output changes
+JD_FEATURES_VERSION = "2"
+
+
+def jd_features_are_current(jd_features: Optional[Dict[str, Any]]) -> bool:
+    """Whether stored JD features match the current layout, preprocessor and skill ids"""
+    return bool(jd_features) and (
+        jd_features.get("features_version") == JD_FEATURES_VERSION
+        and jd_features.get("preprocessor_version") == PREPROCESSOR_VERSION
+        and jd_features.get("skill_index_version") == _SKILL_INDEX.version
+    )
+
 
 class MatchingEngine:
     """
@@ -139,7 +177,10 @@ class MatchingEngine:
             return data
 
     def match_resume_to_job(
-        self, resume_text: str, job_description_text: str
+        self,
+        resume_text: str,
+        job_description_text: str,
+        jd_features: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """
         Complete resume-job matching pipeline
@@ -147,6 +188,8 @@ class MatchingEngine:
         Args:
             resume_text: Raw resume text
             job_description_text: Raw job description text
+            jd_features: featurize_job_description output for the job, so
+                         only the resume is processed (recomputed if stale)
 
         Returns:
             Dict with comprehensive matching results
@@ -157,8 +200,39 @@ class MatchingEngine:
             # Step 1: Text Preprocessing
             print("📄 Step 1: Preprocessing texts...")
             resume_data = preprocess_resume(resume_text)
-            jd_data = preprocess_job_description(job_description_text)
+            # Pin one TF-IDF model so a hot swap mid-match cannot mix vocabularies
+            model = self.semantic_matcher.current_model()
+            jd_data = self._jd_data_from_features(
+                job_description_text, jd_features, model
+            )
+            if jd_data is None:
+                jd_data = preprocess_job_description(job_description_text)
+        except Exception as e:
+            error_msg = f"Error in matching pipeline: {str(e)}"
+            logger.error(error_msg, exc_info=True)
+            print(f"❌ {error_msg}")
+            return self._create_error_result(error_msg)
+
+        return self._match_preprocessed(resume_data, jd_data, model)
 
+    def _match_preprocessed(
+        self,
+        resume_data: Dict[str, Any],
+        jd_data: Dict[str, Any],
+        model: Optional[TfidfModel] = None,
+    ) -> Dict[str, Any]:
+        """
+        Matching pipeline from hard matching onwards, for preprocessed texts
+
+        Args:
+            resume_data: preprocess_resume output
+            jd_data: preprocess_job_description output
+            model: TF-IDF model for semantic matching (see SemanticMatcher)
+
+        Returns:
+            Dict with comprehensive matching results
+        """
+        try:
             if (
                 not resume_data["cleaned_text"].strip()
                 or not jd_data["cleaned_text"].strip()
@@ -189,7 +263,11 @@ class MatchingEngine:
             # Step 3: Semantic Matching
             print("🤖 Step 3: Performing semantic matching...")
             semantic_results = self.semantic_matcher.semantic_match_detailed(
-                resume_data["semantic_text"], jd_data["semantic_text"]
+                resume_data["semantic_text"],
+                jd_data["semantic_text"],
+                jd_sections=jd_data.get("sections"),
+                jd_vectors=jd_data.get("tfidf_vectors"),
+                model=model,
             )
             semantic_score = float(
                 semantic_results["semantic_score"]
@@ -493,31 +571,240 @@ class MatchingEngine:
             "suggestions": ["Please check the input text and try again"],
         }
 
+    def featurize_job_description(self, job_description_text: str) -> Dict[str, Any]:
+        """
+        Precompute everything matching needs from a job description
+
+        The result is JSON-serialisable so it can be stored on the job record.
+        It is stamped with the feature layout, preprocessor and vectorizer
+        versions; match_resume_to_job recomputes whatever is stale.
+
+        Args:
+            job_description_text: Raw job description text
+
+        Returns:
+            Dict of JD matching features
+        """
+        jd_data = self.text_preprocessor.preprocess_for_matching(job_description_text)
+        sections = self.semantic_matcher._split_into_sections(jd_data["semantic_text"])
+
+        # TF-IDF vectors are only worth storing once a corpus model is fitted
+        model = self.semantic_matcher.current_model()
+        tfidf_vectors = None
+        if model is not None and jd_data["semantic_text"].strip():
+            names = ["overall"] + list(sections)
+            texts = [jd_data["semantic_text"]] + list(sections.values())
+            encoded = self.semantic_matcher.encode_texts(texts, model=model)
+            tfidf_vectors = {
+                name: self._sparse_vector(encoded[i : i + 1])
+                for i, name in enumerate(names)
+            }
+
+        return {
+            "features_version": JD_FEATURES_VERSION,
+            "preprocessor_version": PREPROCESSOR_VERSION,
+            "skill_index_version": _SKILL_INDEX.version,
+            "vectorizer_version": model.version if tfidf_vectors else None,
+            "cleaned_text": jd_data["cleaned_text"],
+            "semantic_text": jd_data["semantic_text"],
+            "tokens": jd_data["tokens"],
+            "tokens_with_stopwords": jd_data["tokens_with_stopwords"],
+            "keyword_set": sorted(jd_data["keyword_set"]),
+            "skills_data": jd_data["skills_data"],
+            "skill_ids": sorted(jd_data["skill_ids"]),
+            "sections": sections,
+            "tfidf_vectors": tfidf_vectors,
+        }
+
+    def _jd_data_from_features(
+        self,
+        job_description_text: str,
+        jd_features: Optional[Dict[str, Any]],
+        model: Optional[TfidfModel] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Rebuild preprocess_job_description output from stored features
+
+        Returns None when the features are missing or were built by another
+        preprocessor version. Stored vectors are dropped (and recomputed at
+        match time) unless they were encoded under model.
+        """
+        if not jd_features_are_current(jd_features):
+            return None
+
+        tokens = jd_features["tokens"]
+        jd_data = {
+            "original_text": job_description_text,
+            "cleaned_text": jd_features["cleaned_text"],
+            "semantic_text": jd_features["semantic_text"],
+            "tokens": tokens,
+            "tokens_with_stopwords": jd_features["tokens_with_stopwords"],
+            "keyword_set": set(jd_features["keyword_set"]),
+            "skills_data": jd_features["skills_data"],
+            "total_tokens": len(tokens),
+            "unique_tokens": len(set(tokens)),
+            "skill_ids": set(jd_features["skill_ids"]),
+            "sections": jd_features["sections"],
+        }
+
+        vectors = jd_features.get("tfidf_vectors")
+        if (
+            vectors
+            and model is not None
+            and model.version is not None
+            and jd_features.get("vectorizer_version") == model.version
+        ):
+            jd_data["tfidf_vectors"] = {
+                name: self._csr_vector(vector) for name, vector in vectors.items()
+            }
+
+        return jd_data
+
+    @staticmethod
+    def _sparse_vector(row: "sparse.csr_matrix") -> Dict[str, Any]:
+        """JSON-friendly form of an encoded 1 x n_features CSR row"""
+        return {
+            "dim": int(row.shape[1]),
+            "indices": row.indices.tolist(),
+            "values": row.data.tolist(),
+        }
+
+    @staticmethod
+    def _csr_vector(vector: Dict[str, Any]) -> "sparse.csr_matrix":
+        """Inverse of _sparse_vector"""
+        return sparse.csr_matrix(
+            (vector["values"], vector["indices"], [0, len(vector["indices"])]),
+            shape=(1, vector["dim"]),
+        )
+
+    def _screening_scores(
+        self,
+        resume_data: Dict[str, Any],
+        jd_data_list: List[Dict[str, Any]],
+        model: Optional[TfidfModel] = None,
+    ) -> np.ndarray:
+        """
+        Cheap final-score estimate for every job, used to shortlist for batch_match
+
+        Keyword and skill overlap with every job come from one sparse
+        incidence-matrix product each (exact matches only, so the fuzzy terms
+        are lower bounds), and the semantic term is the overall TF-IDF cosine,
+        computed for all jobs in one encoding pass.
+        """
+        exact = self.hard_matcher.batch_exact_match(
+            resume_data["keyword_set"],
+            [jd_data["keyword_set"] for jd_data in jd_data_list],
+        )
+        matched = exact["matched_count"]
+        has_keywords = exact["total_jd_keywords"] > 0
+        exact_scores = np.divide(
+            matched,
+            exact["total_jd_keywords"],
+            out=np.zeros(len(jd_data_list)),
+            where=has_keywords,
+        )
+        token_scores = np.divide(
+            matched,
+            np.array([len(jd_data["tokens"]) for jd_data in jd_data_list]),
+            out=np.zeros(len(jd_data_list)),
+            where=has_keywords,
+        )
+
+        skills = KeywordIncidence(
+            [self.hard_matcher._skill_ids(jd_data) for jd_data in jd_data_list]
+        )
+        skill_scores = np.divide(
+            skills.overlap(self.hard_matcher._skill_ids(resume_data)),
+            skills.totals,
+            out=np.zeros(len(jd_data_list)),
+            where=skills.totals > 0,
+        )
+
+        hard_scores = 100 * (
+            0.4 * exact_scores + 0.3 * token_scores + 0.3 * skill_scores
+        )
+        semantic_scores = 100 * self.semantic_matcher.batch_overall_similarity(
+            resume_data["semantic_text"],
+            [jd_data["semantic_text"] for jd_data in jd_data_list],
+            [
+                (jd_data.get("tfidf_vectors") or {}).get("overall")
+                for jd_data in jd_data_list
+            ],
+            model=model,
+        )
+
+        weights = self.config["weights"]
+        return (
+            weights["semantic_weight"] * semantic_scores
+            + weights["hard_match_weight"] * hard_scores
+        )
+
     def batch_match(
-        self, resume_text: str, job_descriptions: List[str]
+        self,
+        resume_text: str,
+        job_descriptions: List[str],
+        top_k: Optional[int] = None,
+        jd_features: Optional[List[Optional[Dict[str, Any]]]] = None,
     ) -> List[Dict[str, Any]]:
         """
         Match one resume against multiple job descriptions
 
+        The resume is preprocessed and encoded once. Every job gets a screening
+        score (see _screening_scores); the best BATCH_RERANK_FACTOR * top_k jobs
+        then run through the full matching pipeline, reusing the preprocessed
+        resume, and are re-ranked by their final relevance score.
+
         Args:
             resume_text: Resume text
             job_descriptions: List of job description texts
+            top_k: Number of results to return (None: every job, all fully scored)
+            jd_features: featurize_job_description output per job (None entries
+                         and stale features are preprocessed here)
 
         Returns:
-            List of matching results sorted by relevance score
+            List of matching results sorted by relevance score, each with its
+            "job_index" and "screening_score"
         """
-        results = []
+        if not job_descriptions:
+            return []
+
+        resume_data = self.text_preprocessor.preprocess_for_matching(resume_text)
+        model = self.semantic_matcher.current_model()
+        jd_features = jd_features or [None] * len(job_descriptions)
+        jd_data_list = [
+            self._jd_data_from_features(jd_text, features, model)
+            or self.text_preprocessor.preprocess_for_matching(jd_text)
+            for jd_text, features in zip(job_descriptions, jd_features)
+        ]
 
-        for i, jd_text in enumerate(job_descriptions):
-            print(f"Processing job description {i+1}/{len(job_descriptions)}...")
-            result = self.match_resume_to_job(resume_text, jd_text)
-            result["job_index"] = i
+        # Screening and full scores share one model (a throwaway fit on this
+        # batch before the first corpus model exists)
+        model = self.semantic_matcher._model_for(
+            [resume_data["semantic_text"]]
+            + [jd_data["semantic_text"] for jd_data in jd_data_list],
+            model,
+        )
+        screening_scores = self._screening_scores(resume_data, jd_data_list, model)
+        ranked = np.argsort(-screening_scores, kind="stable")
+        if top_k is not None:
+            ranked = ranked[: max(0, top_k) * BATCH_RERANK_FACTOR]
+
+        print(
+            f"Screened {len(job_descriptions)} job descriptions, "
+            f"fully scoring {len(ranked)}..."
+        )
+
+        results = []
+        for i in ranked:
+            result = self._match_preprocessed(resume_data, jd_data_list[i], model)
+            result["job_index"] = int(i)
+            result["screening_score"] = float(round(screening_scores[i], 2))
             results.append(result)
 
         # Sort by relevance score (highest first)
         results.sort(key=lambda x: x.get("relevance_score", 0), reverse=True)
 
-        return results
+        return results if top_k is None else results[:top_k]
 
     def update_config(self, new_config: Dict[str, Any]):
         """Update matching configuration"""
@@ -556,7 +843,10 @@ def _get_engine(config: Optional[Dict[str, Any]] = None) -> MatchingEngine:
 
 # Convenience functions
 def match_resume_to_job(
-    resume_text: str, job_description_text: str, config: Optional[Dict[str, Any]] = None
+    resume_text: str,
+    job_description_text: str,
+    config: Optional[Dict[str, Any]] = None,
+    jd_features: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """
     Quick function to match resume to job description
@@ -565,18 +855,38 @@ def match_resume_to_job(
         resume_text: Resume text
         job_description_text: Job description text
         config: Optional configuration
+        jd_features: Precomputed featurize_job_description output
 
     Returns:
         Dict with matching results
     """
     engine = _get_engine(config)
-    return engine.match_resume_to_job(resume_text, job_description_text)
+    return engine.match_resume_to_job(resume_text, job_description_text, jd_features)
+
+
+def featurize_job_description(
+    job_description_text: str, config: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Precompute JD matching features to store with the job
+
+    Args:
+        job_description_text: Job description text
+        config: Optional configuration
+
+    Returns:
+        Dict of JD matching features
+    """
+    engine = _get_engine(config)
+    return engine.featurize_job_description(job_description_text)
 
 
 def batch_match_jobs(
     resume_text: str,
     job_descriptions: List[str],
     config: Optional[Dict[str, Any]] = None,
+    top_k: Optional[int] = None,
+    jd_features: Optional[List[Optional[Dict[str, Any]]]] = None,
 ) -> List[Dict[str, Any]]:
     """
     Match one resume against multiple job descriptions
@@ -585,12 +895,80 @@ def batch_match_jobs(
         resume_text: Resume text
         job_descriptions: List of job description texts
         config: Optional configuration
+        top_k: Number of best matches to return (None: all)
+        jd_features: Precomputed featurize_job_description output per job
 
     Returns:
         List of matching results
     """
     engine = _get_engine(config)
-    return engine.batch_match(resume_text, job_descriptions)
+    return engine.batch_match(resume_text, job_descriptions, top_k, jd_features)
+
+
+async def amatch_resume_to_job(
+    resume_text: str,
+    job_description_text: str,
+    config: Optional[Dict[str, Any]] = None,
+    jd_features: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Awaitable match_resume_to_job that runs in the shared process pool
+
+    Args:
+        resume_text: Resume text
+        job_description_text: Job description text
+        config: Optional configuration
+        jd_features: Precomputed featurize_job_description output
+
+    Returns:
+        Dict with matching results
+    """
+    return await get_executor().run_cpu(
+        match_resume_to_job, resume_text, job_description_text, config, jd_features
+    )
+
+
+async def afeaturize_job_description(
+    job_description_text: str, config: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Awaitable featurize_job_description that runs in the shared process pool
+
+    Args:
+        job_description_text: Job description text
+        config: Optional configuration
+
+    Returns:
+        Dict of JD matching features
+    """
+    return await get_executor().run_cpu(
+        featurize_job_description, job_description_text, config
+    )
+
+
+async def abatch_match_jobs(
+    resume_text: str,
+    job_descriptions: List[str],
+    config: Optional[Dict[str, Any]] = None,
+    top_k: Optional[int] = None,
+    jd_features: Optional[List[Optional[Dict[str, Any]]]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Awaitable batch_match_jobs that runs in the shared process pool
+
+    Args:
+        resume_text: Resume text
+        job_descriptions: List of job description texts
+        config: Optional configuration
+        top_k: Number of best matches to return (None: all)
+        jd_features: Precomputed featurize_job_description output per job
+
+    Returns:
+        List of matching results
+    """
+    return await get_executor().run_cpu(
+        batch_match_jobs, resume_text, job_descriptions, config, top_k, jd_features
+    )
 
 
 # Example usage
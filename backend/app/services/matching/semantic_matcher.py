@@ -5,20 +5,22 @@ Implements TF-IDF based semantic matching with cosine similarity
 
 import numpy as np
 from typing import List, Dict, Any, Tuple, Optional
-import pickle
 import os
-from pathlib import Path
 
 try:
-    from sklearn.metrics.pairwise import cosine_similarity
+    from scipy import sparse
     from sklearn.feature_extraction.text import TfidfVectorizer
 
     SKLEARN_AVAILABLE = True
 except ImportError:
     SKLEARN_AVAILABLE = False
 
-# Global TF-IDF cache for efficiency
-_TFIDF_CACHE = {}
+try:
+    from .tfidf_model import TfidfModel, fit_transient_model, get_current_model
+    from .embedding_store import EmbeddingStore, get_embedding_store
+except ImportError:
+    from tfidf_model import TfidfModel, fit_transient_model, get_current_model
+    from embedding_store import EmbeddingStore, get_embedding_store
 
 
 class SemanticMatcher:
@@ -53,113 +55,158 @@ class SemanticMatcher:
 
         Args:
             model_name: Sentence-BERT model name (default: all-MiniLM-L6-v2 - 80MB, CPU-friendly)
-            cache_dir: Directory to cache model and embeddings
+            cache_dir: Directory for a private embedding store (default: the
+                       shared store in EMBEDDING_STORE_DIR)
         """
         self.model_name = model_name
-        self.cache_dir = cache_dir or str(Path(__file__).parent / "cache")
-        Path(self.cache_dir).mkdir(exist_ok=True)
+        self.cache_dir = cache_dir
+        self._embedding_store = EmbeddingStore(cache_dir) if cache_dir else None
 
         # Lazy loading - models are loaded only when needed
         self.model = None
-        self.tfidf_vectorizer = None
+        self._tfidf_available: Optional[bool] = None  # Set on first use
 
     def _initialize_model(self):
         """Lazy initialization of the TF-IDF model for semantic matching"""
         print("Initializing TF-IDF based semantic matching (lightweight AI)")
 
-        if SKLEARN_AVAILABLE:
-            cache_key = "tfidf_vectorizer"
-            if cache_key not in _TFIDF_CACHE:
-                _TFIDF_CACHE[cache_key] = TfidfVectorizer(
-                    max_features=5000,
-                    stop_words="english",
-                    ngram_range=(1, 3),
-                    lowercase=True,
-                    strip_accents="unicode",
-                )
-                print(
-                    "✅ TF-IDF vectorizer initialized and cached for semantic matching"
-                )
-            self.tfidf_vectorizer = _TFIDF_CACHE[cache_key]
-        else:
+        # Corpus models are fitted by TfidfModelManager and loaded on use
+        self._tfidf_available = SKLEARN_AVAILABLE
+        if not SKLEARN_AVAILABLE:
             print(
                 "❌ scikit-learn not available - semantic matching will use basic text overlap"
             )
             print("Install scikit-learn for AI-powered semantic matching")
 
+    def current_model(self) -> Optional[TfidfModel]:
+        """
+        Latest corpus-fitted TF-IDF model (None until the first fit)
+
+        Callers pin the returned model for a whole operation, so a hot swap
+        in the middle never mixes vectors from two vocabularies.
+        """
+        if self._tfidf_available is None:
+            self._initialize_model()
+        return get_current_model() if self._tfidf_available else None
+
+    def _model_for(
+        self, texts: List[str], model: Optional[TfidfModel] = None
+    ) -> Optional[TfidfModel]:
+        """The given model, else the corpus model, else a throwaway fit on texts"""
+        if model is not None:
+            return model
+
+        model = self.current_model()
+        if model is None and self._tfidf_available:
+            try:
+                model = fit_transient_model(texts)
+            except ValueError:
+                # Nothing to fit on (e.g. only stopwords)
+                return None
+        return model
+
+    @property
+    def vectorizer_version(self) -> Optional[str]:
+        """
+        Version of the current corpus model
+
+        Vectors are only comparable when produced under the same version.
+        None until the first corpus model is fitted, or without scikit-learn.
+        """
+        model = self.current_model()
+        return model.version if model is not None else None
+
     def _initialize_tfidf(self):
         """Initialize TF-IDF vectorizer as fallback - DEPRECATED: Now handled in _initialize_model"""
         self._initialize_model()
 
-    def encode_text(self, text: str, use_cache: bool = True) -> np.ndarray:
+    def encode_text(
+        self, text: str, use_cache: bool = True, model: Optional[TfidfModel] = None
+    ) -> "sparse.csr_matrix":
         """
         Encode text into vector representation
 
         Args:
             text: Input text to encode
             use_cache: Whether to check for cached embeddings
+            model: TF-IDF model to encode with (default: current corpus model)
 
         Returns:
-            np.ndarray: Vector representation of the text
+            1 x n_features L2-normalised CSR row (a dense row for the basic fallback)
         """
-        # Check cache first if enabled
-        if use_cache:
-            cache_key = f"text_{hash(text)}"
-            cached = self.load_cached_embeddings(cache_key)
-            if cached is not None and len(cached) > 0:
-                return cached[0]
-
-        # Lazy load model if not initialized
-        if self.tfidf_vectorizer is None:
-            self._initialize_model()
-
-        if self.tfidf_vectorizer is not None:
-            # Use TF-IDF for semantic matching
-            return self._encode_with_tfidf([text])[0]
-        else:
-            # Basic fallback - return word count vector
-            return self._basic_encode(text)
-
-    def encode_texts(self, texts: List[str], use_cache: bool = True) -> np.ndarray:
+        return self.encode_texts([text], use_cache=use_cache, model=model)
+
+    def encode_texts(
+        self,
+        texts: List[str],
+        use_cache: bool = True,
+        model: Optional[TfidfModel] = None,
+    ) -> "sparse.csr_matrix":
         """
         Encode multiple texts into vector representations
 
         Args:
             texts: List of texts to encode
             use_cache: Whether to check for cached embeddings
+            model: TF-IDF model to encode with (default: current corpus model,
+                   or a throwaway fit on texts before the first corpus fit)
 
         Returns:
-            np.ndarray: Matrix of vector representations
+            CSR matrix with one L2-normalised row per text (a dense matrix for
+            the basic fallback)
         """
-        # Check cache first if enabled
-        if use_cache and len(texts) == 1:
-            cache_key = f"text_{hash(texts[0])}"
-            cached = self.load_cached_embeddings(cache_key)
-            if cached is not None:
-                return cached
-
-        # Lazy load model if not initialized
-        if self.tfidf_vectorizer is None:
-            self._initialize_model()
+        model = self._model_for(texts, model)
 
-        if self.tfidf_vectorizer is not None:
-            return self._encode_with_tfidf(texts)
+        # Only corpus models have a version to tag stored vectors with
+        if use_cache and model is not None and model.version:
+            return self._encode_with_store(texts, model)
+
+        if model is not None:
+            return self._encode_with_tfidf(texts, model)
 
         else:
             # Basic fallback
             return np.array([self._basic_encode(text) for text in texts])
 
-    def _encode_with_tfidf(self, texts: List[str]) -> np.ndarray:
-        """Encode texts using TF-IDF vectorizer"""
+    def _encode_with_store(
+        self, texts: List[str], model: TfidfModel
+    ) -> "sparse.csr_matrix":
+        """Encode texts, reading and filling the embedding store"""
+        store = self._embedding_store or get_embedding_store()
         try:
-            if not hasattr(self.tfidf_vectorizer, "vocabulary_"):
-                # First time - fit the vectorizer
-                tfidf_matrix = self.tfidf_vectorizer.fit_transform(texts)
-            else:
-                # Already fitted - just transform
-                tfidf_matrix = self.tfidf_vectorizer.transform(texts)
+            rows = store.get_many(model.version, texts)
+        except Exception as e:
+            print(f"⚠️ Embedding store lookup failed: {e}")
+            return self._encode_with_tfidf(texts, model)
+
+        missing = [i for i, row in enumerate(rows) if row is None]
+        if not missing:
+            return sparse.vstack(rows, format="csr")
+
+        encoded = self._encode_with_tfidf([texts[i] for i in missing], model)
+        if not sparse.issparse(encoded):
+            # Basic fallback vectors are not stored
+            return self._encode_with_tfidf(texts, model)
 
-            return tfidf_matrix.toarray()
+        try:
+            store.put_many(model.version, [texts[i] for i in missing], encoded)
+        except Exception as e:
+            print(f"⚠️ Embedding store write failed: {e}")
+
+        if len(missing) == len(texts):
+            return encoded
+        for k, i in enumerate(missing):
+            rows[i] = encoded[k : k + 1]
+        return sparse.vstack(rows, format="csr")
+
+    def _encode_with_tfidf(
+        self, texts: List[str], model: TfidfModel
+    ) -> "sparse.csr_matrix":
+        """Encode texts using a fitted TF-IDF model, keeping the matrix sparse"""
+        try:
+            # Rows come out L2-normalised (TFIDF_PARAMS["norm"]), so cosine
+            # similarity is a plain sparse dot product
+            return model.vectorizer.transform(texts)
         except Exception as e:
             print(f"Error with TF-IDF encoding: {e}")
             return np.array([self._basic_encode(text) for text in texts])
@@ -176,13 +223,16 @@ class SemanticMatcher:
         # This is a very basic approach - not recommended for production
         return np.array([len(words), len(set(words)), sum(word_counts.values())])
 
-    def calculate_similarity(self, text1: str, text2: str) -> float:
+    def calculate_similarity(
+        self, text1: str, text2: str, model: Optional[TfidfModel] = None
+    ) -> float:
         """
         Calculate semantic similarity between two texts
 
         Args:
             text1: First text
             text2: Second text
+            model: TF-IDF model to encode with (default: current corpus model)
 
         Returns:
             float: Similarity score between 0 and 1
@@ -192,15 +242,8 @@ class SemanticMatcher:
 
         try:
             # Try to use embeddings (Sentence-BERT or TF-IDF)
-            embeddings = self.encode_texts([text1, text2])
-
-            if SKLEARN_AVAILABLE:
-                similarity = cosine_similarity([embeddings[0]], [embeddings[1]])[0][0]
-            else:
-                # Manual cosine similarity calculation
-                similarity = self._manual_cosine_similarity(
-                    embeddings[0], embeddings[1]
-                )
+            embeddings = self.encode_texts([text1, text2], model=model)
+            similarity = self._cosine_matrix(embeddings, embeddings)[0, 1]
 
             return max(0.0, min(1.0, similarity))  # Ensure between 0 and 1
 
@@ -208,6 +251,151 @@ class SemanticMatcher:
             print(f"Error calculating similarity: {e}")
             return self._basic_text_similarity(text1, text2)
 
+    def batch_overall_similarity(
+        self,
+        text: str,
+        others: List[str],
+        other_vectors: Optional[List[Optional["sparse.csr_matrix"]]] = None,
+        model: Optional[TfidfModel] = None,
+    ) -> np.ndarray:
+        """
+        Similarity of one text against many, encoding everything in one pass
+
+        Args:
+            text: Text to compare (e.g. a resume), encoded once
+            others: Texts to compare against (e.g. job descriptions)
+            other_vectors: Encoded rows of others under model (None entries are encoded)
+            model: TF-IDF model to encode with (default: current corpus model)
+
+        Returns:
+            np.ndarray: One score between 0 and 1 per entry of others
+        """
+        scores = np.zeros(len(others))
+        live = [i for i, other in enumerate(others) if other.strip()]
+        if not text.strip() or not live:
+            return scores
+
+        other_vectors = other_vectors or [None] * len(others)
+        to_encode = [i for i in live if other_vectors[i] is None]
+
+        try:
+            encoded = self.encode_texts(
+                [text] + [others[i] for i in to_encode], model=model
+            )
+            if len(to_encode) == len(live):
+                embeddings = encoded[1:]
+            else:
+                rows = {i: encoded[j + 1 : j + 2] for j, i in enumerate(to_encode)}
+                embeddings = self._stack_rows(
+                    [
+                        other_vectors[i] if other_vectors[i] is not None else rows[i]
+                        for i in live
+                    ]
+                )
+            # One sparse-times-sparse-transpose product for every job
+            similarities = self._cosine_matrix(embeddings, encoded[0:1])[:, 0]
+        except Exception as e:
+            print(f"Error calculating batch similarity: {e}")
+            similarities = np.array(
+                [self._basic_text_similarity(text, others[i]) for i in live]
+            )
+
+        scores[live] = np.clip(similarities, 0.0, 1.0)
+        return scores
+
+    def _similarity_matrix(
+        self,
+        texts: List[str],
+        other_texts: List[str],
+        other_vectors: List[Optional["sparse.csr_matrix"]],
+        model: Optional[TfidfModel] = None,
+    ) -> np.ndarray:
+        """
+        calculate_similarity for every (text, other_text) pair at once
+
+        All texts without a known vector are encoded in one transform and the
+        scores come from a single matrix product.
+
+        Args:
+            texts: Row texts
+            other_texts: Column texts
+            other_vectors: Encoded row per other_text under model (or None)
+            model: TF-IDF model to encode with
+
+        Returns:
+            np.ndarray: len(texts) x len(other_texts) scores between 0 and 1
+        """
+        scores = np.zeros((len(texts), len(other_texts)))
+        rows = [i for i, text in enumerate(texts) if text.strip()]
+        columns = [j for j, text in enumerate(other_texts) if text.strip()]
+        if not rows or not columns:
+            return scores
+
+        to_encode = [j for j in columns if other_vectors[j] is None]
+
+        try:
+            encoded = self.encode_texts(
+                [texts[i] for i in rows] + [other_texts[j] for j in to_encode],
+                model=model,
+            )
+            if len(to_encode) == len(columns):
+                column_vectors = encoded[len(rows) :]
+            else:
+                encoded_columns = {
+                    j: encoded[len(rows) + k : len(rows) + k + 1]
+                    for k, j in enumerate(to_encode)
+                }
+                column_vectors = self._stack_rows(
+                    [
+                        (
+                            other_vectors[j]
+                            if other_vectors[j] is not None
+                            else encoded_columns[j]
+                        )
+                        for j in columns
+                    ]
+                )
+            similarities = self._cosine_matrix(encoded[: len(rows)], column_vectors)
+        except Exception as e:
+            print(f"Error calculating similarity matrix: {e}")
+            similarities = np.array(
+                [
+                    [
+                        self._basic_text_similarity(texts[i], other_texts[j])
+                        for j in columns
+                    ]
+                    for i in rows
+                ]
+            )
+
+        scores[np.ix_(rows, columns)] = np.clip(similarities, 0.0, 1.0)
+        return scores
+
+    def _cosine_matrix(self, rows1, rows2) -> np.ndarray:
+        """
+        Cosine similarity between every row of rows1 and every row of rows2
+
+        TF-IDF rows are L2-normalised at encode time, so for CSR input this is
+        a single sparse dot product. Dense rows (basic fallback) are
+        normalised here.
+        """
+        if SKLEARN_AVAILABLE and sparse.issparse(rows1) and sparse.issparse(rows2):
+            return (rows1 @ rows2.T).toarray()
+
+        rows1 = np.atleast_2d(np.asarray(rows1, dtype=float))
+        rows2 = np.atleast_2d(np.asarray(rows2, dtype=float))
+        norms = np.outer(np.linalg.norm(rows1, axis=1), np.linalg.norm(rows2, axis=1))
+        dots = rows1 @ rows2.T
+        return np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0)
+
+    def _stack_rows(self, rows: List[Any]):
+        """Stack encoded rows (CSR or dense) into one matrix"""
+        if SKLEARN_AVAILABLE and all(sparse.issparse(row) for row in rows):
+            return sparse.vstack(rows, format="csr")
+        return np.vstack(
+            [row.toarray() if hasattr(row, "toarray") else row for row in rows]
+        )
+
     def _manual_cosine_similarity(self, vec1: np.ndarray, vec2: np.ndarray) -> float:
         """Manual cosine similarity calculation"""
         dot_product = np.dot(vec1, vec2)
@@ -234,37 +422,61 @@ class SemanticMatcher:
 
         return intersection / union if union > 0 else 0.0
 
-    def semantic_match_detailed(self, resume_text: str, jd_text: str) -> Dict[str, Any]:
+    def semantic_match_detailed(
+        self,
+        resume_text: str,
+        jd_text: str,
+        jd_sections: Optional[Dict[str, str]] = None,
+        jd_vectors: Optional[Dict[str, "sparse.csr_matrix"]] = None,
+        model: Optional[TfidfModel] = None,
+    ) -> Dict[str, Any]:
         """
         Perform detailed semantic matching with breakdown
 
         Args:
             resume_text: Resume text
             jd_text: Job description text
+            jd_sections: Precomputed _split_into_sections(jd_text)
+            jd_vectors: Encodings of the JD under model ("overall" and section names)
+            model: TF-IDF model to encode with (default: current corpus model,
+                   or a throwaway fit on the two texts before the first corpus fit)
 
         Returns:
             Dict with detailed semantic matching results
         """
-        # Overall similarity
-        overall_similarity = self.calculate_similarity(resume_text, jd_text)
+        # One model for every comparison in this match
+        model = self._model_for([resume_text, jd_text], model)
 
         # Split texts into sections for granular analysis
         resume_sections = self._split_into_sections(resume_text)
-        jd_sections = self._split_into_sections(jd_text)
+        if jd_sections is None:
+            jd_sections = self._split_into_sections(jd_text)
+
+        # Row/column 0 is the whole document, the rest are its sections
+        resume_names = list(resume_sections)
+        similarities = self._similarity_matrix(
+            [resume_text] + list(resume_sections.values()),
+            [jd_text] + list(jd_sections.values()),
+            [(jd_vectors or {}).get(name) for name in ["overall"] + list(jd_sections)],
+            model,
+        )
 
-        # Calculate section-wise similarities
+        # Overall similarity
+        overall_similarity = similarities[0, 0]
+
+        # Best resume section for each JD section (first one on ties)
         section_similarities = {}
-        for jd_section_name, jd_section_text in jd_sections.items():
+        for column, (jd_section_name, jd_section_text) in enumerate(
+            jd_sections.items(), start=1
+        ):
             best_match_score = 0.0
             best_match_section = None
 
-            for resume_section_name, resume_section_text in resume_sections.items():
-                similarity = self.calculate_similarity(
-                    resume_section_text, jd_section_text
-                )
-                if similarity > best_match_score:
-                    best_match_score = similarity
-                    best_match_section = resume_section_name
+            if resume_names:
+                best = int(np.argmax(similarities[1:, column]))
+                if similarities[best + 1, column] > 0:
+                    best_match_score = similarities[best + 1, column]
+                    best_match_section = resume_names[best]
 
             section_similarities[jd_section_name] = {
                 "best_match_section": best_match_section,
@@ -296,8 +508,9 @@ class SemanticMatcher:
             "model_used": (
                 self.model_name
                 if self.model
-                else "TF-IDF" if self.tfidf_vectorizer else "Basic"
+                else "TF-IDF" if self._tfidf_available else "Basic"
             ),
+            "tfidf_model_version": model.version if model else None,
             "confidence": self._calculate_confidence(
                 overall_similarity, len(resume_text), len(jd_text)
             ),
@@ -388,36 +601,6 @@ class SemanticMatcher:
 
         return results
 
-    def cache_embeddings(self, texts: List[str], cache_key: str) -> str:
-        """Cache embeddings to disk for faster subsequent access"""
-        cache_file = Path(self.cache_dir) / f"{cache_key}_embeddings.pkl"
-
-        try:
-
-            embeddings = self.encode_texts(texts, use_cache=False)
-            with open(cache_file, "wb") as f:
-                pickle.dump(embeddings, f)
-            print(f"✅ Embeddings cached to {cache_file}")
-            return str(cache_file)
-        except Exception as e:
-            print(f"❌ Failed to cache embeddings: {e}")
-            return ""
-
-    def load_cached_embeddings(self, cache_key: str) -> Optional[np.ndarray]:
-        """Load cached embeddings from disk"""
-        cache_file = Path(self.cache_dir) / f"{cache_key}_embeddings.pkl"
-
-        try:
-            if cache_file.exists():
-                with open(cache_file, "rb") as f:
-                    embeddings = pickle.load(f)
-                print(f"✅ Loaded cached embeddings from {cache_file}")
-                return embeddings
-        except Exception as e:
-            print(f"❌ Failed to load cached embeddings: {e}")
-
-        return None
-
 
 # Convenience functions
 def calculate_semantic_similarity(resume_text: str, jd_text: str) -> Dict[str, Any]:
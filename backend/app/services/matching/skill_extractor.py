@@ -0,0 +1,264 @@
+"""
+Skill Extractor
+Single-pass matching of single- and multi-word skills over a token stream,
+with a symmetric-delete index resolving misspelled skills
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    from rapidfuzz.distance import OSA
+except ImportError:
+    OSA = None
+
+# Trie key holding the match stored at a node; tokens are never empty strings
+_TERMINAL = ""
+
+# Characters of a term that generate deletes; longer terms are told apart by
+# the full distance check (the SymSpell prefix trick)
+_TYPO_PREFIX_LENGTH = 7
+
+
+def _typo_max_distance(length: int) -> int:
+    """Edits tolerated in a string of this length; short words get none"""
+    if length >= 10:
+        return 2
+    if length >= 6:
+        return 1
+    return 0
+
+
+def _deletes(word: str, max_distance: int) -> Set[str]:
+    """word and every string made by deleting up to max_distance characters"""
+    variants = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {
+            variant[:i] + variant[i + 1 :]
+            for variant in frontier
+            for i in range(len(variant))
+        }
+        variants |= frontier
+    return variants
+
+
+def _osa_distance(a: str, b: str) -> int:
+    """Edit distance counting adjacent transpositions as one edit"""
+    if OSA is not None:
+        return OSA.distance(a, b)
+
+    previous = None
+    row = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, row = previous, row, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            row[j] = min(previous[j] + 1, row[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                row[j] = min(row[j], before[j - 2] + 1)
+    return row[-1]
+
+
+class SkillTypoIndex:
+    """
+    Symmetric-delete (SymSpell) index over skill terms. Terms and queries are
+    both reduced to their deletion variants, so a misspelling finds its
+    candidates with a few dict lookups instead of a scan of the vocabulary;
+    candidates are then confirmed with a real edit distance.
+    """
+
+    def __init__(self):
+        self._deletes: Dict[str, List[str]] = {}
+        self._entries: Dict[str, Any] = {}
+
+    def add(self, term: str, entry: Any) -> None:
+        """Register a term (tokens joined by spaces) and the match it reports"""
+        if term in self._entries:
+            return
+        self._entries[term] = entry
+        for variant in _deletes(term[:_TYPO_PREFIX_LENGTH], 2):
+            self._deletes.setdefault(variant, []).append(term)
+
+    def lookup(self, query: str) -> Optional[Any]:
+        """
+        Entry of the closest term, if exactly one skill is closest
+
+        Args:
+            query: Token or tokens joined by spaces
+
+        Returns:
+            The entry of the nearest term within the distance allowed for the
+            query's length, or None when nothing is close or two skills tie
+        """
+        max_distance = _typo_max_distance(len(query))
+        if max_distance == 0:
+            return None
+
+        best_entry = None
+        best_distance = max_distance + 1
+        tied = False
+        seen = set()
+        for variant in _deletes(query[:_TYPO_PREFIX_LENGTH], max_distance):
+            for term in self._deletes.get(variant, ()):
+                if term in seen or abs(len(term) - len(query)) > max_distance:
+                    continue
+                seen.add(term)
+
+                distance = _osa_distance(query, term)
+                if distance > max_distance:
+                    continue
+                entry = self._entries[term]
+                if distance < best_distance:
+                    best_entry, best_distance, tied = entry, distance, False
+                elif distance == best_distance and entry[0] != best_entry[0]:
+                    tied = True
+
+        return None if tied else best_entry
+
+
+class SkillExtractor:
+    """
+    Token trie over skill phrases. Each phrase is stored as the token sequence
+    produced by the preprocessor, so "Ruby on Rails", "ruby  on rails" and
+    "ruby-on-rails" all reach the same node. Extraction walks the trie from
+    every token position, which is linear in the text for a bounded phrase
+    length (the longest database phrase has a handful of tokens).
+    """
+
+    def __init__(self, tokenize: Callable[[str], List[str]]):
+        """
+        Args:
+            tokenize: Turns a skill phrase into the tokens the text produces
+        """
+        self._tokenize = tokenize
+        self._root: Dict[str, Any] = {}
+        self._typos = SkillTypoIndex()
+
+    def add(
+        self,
+        phrase: str,
+        categories: Iterable[str],
+        skill: Optional[str] = None,
+        skill_id: Optional[int] = None,
+    ) -> None:
+        """
+        Register a skill phrase
+
+        Args:
+            phrase: Skill or alias as written in a skills list
+            categories: Categories the skill belongs to
+            skill: Name reported on a match; defaults to the phrase
+            skill_id: Canonical skill id reported on a match, if any
+
+        A phrase already registered (say "reactjs" as an alias of "react",
+        then as a keyword) keeps its name and id and gains the categories.
+        """
+        tokens = self._tokenize(phrase)
+        if not tokens:
+            return
+
+        node = self._root
+        for token in tokens:
+            node = node.setdefault(token, {})
+
+        entry = node.get(_TERMINAL)
+        if entry is None:
+            entry = node[_TERMINAL] = (skill or phrase, list(categories), skill_id)
+            # Misspellings are looked up for single tokens and token pairs
+            if len(tokens) <= 2:
+                self._typos.add(" ".join(tokens), entry)
+            return
+        for category in categories:
+            if category not in entry[1]:
+                entry[1].append(category)
+
+    def add_skills(self, skills_by_category: Dict[str, Iterable[str]]) -> None:
+        """Register every skill of a {category: skills} mapping"""
+        for category, skills in skills_by_category.items():
+            for skill in skills:
+                self.add(skill, [category])
+
+    def extract(
+        self,
+        tokens: List[str],
+        keep_single: Optional[Callable[[str], bool]] = None,
+    ) -> List[Tuple[str, List[str], Optional[int]]]:
+        """
+        Find every skill occurrence in a token stream
+
+        Args:
+            tokens: Tokens of the cleaned text, stopwords included so phrases
+                like "attention to detail" stay contiguous
+            keep_single: Optional filter for one-token matches, so single
+                tokens are held to the same rules as keyword extraction
+
+        Returns:
+            List[Tuple[str, List[str], Optional[int]]]: (skill, categories,
+            skill id) per occurrence, overlapping phrases included ("spring"
+            and "spring boot")
+        """
+        root = self._root
+        matches = []
+        for start, token in enumerate(tokens):
+            node = root.get(token)
+            if node is None:
+                continue
+
+            entry = node.get(_TERMINAL)
+            if entry is not None and (keep_single is None or keep_single(token)):
+                matches.append(entry)
+
+            for position in range(start + 1, len(tokens)):
+                node = node.get(tokens[position])
+                if node is None:
+                    break
+                entry = node.get(_TERMINAL)
+                if entry is not None:
+                    matches.append(entry)
+
+        return matches
+
+    def correct(
+        self, tokens: List[str], may_correct: Callable[[str], bool]
+    ) -> List[Tuple[str, Tuple[str, List[str], Optional[int]]]]:
+        """
+        Resolve misspelled skills ("kubernets", "postgre sql", "react natve")
+
+        Every token and adjacent token pair that is not an exact skill is
+        looked up in the typo index, provided may_correct accepts the token
+        (or one token of the pair).
+
+        Args:
+            tokens: Tokens of the cleaned text, as passed to extract
+            may_correct: Whether a token could be a misspelling; callers
+                exclude stopwords and dictionary words
+
+        Returns:
+            List of (misspelling, (skill, categories, skill id)) pairs
+        """
+        root = self._root
+        correctable = [may_correct(token) for token in tokens]
+        # Repeated tokens and pairs are looked up once
+        looked_up: Dict[str, Any] = {}
+        corrections = []
+
+        def lookup(query: str) -> None:
+            if query not in looked_up:
+                looked_up[query] = self._typos.lookup(query)
+            if looked_up[query] is not None:
+                corrections.append((query, looked_up[query]))
+
+        for position, token in enumerate(tokens):
+            node = root.get(token, {})
+            if correctable[position] and _TERMINAL not in node:
+                lookup(token)
+
+            if position + 1 == len(tokens):
+                break
+            following = tokens[position + 1]
+            if (correctable[position] or correctable[position + 1]) and (
+                _TERMINAL not in node.get(following, {})
+            ):
+                lookup(f"{token} {following}")
+
+        return corrections
@@ -5,12 +5,23 @@ Handles text cleaning, normalization, and preprocessing for better matching accu
 
 import re
 import string
-from typing import List, Set, Dict, Any
+from functools import lru_cache
+from typing import List, Set, Dict, Any, Tuple
 import nltk
-from nltk.corpus import stopwords
+from nltk.corpus import stopwords, wordnet
 from nltk.tokenize import word_tokenize, RegexpTokenizer
 from nltk.stem import PorterStemmer, WordNetLemmatizer
 
+try:
+    from .hard_matcher import _SKILL_INDEX, _SKILLS_DATABASE
+    from .skill_extractor import SkillExtractor
+except ImportError:
+    from hard_matcher import _SKILL_INDEX, _SKILLS_DATABASE
+    from skill_extractor import SkillExtractor
+
+# Bump when preprocess_for_matching output changes; stored JD features carry it
+PREPROCESSOR_VERSION = "4"
+
 
 # Download NLTK data once at module level for efficiency
 def _ensure_nltk_data():
@@ -217,6 +228,27 @@ _SKILLS_SETS = {
 }
 
 
+# Every skills_data category: the keyword sets first, then the database's own
+_SKILL_CATEGORY_NAMES = list(_SKILLS_SETS) + [
+    category for category in _SKILLS_DATABASE if category not in _SKILLS_SETS
+]
+
+# Precompiled cleaning patterns, applied in order by clean_text
+_WHITESPACE_RE = re.compile(r"\s+")
+_SPECIAL_CHARS_RE = re.compile(r"[^\w\s\-\+\#\.]")
+# Skill phrases that tokenize without loss: words joined by spaces, - or .
+_SKILL_PHRASE_RE = re.compile(r"\w+(?:[\s\-\.]+\w+)*")
+# Symbols end these names, so a trailing \b would need a word character after
+_TECH_ALIASES = [
+    (re.compile(r"\bc\+\+(?!\w)"), "cplusplus"),
+    (re.compile(r"\bc\#(?!\w)"), "csharp"),
+    (re.compile(r"(?<!\.)\.net\b"), "dotnet"),
+    (re.compile(r"\bnode\.js\b"), "nodejs"),
+    (re.compile(r"\breact\.js\b"), "reactjs"),
+    (re.compile(r"\bvue\.js\b"), "vuejs"),
+]
+
+
 class TextPreprocessor:
     """
     Comprehensive text preprocessing for resume and job description matching
@@ -247,21 +279,17 @@ class TextPreprocessor:
         text = text.lower()
 
         # Remove extra whitespace and normalize
-        text = re.sub(r"\s+", " ", text)
+        text = _WHITESPACE_RE.sub(" ", text)
 
         # Remove special characters but keep important ones
-        text = re.sub(r"[^\w\s\-\+\#\.]", " ", text)
+        text = _SPECIAL_CHARS_RE.sub(" ", text)
 
         # Handle common programming languages and technologies
-        text = re.sub(r"\bc\+\+\b", "cplusplus", text)
-        text = re.sub(r"\bc\#\b", "csharp", text)
-        text = re.sub(r"\b\.net\b", "dotnet", text)
-        text = re.sub(r"\bnode\.js\b", "nodejs", text)
-        text = re.sub(r"\breact\.js\b", "reactjs", text)
-        text = re.sub(r"\bvue\.js\b", "vuejs", text)
+        for pattern, replacement in _TECH_ALIASES:
+            text = pattern.sub(replacement, text)
 
         # Remove extra spaces
-        text = re.sub(r"\s+", " ", text).strip()
+        text = _WHITESPACE_RE.sub(" ", text).strip()
 
         return text
 
@@ -284,7 +312,10 @@ class TextPreprocessor:
         # Tokenize using faster regex tokenizer
         tokens = self.tokenizer.tokenize(text)
 
-        # Filter tokens
+        return self._filter_tokens(tokens, remove_stopwords)
+
+    def _filter_tokens(self, tokens: List[str], remove_stopwords: bool) -> List[str]:
+        """Drop short tokens, short numbers and (optionally) stopwords"""
         filtered_tokens = []
         for token in tokens:
             # Skip very short tokens (less than 2 characters)
@@ -303,6 +334,18 @@ class TextPreprocessor:
 
         return filtered_tokens
 
+    def _keep_token(self, token: str) -> bool:
+        """Whether _filter_tokens keeps a token with stopwords removed"""
+        return bool(self._filter_tokens([token], remove_stopwords=True))
+
+    def _may_be_misspelling(self, token: str) -> bool:
+        """Whether a token could be a misspelled skill rather than a real word"""
+        return (
+            self._keep_token(token)
+            and not token.isdigit()
+            and not _is_dictionary_word(token)
+        )
+
     def extract_skills_and_keywords(self, text: str) -> Dict[str, List[str]]:
         """
         Extract different types of skills and keywords from text
@@ -314,19 +357,46 @@ class TextPreprocessor:
             Dict[str, List[str]]: Dictionary with categorized skills and keywords
         """
         # Clean and tokenize
-        tokens = self.tokenize_and_filter(text, remove_stopwords=True)
+        raw_tokens = self.tokenizer.tokenize(self.clean_text(text))
+        tokens = self._filter_tokens(raw_tokens, remove_stopwords=True)
+
+        skills_data, _, _ = self._categorize_tokens(raw_tokens, tokens)
+        return skills_data
+
+    def _categorize_tokens(
+        self, raw_tokens: List[str], tokens: List[str]
+    ) -> Tuple[Dict[str, List[str]], Set[int], Dict[str, str]]:
+        """
+        Sort skills found in the raw tokens and filtered keywords by category
 
-        # Use cached skills sets for faster lookups
-        found_skills = {category: [] for category in _SKILLS_SETS.keys()}
+        Returns:
+            Tuple[Dict[str, List[str]], Set[int], Dict[str, str]]: skills_data,
+            the canonical ids of the database skills found, and the
+            misspellings resolved to skills
+        """
+        found_skills = {category: [] for category in _SKILL_CATEGORY_NAMES}
         found_skills["general_keywords"] = []
+        skill_ids = set()
+        corrections = {}
+
+        # One trie walk finds single- and multi-word skills; single tokens
+        # must survive the same filter as keywords. Misspelled skills come
+        # from the typo index
+        extractor = _get_skill_extractor()
+        matches = extractor.extract(raw_tokens, keep_single=self._keep_token)
+        for misspelling, match in extractor.correct(
+            raw_tokens, self._may_be_misspelling
+        ):
+            corrections[misspelling] = match[0]
+            matches.append(match)
+
+        for skill, categories, skill_id in matches:
+            for category in categories:
+                found_skills[category].append(skill)
+            if skill_id is not None:
+                skill_ids.add(skill_id)
 
-        # Check for technical skills using set lookups (O(1))
         for token in tokens:
-            token_lower = token.lower()
-            for category, skills_set in _SKILLS_SETS.items():
-                if token_lower in skills_set:
-                    found_skills[category].append(token)
-
             # Add to general keywords if it's not a common word
             if len(token) > 2 and token.isalpha() and token not in self.stop_words:
                 found_skills["general_keywords"].append(token)
@@ -335,7 +405,7 @@ class TextPreprocessor:
         for category in found_skills:
             found_skills[category] = sorted(list(set(found_skills[category])))
 
-        return found_skills
+        return found_skills, skill_ids, corrections
 
     def preprocess_for_matching(self, text: str) -> Dict[str, Any]:
         """
@@ -347,21 +417,22 @@ class TextPreprocessor:
         Returns:
             Dict[str, Any]: Comprehensive preprocessing results
         """
-        # Basic cleaning
+        # Basic cleaning (clean_text is idempotent, so one pass serves every
+        # derived field)
         cleaned_text = self.clean_text(text)
 
         # Tokenization
-        tokens = self.tokenize_and_filter(cleaned_text, remove_stopwords=True)
-        tokens_with_stopwords = self.tokenize_and_filter(
-            cleaned_text, remove_stopwords=False
-        )
+        raw_tokens = self.tokenizer.tokenize(cleaned_text)
+        tokens = self._filter_tokens(raw_tokens, remove_stopwords=True)
+        tokens_with_stopwords = self._filter_tokens(raw_tokens, remove_stopwords=False)
 
         # Skills extraction
-        skills_data = self.extract_skills_and_keywords(text)
+        skills_data, skill_ids, skill_corrections = self._categorize_tokens(
+            raw_tokens, tokens
+        )
 
-        # Create text for semantic matching (preserve some structure)
-        semantic_text = self.clean_text(text)
-        semantic_text = re.sub(r"\s+", " ", semantic_text)
+        # Text for semantic matching (clean_text already collapses whitespace)
+        semantic_text = cleaned_text
 
         # Create keyword set for exact matching
         keyword_set = set(token.lower() for token in tokens)
@@ -374,6 +445,8 @@ class TextPreprocessor:
             "tokens_with_stopwords": tokens_with_stopwords,
             "keyword_set": keyword_set,
             "skills_data": skills_data,
+            "skill_ids": skill_ids,
+            "skill_corrections": skill_corrections,
             "total_tokens": len(tokens),
             "unique_tokens": len(set(tokens)),
         }
@@ -404,17 +477,80 @@ class TextPreprocessor:
         return list(set(phrases))
 
 
+# Shared preprocessor for the convenience functions
+_PREPROCESSOR = None
+_SKILL_EXTRACTOR = None
+_WORDNET_AVAILABLE = None
+
+
+def _get_preprocessor() -> TextPreprocessor:
+    """Get or create the shared TextPreprocessor"""
+    global _PREPROCESSOR
+    if _PREPROCESSOR is None:
+        _PREPROCESSOR = TextPreprocessor()
+    return _PREPROCESSOR
+
+
+def _get_skill_extractor() -> SkillExtractor:
+    """Get or build the shared skill trie over the database and keyword sets"""
+    global _SKILL_EXTRACTOR
+    if _SKILL_EXTRACTOR is None:
+        preprocessor = _get_preprocessor()
+
+        def phrase_tokens(phrase: str) -> List[str]:
+            # Phrases whose symbols cleaning drops (".net", "c++") would
+            # otherwise match a bare "net" or "c"
+            cleaned = preprocessor.clean_text(phrase)
+            if not _SKILL_PHRASE_RE.fullmatch(cleaned):
+                return []
+            return preprocessor.tokenizer.tokenize(cleaned)
+
+        extractor = SkillExtractor(phrase_tokens)
+        # Database spellings and aliases first, so every spelling reports the
+        # canonical name and id ("reactjs" -> "react")
+        for term, skill_id in _SKILL_INDEX.terms():
+            extractor.add(
+                term,
+                _SKILL_INDEX.categories[skill_id],
+                skill=_SKILL_INDEX.names[skill_id],
+                skill_id=skill_id,
+            )
+        extractor.add_skills(_SKILLS_SETS)
+        _SKILL_EXTRACTOR = extractor
+    return _SKILL_EXTRACTOR
+
+
+@lru_cache(maxsize=65536)
+def _is_dictionary_word(token: str) -> bool:
+    """
+    Whether WordNet knows token, inflections included ("nodes", "sprint")
+
+    Without WordNet every token counts as a word, which turns typo matching
+    off: unguarded, it would read "sprint" as Spring and "monitoring" as
+    mentoring.
+    """
+    global _WORDNET_AVAILABLE
+    if _WORDNET_AVAILABLE is False:
+        return True
+    try:
+        known = wordnet.morphy(token) is not None
+    except (LookupError, OSError) as e:
+        _WORDNET_AVAILABLE = False
+        print(f"⚠️ WordNet unavailable, typo-tolerant skill matching is off: {e}")
+        return True
+    _WORDNET_AVAILABLE = True
+    return known
+
+
 # Convenience functions
 def preprocess_resume(resume_text: str) -> Dict[str, Any]:
     """Preprocess resume text for matching"""
-    preprocessor = TextPreprocessor()
-    return preprocessor.preprocess_for_matching(resume_text)
+    return _get_preprocessor().preprocess_for_matching(resume_text)
 
 
 def preprocess_job_description(jd_text: str) -> Dict[str, Any]:
     """Preprocess job description text for matching"""
-    preprocessor = TextPreprocessor()
-    return preprocessor.preprocess_for_matching(jd_text)
+    return _get_preprocessor().preprocess_for_matching(jd_text)
 
 
 # Example usage
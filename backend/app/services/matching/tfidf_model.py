@@ -0,0 +1,521 @@
+"""
+TF-IDF Model Store
+Corpus-fitted, versioned TF-IDF vectorizer shared by every process through disk
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+try:
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    SKLEARN_AVAILABLE = True
+except ImportError:
+    SKLEARN_AVAILABLE = False
+
+from app.services.executor import get_executor
+
+try:
+    from .text_preprocessor import _get_preprocessor
+except ImportError:
+    from text_preprocessor import _get_preprocessor
+
+# Vectorizer settings shared by corpus models and per-request fallbacks
+TFIDF_PARAMS: Dict[str, Any] = {
+    "max_features": 5000,
+    "stop_words": "english",
+    "ngram_range": (1, 3),
+    "lowercase": True,
+    "strip_accents": "unicode",
+    "norm": "l2",  # Unit rows: cosine similarity is a sparse dot product
+}
+
+# Published model: {"version", "file", "documents", "fitted_at", "corpus_size"}
+POINTER_FILE = "current.json"
+
+
+@dataclass(frozen=True)
+class TfidfModel:
+    """A fitted vectorizer and the version its vectors are tagged with"""
+
+    version: Optional[str]  # None for throwaway per-request models
+    vectorizer: Any
+    documents: int
+    fitted_at: str
+    corpus_size: int = 0  # Documents ever added to the corpus when fitted
+
+
+def model_directory() -> str:
+    """Directory holding the corpus, model files and pointer (TFIDF_MODEL_DIR)"""
+    return os.getenv("TFIDF_MODEL_DIR", "tfidf_model")
+
+
+def new_vectorizer() -> "TfidfVectorizer":
+    """Unfitted vectorizer with the shared settings"""
+    return TfidfVectorizer(**TFIDF_PARAMS)
+
+
+def fit_transient_model(texts: List[str]) -> TfidfModel:
+    """
+    Fit a throwaway model on the texts being compared
+
+    Used until the first corpus model is published. It is never cached or
+    shared, so its vocabulary does not leak into later requests.
+    """
+    vectorizer = new_vectorizer()
+    vectorizer.fit(texts)
+    return TfidfModel(None, vectorizer, len(texts), datetime.now().isoformat())
+
+
+def _model_version(vectorizer: "TfidfVectorizer") -> str:
+    """Content-derived version: identical fits get identical versions"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps(TFIDF_PARAMS, sort_keys=True, default=str).encode())
+    for term, index in sorted(vectorizer.vocabulary_.items()):
+        digest.update(f"{term}\0{index}\0".encode("utf-8"))
+    digest.update(vectorizer.idf_.tobytes())
+    return f"tfidf-{digest.hexdigest()[:16]}"
+
+
+def fit_corpus_model(documents: List[str], directory: str) -> Dict[str, Any]:
+    """
+    Fit a vectorizer on the corpus and save it under its version
+
+    Runs in the CPU executor. The file is written to a temporary name and
+    renamed into place, so readers never see a partial model.
+
+    Args:
+        documents: Corpus texts
+        directory: Model directory
+
+    Returns:
+        Pointer record for the new model
+    """
+    vectorizer = new_vectorizer()
+    vectorizer.fit(documents)
+
+    version = _model_version(vectorizer)
+    filename = f"{version}.pkl"
+    path = os.path.join(directory, filename)
+
+    if not os.path.exists(path):
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            pickle.dump(vectorizer, f)
+        os.replace(temp_path, path)
+
+    return {
+        "version": version,
+        "file": filename,
+        "documents": len(documents),
+        "fitted_at": datetime.now().isoformat(),
+    }
+
+
+# Model loaded in this process, refreshed from the pointer file
+_loaded: Dict[str, Any] = {"model": None, "pointer_mtime": None, "checked_at": None}
+_load_lock = threading.Lock()
+
+
+def get_current_model() -> Optional[TfidfModel]:
+    """
+    Latest published corpus model (None until the first fit)
+
+    The pointer file is checked at most every TFIDF_RELOAD_INTERVAL seconds.
+    A new version replaces the loaded model in a single assignment, so a
+    caller holding the previous model keeps using one consistent vectorizer.
+    """
+    if not SKLEARN_AVAILABLE:
+        return None
+
+    now = time.monotonic()
+    reload_interval = float(os.getenv("TFIDF_RELOAD_INTERVAL", "2"))
+    checked_at = _loaded["checked_at"]
+    if checked_at is not None and now - checked_at < reload_interval:
+        return _loaded["model"]
+
+    with _load_lock:
+        _loaded["checked_at"] = now
+        pointer_path = os.path.join(model_directory(), POINTER_FILE)
+
+        try:
+            pointer_mtime = os.stat(pointer_path).st_mtime_ns
+            if pointer_mtime != _loaded["pointer_mtime"]:
+                with open(pointer_path) as f:
+                    pointer = json.load(f)
+
+                current = _loaded["model"]
+                if current is None or current.version != pointer["version"]:
+                    with open(
+                        os.path.join(model_directory(), pointer["file"]), "rb"
+                    ) as f:
+                        vectorizer = pickle.load(f)
+                    _loaded["model"] = TfidfModel(
+                        pointer["version"],
+                        vectorizer,
+                        pointer["documents"],
+                        pointer["fitted_at"],
+                        pointer.get("corpus_size", pointer["documents"]),
+                    )
+                    print(f"🔁 Loaded TF-IDF model {pointer['version']}")
+                _loaded["pointer_mtime"] = pointer_mtime
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, pickle.UnpicklingError) as e:
+            print(f"⚠️ Could not load TF-IDF model: {e}")
+
+    return _loaded["model"]
+
+
+class TfidfModelManager:
+    """
+    Owns the document corpus and refits the shared TF-IDF model as it grows.
+
+    - Uploaded job descriptions and resumes are stored once per content hash
+      in SQLite. Only the newest ``max_documents`` are kept; re-adding a
+      document makes it new again.
+    - A refit is due once the corpus has grown by ``refit_growth`` of the
+      documents the current model saw (at least one new document), and runs
+      no more often than every ``min_interval`` seconds.
+    - Fitting runs in the CPU executor. The model file is named after its
+      version and published by atomically replacing the pointer file, which
+      every process polls (get_current_model) and hot-swaps.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        min_documents: Optional[int] = None,
+        refit_growth: Optional[float] = None,
+        min_interval: Optional[float] = None,
+        max_documents: Optional[int] = None,
+        keep_models: Optional[int] = None,
+        fit_timeout: Optional[float] = None,
+    ):
+        """
+        Initialize the manager. Unset values are read from the environment.
+
+        Args:
+            directory: Corpus and model directory (TFIDF_MODEL_DIR)
+            min_documents: Corpus size needed for the first fit (TFIDF_MIN_CORPUS_DOCS)
+            refit_growth: Relative corpus growth that triggers a refit (TFIDF_REFIT_GROWTH)
+            min_interval: Minimum seconds between fits (TFIDF_REFIT_MIN_INTERVAL)
+            max_documents: Most recent documents kept and used per fit (TFIDF_MAX_CORPUS_DOCS)
+            keep_models: Model files kept on disk (TFIDF_KEEP_MODELS)
+            fit_timeout: Seconds a fit may take (TFIDF_FIT_TIMEOUT)
+        """
+        self.directory = directory or model_directory()
+        self.min_documents = min_documents or int(
+            os.getenv("TFIDF_MIN_CORPUS_DOCS", "2")
+        )
+        self.refit_growth = (
+            refit_growth
+            if refit_growth is not None
+            else float(os.getenv("TFIDF_REFIT_GROWTH", "0.1"))
+        )
+        self.min_interval = (
+            min_interval
+            if min_interval is not None
+            else float(os.getenv("TFIDF_REFIT_MIN_INTERVAL", "30"))
+        )
+        self.max_documents = max_documents or int(
+            os.getenv("TFIDF_MAX_CORPUS_DOCS", "5000")
+        )
+        self.keep_models = keep_models or int(os.getenv("TFIDF_KEEP_MODELS", "3"))
+        self.fit_timeout = fit_timeout or float(os.getenv("TFIDF_FIT_TIMEOUT", "600"))
+
+        # One connection shared by the I/O threads, serialised by a lock
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._refit_task: Optional[asyncio.Task] = None
+        self._last_fit_at: Optional[float] = None
+        self._last_fit_seconds: Optional[float] = None
+        self._fits = 0
+        self._fit_errors = 0
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Get or create the SQLite connection and schema"""
+        if self._conn is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._conn = sqlite3.connect(
+                os.path.join(self.directory, "corpus.sqlite3"),
+                check_same_thread=False,
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS tfidf_corpus (
+                    digest TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    added_at REAL NOT NULL
+                )
+                """)
+            # Pruning caps the row count, so growth is measured by a counter
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS tfidf_corpus_stats (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                )
+                """)
+            self._conn.execute(
+                "INSERT OR IGNORE INTO tfidf_corpus_stats (name, value) "
+                "SELECT 'documents_added', COUNT(*) FROM tfidf_corpus"
+            )
+            self._prune(self._conn)
+            self._conn.commit()
+        return self._conn
+
+    def _prune(self, conn: sqlite3.Connection):
+        """Delete all but the newest max_documents documents"""
+        conn.execute(
+            "DELETE FROM tfidf_corpus WHERE digest NOT IN "
+            "(SELECT digest FROM tfidf_corpus ORDER BY added_at DESC LIMIT ?)",
+            (self.max_documents,),
+        )
+
+    def add_documents(self, texts: List[str], kind: str) -> int:
+        """
+        Store documents in the corpus and prune the oldest beyond max_documents
+
+        Texts are cleaned the same way as the semantic text the model encodes.
+        A duplicate is not stored twice but counts as recently added.
+
+        Args:
+            texts: Raw document texts
+            kind: "job_description" or "resume"
+
+        Returns:
+            Number of new documents
+        """
+        preprocessor = _get_preprocessor()
+        cleaned = [preprocessor.clean_text(text) for text in texts]
+        rows = [
+            (hashlib.sha256(text.encode("utf-8")).hexdigest(), kind, text, time.time())
+            for text in cleaned
+            if text.strip()
+        ]
+
+        with self._lock:
+            conn = self._get_connection()
+            count_query = "SELECT COUNT(*) FROM tfidf_corpus"
+            before = conn.execute(count_query).fetchone()[0]
+            conn.executemany(
+                "INSERT INTO tfidf_corpus (digest, kind, text, added_at) "
+                "VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(digest) DO UPDATE SET added_at = excluded.added_at",
+                rows,
+            )
+            added = conn.execute(count_query).fetchone()[0] - before
+            conn.execute(
+                "UPDATE tfidf_corpus_stats SET value = value + ? "
+                "WHERE name = 'documents_added'",
+                (added,),
+            )
+            self._prune(conn)
+            conn.commit()
+            return added
+
+    async def aadd_documents(self, texts: List[str], kind: str) -> int:
+        """Awaitable add_documents that also schedules a refit when one is due"""
+        added = await get_executor().run_io(self.add_documents, texts, kind)
+        if added:
+            await self.maybe_refit()
+        return added
+
+    def clear(self):
+        """Delete every stored document; published models are kept"""
+        with self._lock:
+            conn = self._get_connection()
+            conn.execute("DELETE FROM tfidf_corpus")
+            conn.commit()
+
+    def _count_documents(self) -> int:
+        """Number of documents in the corpus"""
+        with self._lock:
+            row = (
+                self._get_connection()
+                .execute("SELECT COUNT(*) FROM tfidf_corpus")
+                .fetchone()
+            )
+        return row[0]
+
+    def _count_added(self) -> int:
+        """Documents ever added, pruned and cleared ones included"""
+        with self._lock:
+            row = (
+                self._get_connection()
+                .execute(
+                    "SELECT value FROM tfidf_corpus_stats "
+                    "WHERE name = 'documents_added'"
+                )
+                .fetchone()
+            )
+        return row[0]
+
+    def _load_documents(self) -> List[str]:
+        """Most recent max_documents corpus texts"""
+        with self._lock:
+            rows = (
+                self._get_connection()
+                .execute(
+                    "SELECT text FROM tfidf_corpus ORDER BY added_at DESC LIMIT ?",
+                    (self.max_documents,),
+                )
+                .fetchall()
+            )
+        return [row[0] for row in rows]
+
+    def _refit_due(self, corpus_size: int, documents_added: int) -> bool:
+        """Whether the corpus has outgrown the current model"""
+        if corpus_size < self.min_documents:
+            return False
+
+        model = get_current_model()
+        if model is None:
+            return True
+
+        new_documents = documents_added - model.corpus_size
+        return new_documents >= max(1, self.refit_growth * model.documents)
+
+    async def maybe_refit(self):
+        """Start a background refit if one is due and none is running"""
+        if not SKLEARN_AVAILABLE:
+            return
+        if self._refit_task is not None and not self._refit_task.done():
+            return
+
+        corpus_size = await get_executor().run_io(self._count_documents)
+        documents_added = await get_executor().run_io(self._count_added)
+        if self._refit_due(corpus_size, documents_added):
+            self._refit_task = asyncio.ensure_future(self._refit())
+
+    def _publish(self, pointer: Dict[str, Any]):
+        """Atomically point every process at a new model and prune old files"""
+        pointer_path = os.path.join(self.directory, POINTER_FILE)
+        temp_path = f"{pointer_path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(pointer, f)
+        os.replace(temp_path, pointer_path)
+
+        model_files = sorted(
+            (
+                name
+                for name in os.listdir(self.directory)
+                if name.endswith(".pkl") and name != pointer["file"]
+            ),
+            key=lambda name: os.path.getmtime(os.path.join(self.directory, name)),
+            reverse=True,
+        )
+        for name in model_files[self.keep_models - 1 :]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+        # Pick the new model up in this process straight away
+        _loaded["checked_at"] = None
+
+    async def _refit(self):
+        """Fit on the current corpus, publish, then catch up if it grew meanwhile"""
+        if self._last_fit_at is not None:
+            wait = self._last_fit_at + self.min_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+        executor = get_executor()
+        started_at = time.monotonic()
+        try:
+            documents_added = await executor.run_io(self._count_added)
+            documents = await executor.run_io(self._load_documents)
+            pointer = await executor.run_cpu(
+                fit_corpus_model, documents, self.directory, timeout=self.fit_timeout
+            )
+            pointer["corpus_size"] = documents_added
+            await executor.run_io(self._publish, pointer)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._fit_errors += 1
+            print(f"❌ TF-IDF refit failed: {e}")
+            return
+        finally:
+            self._last_fit_at = time.monotonic()
+
+        self._fits += 1
+        self._last_fit_seconds = self._last_fit_at - started_at
+        print(
+            f"✅ TF-IDF model {pointer['version']} fitted on "
+            f"{pointer['documents']} document(s) in {self._last_fit_seconds:.1f}s"
+        )
+
+        # Documents added during the fit may already warrant another one
+        self._refit_task = None
+        await self.maybe_refit()
+
+    async def start(self):
+        """Fit at startup if the stored corpus has outgrown the published model"""
+        await self.maybe_refit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get corpus size, current model and refit counters"""
+        model = get_current_model()
+        return {
+            "documents": self._count_documents(),
+            "model_version": model.version if model else None,
+            "model_documents": model.documents if model else 0,
+            "model_fitted_at": model.fitted_at if model else None,
+            "refit_running": self._refit_task is not None
+            and not self._refit_task.done(),
+            "fits": self._fits,
+            "fit_errors": self._fit_errors,
+            "last_fit_seconds": (
+                round(self._last_fit_seconds, 3)
+                if self._last_fit_seconds is not None
+                else None
+            ),
+        }
+
+    async def close(self):
+        """Stop any running refit and close the database"""
+        if self._refit_task is not None and not self._refit_task.done():
+            self._refit_task.cancel()
+            try:
+                await self._refit_task
+            except asyncio.CancelledError:
+                pass
+        self._refit_task = None
+
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Process-wide manager
+_manager: Optional[TfidfModelManager] = None
+
+
+def get_tfidf_model_manager() -> TfidfModelManager:
+    """Get or create the shared TfidfModelManager"""
+    global _manager
+    if _manager is None:
+        _manager = TfidfModelManager()
+    return _manager
+
+
+async def shutdown_tfidf_model_manager():
+    """Stop refits and close the shared manager"""
+    global _manager
+    if _manager is not None:
+        await _manager.close()
+        _manager = None
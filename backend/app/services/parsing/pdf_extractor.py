@@ -223,35 +223,72 @@ class FixedPDFParser:
         try:
             # Extract raw text
             raw_text = self._extract_text_from_pdf(pdf_path)
+            return self._parse_text(raw_text, pdf_path)
 
-            if not raw_text.strip():
-                return {"error": "Could not extract text from PDF"}
+        except Exception as e:
+            return {"error": f"Error parsing PDF: {str(e)}"}
 
-            # Determine document type
-            doc_type = self._detect_document_type(raw_text)
+    def parse_pdf_bytes(
+        self, pdf_bytes: bytes, filename: str = "document.pdf"
+    ) -> Dict[str, Any]:
+        """
+        Parse a PDF held in memory (e.g. an upload) without touching the filesystem
 
-            # Parse based on type
-            if doc_type == "resume":
-                return self._parse_resume(raw_text, pdf_path)
-            else:
-                return self._parse_job_description(raw_text, pdf_path)
+        Args:
+            pdf_bytes: Raw PDF file content
+            filename: Original filename, used as the source_file label
+
+        Returns:
+            Dict with the same structure as parse_pdf
+        """
+        try:
+            raw_text = self._extract_text_from_bytes(pdf_bytes)
+            return self._parse_text(raw_text, filename)
 
         except Exception as e:
             return {"error": f"Error parsing PDF: {str(e)}"}
 
+    def _parse_text(self, raw_text: str, source_name: str) -> Dict[str, Any]:
+        """Parse extracted text based on detected document type"""
+        if not raw_text.strip():
+            return {"error": "Could not extract text from PDF"}
+
+        # Determine document type
+        doc_type = self._detect_document_type(raw_text)
+
+        # Parse based on type
+        if doc_type == "resume":
+            return self._parse_resume(raw_text, source_name)
+        else:
+            return self._parse_job_description(raw_text, source_name)
+
     def _extract_text_from_pdf(self, pdf_path: str) -> str:
         """Extract text from PDF using PyMuPDF"""
         try:
             doc = fitz.open(pdf_path)
+            return self._extract_text_from_document(doc)
+        except Exception as e:
+            raise Exception(f"Error extracting text from PDF: {str(e)}")
+
+    def _extract_text_from_bytes(self, pdf_bytes: bytes) -> str:
+        """Extract text from in-memory PDF content using PyMuPDF"""
+        try:
+            doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+            return self._extract_text_from_document(doc)
+        except Exception as e:
+            raise Exception(f"Error extracting text from PDF: {str(e)}")
+
+    def _extract_text_from_document(self, doc) -> str:
+        """Concatenate the text of every page of an open PyMuPDF document"""
+        try:
             text = ""
             for page_num in range(doc.page_count):
                 page = doc[page_num]
                 text += page.get_text()
                 text += "\n"
-            doc.close()
             return text
-        except Exception as e:
-            raise Exception(f"Error extracting text from PDF: {str(e)}")
+        finally:
+            doc.close()
 
     def _detect_document_type(self, text: str) -> str:
         """Simple document type detection"""
@@ -742,6 +779,12 @@ def parse_pdf_file(file_path: str) -> Dict[str, Any]:
     return parser.parse_pdf(file_path)
 
 
+def parse_pdf_bytes(pdf_bytes: bytes, filename: str = "document.pdf") -> Dict[str, Any]:
+    """Parse PDF content held in memory"""
+    parser = FixedPDFParser()
+    return parser.parse_pdf_bytes(pdf_bytes, filename)
+
+
 # Test execution
 if __name__ == "__main__":
     sample_pdf = (
@@ -14,6 +14,8 @@ sys.path.append(str(Path(__file__).parent.parent))
 sys.path.append(str(Path(__file__).parent))
 
 from parsing.pdf_extractor import FixedPDFParser
+from app.services.executor import get_executor
+from app.services.singleflight import content_key, get_singleflight
 
 
 class PDFExtractionService:
@@ -50,48 +52,43 @@ class PDFExtractionService:
             parser = FixedPDFParser()
             extraction_result = parser.parse_pdf(pdf_path)
 
-            if "error" in extraction_result:
-                return {
-                    "success": False,
-                    "error": f"PDF extraction failed: {extraction_result.get('error', 'Unknown error')}",
-                    "stage": "extraction",
-                    "extraction_result": extraction_result,
-                }
+            return self._build_extraction_result(extraction_result)
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Extraction error: {str(e)}",
+                "stage": "extraction",
+            }
 
-            raw_text = extraction_result.get("raw_text", "")
-            if not raw_text.strip():
+    def extract_pdf_bytes(
+        self, pdf_bytes: bytes, filename: str = "document.pdf"
+    ) -> Dict[str, Any]:
+        """
+        Extract text from PDF content held in memory (no temp file)
+
+        Args:
+            pdf_bytes (bytes): Raw PDF file content
+            filename (str): Original filename, used for labelling only
+
+        Returns:
+            Dict[str, Any]: Extraction result with raw text
+        """
+        try:
+            # Validate inputs
+            if not pdf_bytes:
                 return {
                     "success": False,
-                    "error": "No text content found in PDF",
-                    "stage": "extraction",
-                    "extraction_result": extraction_result,
+                    "error": f"PDF content is empty: {filename}",
+                    "stage": "validation",
                 }
 
-            print(f"✅ Text extracted successfully. Length: {len(raw_text)} characters")
-
-            # Return extraction result with structured data
-            final_result = {
-                "success": True,
-                "document_info": {
-                    "source_file": extraction_result.get("source_file"),
-                    "extracted_at": extraction_result.get(
-                        "parsed_at", datetime.now().isoformat()
-                    ),
-                    "text_length": len(raw_text),
-                    "document_type": extraction_result.get("document_type"),
-                },
-                "raw_text": raw_text,
-                "structured_data": {
-                    k: v
-                    for k, v in extraction_result.items()
-                    if k
-                    not in ["raw_text", "source_file", "parsed_at", "document_type"]
-                },
-                "processing_stages": {"extraction": "success", "parsing": "success"},
-            }
+            print(f"🔍 Starting in-memory PDF text extraction for: {filename}")
+
+            parser = FixedPDFParser()
+            extraction_result = parser.parse_pdf_bytes(pdf_bytes, filename)
 
-            print("🎉 PDF text extraction completed successfully!")
-            return final_result
+            return self._build_extraction_result(extraction_result)
 
         except Exception as e:
             return {
@@ -100,6 +97,52 @@ class PDFExtractionService:
                 "stage": "extraction",
             }
 
+    def _build_extraction_result(
+        self, extraction_result: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Convert a FixedPDFParser result into the service response format"""
+        if "error" in extraction_result:
+            return {
+                "success": False,
+                "error": f"PDF extraction failed: {extraction_result.get('error', 'Unknown error')}",
+                "stage": "extraction",
+                "extraction_result": extraction_result,
+            }
+
+        raw_text = extraction_result.get("raw_text", "")
+        if not raw_text.strip():
+            return {
+                "success": False,
+                "error": "No text content found in PDF",
+                "stage": "extraction",
+                "extraction_result": extraction_result,
+            }
+
+        print(f"✅ Text extracted successfully. Length: {len(raw_text)} characters")
+
+        # Return extraction result with structured data
+        final_result = {
+            "success": True,
+            "document_info": {
+                "source_file": extraction_result.get("source_file"),
+                "extracted_at": extraction_result.get(
+                    "parsed_at", datetime.now().isoformat()
+                ),
+                "text_length": len(raw_text),
+                "document_type": extraction_result.get("document_type"),
+            },
+            "raw_text": raw_text,
+            "structured_data": {
+                k: v
+                for k, v in extraction_result.items()
+                if k not in ["raw_text", "source_file", "parsed_at", "document_type"]
+            },
+            "processing_stages": {"extraction": "success", "parsing": "success"},
+        }
+
+        print("🎉 PDF text extraction completed successfully!")
+        return final_result
+
     def extract_and_save(
         self,
         pdf_path: str,
@@ -150,6 +193,32 @@ def extract_pdf_file(pdf_path: str) -> Dict[str, Any]:
     return service.extract_pdf_text(pdf_path)
 
 
+def extract_pdf_content(
+    pdf_bytes: bytes, filename: str = "document.pdf"
+) -> Dict[str, Any]:
+    """Extract text from PDF content held in memory"""
+    service = PDFExtractionService()
+    return service.extract_pdf_bytes(pdf_bytes, filename)
+
+
+async def aextract_pdf_text(pdf_path: str) -> Dict[str, Any]:
+    """Extract text from a PDF file in the shared process pool"""
+    return await get_executor().run_cpu(extract_pdf_file, pdf_path)
+
+
+async def aextract_pdf_content(
+    pdf_bytes: bytes, filename: str = "document.pdf"
+) -> Dict[str, Any]:
+    """
+    Extract text from in-memory PDF content in the shared process pool.
+    Concurrent uploads of the same file share one extraction.
+    """
+    return await get_singleflight("pdf_extraction").do(
+        content_key(pdf_bytes, filename),
+        lambda: get_executor().run_cpu(extract_pdf_content, pdf_bytes, filename),
+    )
+
+
 # Main execution for testing
 if __name__ == "__main__":
     # Example usage
@@ -0,0 +1,249 @@
+"""
+Stage Pipeline
+Runs a small DAG of async stages, starting each stage as soon as the
+stages it depends on have finished, and streams many items through a
+chain of bounded stages
+"""
+
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+# A stage receives the results of its dependencies, keyed by stage name
+StageFunction = Callable[[Dict[str, Any]], Awaitable[Any]]
+StageCallback = Callable[[str, Any, float], Any]
+
+
+class StagePipeline:
+    """
+    Minimal DAG runner for async stages.
+
+    Independent stages run concurrently; a stage waits only on the stages
+    listed in its ``depends_on``. Stages must be added after their
+    dependencies, which also rules out cycles.
+    """
+
+    def __init__(self, name: str = "pipeline"):
+        self.name = name
+        self._stages: Dict[str, Tuple[StageFunction, Tuple[str, ...]]] = {}
+
+    def add_stage(
+        self, name: str, fn: StageFunction, depends_on: Iterable[str] = ()
+    ) -> "StagePipeline":
+        """
+        Register a stage
+
+        Args:
+            name: Unique stage name
+            fn: Async function called with {dependency_name: result}
+            depends_on: Names of stages whose results this stage needs
+
+        Returns:
+            The pipeline, for chaining
+        """
+        depends_on = tuple(depends_on)
+
+        if name in self._stages:
+            raise ValueError(f"Stage '{name}' is already defined in {self.name}")
+
+        unknown = [dep for dep in depends_on if dep not in self._stages]
+        if unknown:
+            raise ValueError(
+                f"Stage '{name}' depends on undefined stage(s): {', '.join(unknown)}"
+            )
+
+        self._stages[name] = (fn, depends_on)
+        return self
+
+    @property
+    def stage_names(self) -> Tuple[str, ...]:
+        """Stage names in registration order"""
+        return tuple(self._stages.keys())
+
+    async def run(
+        self, on_stage_complete: Optional[StageCallback] = None
+    ) -> Dict[str, Any]:
+        """
+        Run every stage, each as soon as its inputs are ready
+
+        Args:
+            on_stage_complete: Optional callback (stage_name, result, elapsed_seconds),
+                               may be sync or async
+
+        Returns:
+            Dict mapping stage name to its result
+
+        Raises:
+            The first exception raised by any stage; remaining stages are cancelled
+        """
+        results: Dict[str, Any] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_stage(name: str, fn: StageFunction, depends_on: Tuple[str, ...]):
+            if depends_on:
+                await asyncio.gather(*(tasks[dep] for dep in depends_on))
+
+            start = time.perf_counter()
+            result = await fn({dep: results[dep] for dep in depends_on})
+            elapsed = time.perf_counter() - start
+            results[name] = result
+
+            if on_stage_complete is not None:
+                callback_result = on_stage_complete(name, result, elapsed)
+                if inspect.isawaitable(callback_result):
+                    await callback_result
+
+            return result
+
+        for name, (fn, depends_on) in self._stages.items():
+            tasks[name] = asyncio.create_task(run_stage(name, fn, depends_on))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        finally:
+            for task in tasks.values():
+                if not task.done():
+                    task.cancel()
+            # Collect outstanding exceptions so none are reported as unretrieved
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+        return results
+
+
+@dataclass
+class PipelineItem:
+    """An item flowing through a StreamingPipeline"""
+
+    index: int
+    item: Any
+    value: Any = None
+    error: Optional[BaseException] = None
+    failed_stage: Optional[str] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+# Marks the end of a stage's input
+_END = object()
+
+
+class StreamingPipeline:
+    """
+    Chain of async stages connected by bounded queues.
+
+    Each stage runs ``workers`` concurrent workers; when a downstream stage
+    falls behind its input queue fills up and upstream workers wait, so at
+    most a few items per stage are in memory at once. Items that fail in a
+    stage skip the remaining stages and are emitted with the error.
+    """
+
+    def __init__(self, name: str = "stream", queue_size: int = 8):
+        self.name = name
+        self.queue_size = queue_size
+        self._stages: List[Tuple[str, Callable[[Any], Awaitable[Any]], int]] = []
+
+    def add_stage(
+        self, name: str, fn: Callable[[Any], Awaitable[Any]], workers: int = 1
+    ) -> "StreamingPipeline":
+        """
+        Append a stage
+
+        Args:
+            name: Stage name
+            fn: Async function mapping the previous stage's value to this stage's
+            workers: Concurrent workers for this stage
+
+        Returns:
+            The pipeline, for chaining
+        """
+        self._stages.append((name, fn, max(1, workers)))
+        return self
+
+    async def run(self, items: Iterable[Any]) -> AsyncIterator[PipelineItem]:
+        """
+        Feed items through every stage
+
+        Args:
+            items: Inputs; consumed lazily as the first stage has room
+
+        Yields:
+            PipelineItem per input, in completion order
+        """
+        queues = [
+            asyncio.Queue(maxsize=self.queue_size) for _ in range(len(self._stages) + 1)
+        ]
+        tasks: List[asyncio.Task] = []
+
+        async def feed():
+            try:
+                for index, item in enumerate(items):
+                    await queues[0].put(
+                        PipelineItem(index=index, item=item, value=item)
+                    )
+            except Exception:
+                # End the stream anyway so the consumer stops waiting; the
+                # error is re-raised from the feeder task once it drains
+                await queues[0].put(_END)
+                raise
+            await queues[0].put(_END)
+
+        async def run_stage(position: int):
+            name, fn, workers = self._stages[position]
+            inbox, outbox = queues[position], queues[position + 1]
+            finished = 0
+
+            async def worker():
+                nonlocal finished
+                while True:
+                    entry = await inbox.get()
+                    if entry is _END:
+                        # Let sibling workers see the end marker too
+                        await inbox.put(_END)
+                        break
+
+                    if entry.error is None:
+                        start = time.perf_counter()
+                        try:
+                            entry.value = await fn(entry.value)
+                        except Exception as e:
+                            entry.error = e
+                            entry.failed_stage = name
+                        entry.timings[name] = time.perf_counter() - start
+
+                    await outbox.put(entry)
+
+                finished += 1
+                if finished == workers:
+                    await outbox.put(_END)
+
+            await asyncio.gather(*(worker() for _ in range(workers)))
+
+        tasks.append(asyncio.ensure_future(feed()))
+        for position in range(len(self._stages)):
+            tasks.append(asyncio.ensure_future(run_stage(position)))
+
+        try:
+            while True:
+                entry = await queues[-1].get()
+                if entry is _END:
+                    break
+                yield entry
+
+            # Surface errors from the feeder (e.g. a failing input iterator)
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
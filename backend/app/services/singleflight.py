@@ -0,0 +1,155 @@
+"""
+Single-Flight Service
+Collapses concurrent identical requests onto one in-flight computation
+"""
+
+import asyncio
+import copy
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Union
+
+
+def content_key(*parts: Union[str, bytes, int, float, bool, None]) -> str:
+    """
+    Build a stable key from request content
+
+    Args:
+        *parts: Values identifying the request (text, raw bytes, versions, flags)
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, bytes):
+            part = repr(part).encode("utf-8")
+        # Length-prefix each part so ("ab", "c") and ("a", "bc") differ
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls that share a key.
+
+    The first caller for a key starts the computation as its own task; later
+    callers await the same task instead of starting another. Cancelling one
+    caller (e.g. a client disconnect) does not cancel the shared work.
+
+    With ``result_ttl`` > 0, successful results are also kept for that many
+    seconds so repeated submissions (idempotency keys) get the same answer.
+    Every caller receives its own copy of the result.
+    """
+
+    def __init__(self, name: str, result_ttl: float = 0, max_retained: int = 1000):
+        """
+        Initialize the group
+
+        Args:
+            name: Group name, used in stats
+            result_ttl: Seconds to keep successful results after completion
+            max_retained: Maximum number of retained results
+        """
+        self.name = name
+        self.result_ttl = result_ttl
+        self.max_retained = max_retained
+
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._retained: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._executions = 0
+        self._coalesced = 0
+        self._replayed = 0
+
+    def _get_retained(self, key: str) -> Tuple[bool, Any]:
+        """Look up a retained result, dropping expired ones"""
+        now = time.monotonic()
+        while self._retained:
+            oldest_key, (expires_at, _) = next(iter(self._retained.items()))
+            if expires_at > now:
+                break
+            del self._retained[oldest_key]
+
+        if key in self._retained:
+            return True, self._retained[key][1]
+        return False, None
+
+    def _on_done(self, key: str, task: asyncio.Task):
+        """Release the key and retain the result of a finished computation"""
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+
+        if task.cancelled():
+            return
+
+        # Retrieve the exception so it is never reported as unhandled
+        if task.exception() is not None:
+            return
+
+        if self.result_ttl > 0:
+            self._retained[key] = (time.monotonic() + self.result_ttl, task.result())
+            self._retained.move_to_end(key)
+            while len(self._retained) > self.max_retained:
+                self._retained.popitem(last=False)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn once per key across concurrent callers
+
+        Args:
+            key: Request identity (see content_key)
+            fn: Zero-argument coroutine function producing the result
+
+        Returns:
+            A copy of the shared result; exceptions propagate to every caller
+        """
+        found, result = self._get_retained(key)
+        if found:
+            self._replayed += 1
+            return copy.deepcopy(result)
+
+        task = self._in_flight.get(key)
+        if task is None:
+            self._executions += 1
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done, key=key: self._on_done(key, done))
+        else:
+            self._coalesced += 1
+
+        result = await asyncio.shield(task)
+        return copy.deepcopy(result)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get execution and coalescing counters"""
+        return {
+            "in_flight": len(self._in_flight),
+            "executions": self._executions,
+            "coalesced": self._coalesced,
+            "replayed": self._replayed,
+            "retained": len(self._retained),
+        }
+
+
+# Named groups shared by the whole process
+_GROUPS: Dict[str, SingleFlight] = {}
+
+
+def get_singleflight(name: str, result_ttl: Optional[float] = None) -> SingleFlight:
+    """
+    Get or create a named SingleFlight group
+
+    Args:
+        name: Group name
+        result_ttl: Result retention in seconds, used when the group is created
+    """
+    if name not in _GROUPS:
+        _GROUPS[name] = SingleFlight(name, result_ttl=result_ttl or 0)
+    return _GROUPS[name]
+
+
+def get_singleflight_stats() -> Dict[str, Dict[str, Any]]:
+    """Get stats for every SingleFlight group"""
+    return {name: group.get_stats() for name, group in _GROUPS.items()}
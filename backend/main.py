@@ -10,6 +10,14 @@ from datetime import datetime
 load_dotenv()
 
 from app.api.routes.main_routes import router as main_router
+from app.services.llm import close_groq_client, close_response_cache
+from app.services.executor import shutdown_executor
+from app.services.analysis_jobs import get_analysis_queue, shutdown_analysis_queue
+from app.services.matching.tfidf_model import (
+    get_tfidf_model_manager,
+    shutdown_tfidf_model_manager,
+)
+from app.services.matching.embedding_store import close_embedding_store
 
 # Self-ping configuration to keep Render alive
 SELF_PING_ENABLED = os.getenv("SELF_PING_ENABLED", "false").lower() == "true"
@@ -98,6 +106,11 @@ async def self_ping_task():
 @app.on_event("startup")
 async def startup_event():
     """Start background tasks on startup"""
+    # Resume analysis jobs left queued or running by a previous process
+    await get_analysis_queue().start()
+    # Fit the TF-IDF model if the stored corpus has outgrown it
+    await get_tfidf_model_manager().start()
+
     if SELF_PING_ENABLED:
         print("🔄 Self-ping keep-alive enabled")
         print(f"   Interval: {SELF_PING_INTERVAL} seconds")
@@ -107,6 +120,17 @@ async def startup_event():
         print("   See RENDER_KEEP_ALIVE.md for setup instructions")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release shared resources on shutdown"""
+    await shutdown_analysis_queue()
+    await shutdown_tfidf_model_manager()
+    close_embedding_store()
+    await close_groq_client()
+    close_response_cache()
+    shutdown_executor(wait=False)
+
+
 if __name__ == "__main__":
     import uvicorn
     import sys